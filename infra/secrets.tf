@@ -75,3 +75,18 @@ resource "aws_secretsmanager_secret_version" "hci_django_superuser_password_vers
   secret_id     = aws_secretsmanager_secret.hci_django_superuser_password.id
   secret_string = var.hci_django_superuser_password
 }
+
+resource "aws_secretsmanager_secret" "hci_metrics_token" {
+  name        = "hci_metrics_token_${terraform.workspace}"
+  description = "This is the bearer token for the HCI's metrics endpoint."
+  tags = {
+    Environment = terraform.workspace
+    Project     = "HCI"
+  }
+  recovery_window_in_days = 0
+}
+
+resource "aws_secretsmanager_secret_version" "hci_metrics_token_version" {
+  secret_id     = aws_secretsmanager_secret.hci_metrics_token.id
+  secret_string = var.hci_metrics_token
+}
@@ -34,6 +34,12 @@ variable "hci_rds_password" {
   sensitive = true
 }
 
+variable "hci_metrics_token" {
+  description = "This is the bearer token for the HCI's metrics endpoint."
+  type        = string
+  sensitive   = true
+}
+
 //==============================================================================
 // Declare non-sensitive variables
 //==============================================================================
@@ -78,8 +84,8 @@ variable "hci_availability_zones" {
 }
 
 variable "hci_health_check_path" {
-  description = "This is the health check path for the HCI."
-  default     = "/ping/"
+  description = "This is the health check path for the HCI. (The readiness check, which fails when the database can't be queried.)"
+  default     = "/ready/"
 }
 
 variable "hci_log_retention_in_days" {
@@ -0,0 +1,193 @@
+"""Configure gunicorn, the HCI's production server.
+
+Run the server with `gunicorn --config python:config.gunicorn` (or `./run prod`). It's
+tuned with these environment variables:
+
+- `HCI_WORKER_CLASS`: How workers serve requests. "gthread" (the default) serves
+  `config.wsgi` with `HCI_THREADS` threads per worker, so a worker waiting on the
+  database doesn't hold up every other request. "sync" serves `config.wsgi` one request
+  at a time per worker. "uvicorn" serves `config.asgi` with uvicorn workers.
+- `HCI_WORKERS`: How many worker processes to run. (Default 2.)
+- `HCI_THREADS`: How many threads each gthread worker runs. (Default 4.)
+- `HCI_PRELOAD`: Whether to load the application, and warm its caches (see
+  `config.warmup`), in the master process before forking the workers, so the workers
+  share them copy-on-write. (Default "true".) Otherwise each worker loads the
+  application, and warms its caches, itself.
+- `HCI_MAX_REQUESTS`, `HCI_MAX_REQUESTS_JITTER`: Restart each worker after it's served
+  about this many requests, give or take the jitter, so that workers don't all restart
+  at once. (Default 1000, give or take 100.) 0 never restarts workers.
+- `HCI_WORKER_MAX_MEMORY_MB`: Restart a worker, once it's finished its requests, when
+  its private memory (the memory it doesn't share with the master) is more than this.
+  (Default 150.) It's checked, and reported in the metrics, every
+  `HCI_WORKER_MEMORY_CHECK_INTERVAL` seconds (default 10). 0 never checks.
+- `PROMETHEUS_MULTIPROC_DIR`: The directory the workers keep their metrics in. (Defaults
+  to "hci_metrics" in the temporary directory.) It's emptied when the server starts.
+- `HCI_BIND`: The address to listen on. (Default "0.0.0.0:8000".)
+- `HCI_TIMEOUT`: Restart a worker that's been silent for this many seconds. (Default
+  30.)
+"""
+
+import gc
+import os
+import signal
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+# The metrics (see `config.metrics`) aren't imported here, since `prometheus_client`
+# mustn't be imported until the directory the workers keep their metrics in is set.
+METRICS_DIR_ENV_VAR = "PROMETHEUS_MULTIPROC_DIR"
+
+# Where the kernel reports the process's memory use, by kind.
+SMAPS_ROLLUP_PATH = Path("/proc/self/smaps_rollup")
+
+# The gunicorn worker class, and the application it serves, for each `HCI_WORKER_CLASS`.
+WORKER_CLASSES: Dict[str, Tuple[str, str]] = {
+    "sync": ("sync", "config.wsgi:application"),
+    "gthread": ("gthread", "config.wsgi:application"),
+    "uvicorn": ("uvicorn_worker.UvicornWorker", "config.asgi:application"),
+}
+
+
+class ServerConfigException(Exception):
+    """Define an exception for the server config module."""
+
+
+def _get_bool(name: str, default: bool) -> bool:
+    """Return the value of a boolean environment variable."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_private_memory() -> int | None:
+    """Return how much memory (in bytes) the process doesn't share with other processes.
+
+    Memory a worker shares with the master (e.g. the preloaded application) isn't
+    counted, since it doesn't grow as the worker serves requests.
+
+    :returns: The memory, or None if the kernel doesn't report it (i.e. off Linux).
+    """
+    try:
+        lines = SMAPS_ROLLUP_PATH.read_text(encoding="ascii").splitlines()
+    except OSError:
+        return None
+    private_kb = 0
+    for line in lines:
+        name, _, value = line.partition(":")
+        if name in ("Private_Clean", "Private_Dirty"):
+            private_kb += int(value.split()[0])
+    return private_kb * 1024
+
+
+def watch_memory(worker: Any, max_memory: int, interval: float) -> None:
+    """Stop the worker gracefully once its private memory is more than the maximum.
+
+    The worker finishes the requests it's serving, and the master starts a new worker in
+    its place. This runs in a daemon thread in each worker, which also reports the
+    worker's memory in the metrics.
+    """
+    # pylint: disable=import-outside-toplevel
+    from config.metrics import WORKER_MEMORY
+
+    while worker.alive:
+        memory = get_private_memory()
+        if memory is not None:
+            WORKER_MEMORY.set(memory)
+        if memory is not None and memory > max_memory:
+            worker.log.warning(
+                "Restarting worker %s, which is using %d MB (more than %d MB)",
+                worker.pid,
+                memory // 2**20,
+                max_memory // 2**20,
+            )
+            os.kill(worker.pid, signal.SIGTERM)
+            return
+        time.sleep(interval)
+
+
+worker_class_name = os.getenv("HCI_WORKER_CLASS", "gthread")
+if worker_class_name not in WORKER_CLASSES:
+    raise ServerConfigException(
+        f"Unknown worker class {worker_class_name!r}, "
+        f"expected one of {', '.join(WORKER_CLASSES)}"
+    )
+worker_class, wsgi_app = WORKER_CLASSES[worker_class_name]
+workers = int(os.getenv("HCI_WORKERS", "2"))
+threads = int(os.getenv("HCI_THREADS", "4")) if worker_class_name == "gthread" else 1
+bind = os.getenv("HCI_BIND", "0.0.0.0:8000")
+timeout = int(os.getenv("HCI_TIMEOUT", "30"))
+preload_app = _get_bool("HCI_PRELOAD", True)
+max_requests = int(os.getenv("HCI_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.getenv("HCI_MAX_REQUESTS_JITTER", "100"))
+worker_max_memory = int(os.getenv("HCI_WORKER_MAX_MEMORY_MB", "150")) * 2**20
+worker_memory_check_interval = float(
+    os.getenv("HCI_WORKER_MEMORY_CHECK_INTERVAL", "10")
+)
+
+# The workers keep their metrics in this directory, so that the metrics reported by
+# any worker cover every worker. (See `config.metrics`.) gunicorn sets it in the
+# environment before the application is loaded, since that's when `prometheus_client`
+# reads it.
+metrics_dir = Path(
+    os.getenv(METRICS_DIR_ENV_VAR, str(Path(tempfile.gettempdir()) / "hci_metrics"))
+)
+metrics_dir.mkdir(parents=True, exist_ok=True)
+raw_env = [f"{METRICS_DIR_ENV_VAR}={metrics_dir}"]
+
+
+def _warm_caches(server: Any) -> None:
+    """Warm the application's caches, and log how long it took."""
+    # pylint: disable=import-outside-toplevel
+    from django.db import connections
+
+    from config.warmup import warm_caches
+
+    timings = warm_caches()
+    server.log.info(
+        "Warmed caches: %s",
+        ", ".join(f"{name} in {elapsed:.3f}s" for name, elapsed in timings.items()),
+    )
+    # Warming the caches may have connected to the database, and a connection mustn't
+    # be shared by forked workers.
+    connections.close_all()
+
+
+def _clear_metrics_directory(directory: Path) -> None:
+    """Empty the metrics directory of a previous server's metrics."""
+    for path in directory.glob("*.db"):
+        path.unlink(missing_ok=True)
+
+
+def on_starting(server: Any) -> None:
+    """Warm the preloaded application's caches before listening for requests."""
+    _clear_metrics_directory(metrics_dir)
+    if preload_app:
+        _warm_caches(server)
+        # Keep the garbage collector from touching (and so copying) the warmed objects
+        # in each worker.
+        gc.freeze()
+
+
+def post_worker_init(worker: Any) -> None:
+    """Warm the worker's caches if it loaded the application, and watch its memory."""
+    if not preload_app:
+        _warm_caches(worker)
+    if worker_max_memory > 0:
+        threading.Thread(
+            target=watch_memory,
+            args=(worker, worker_max_memory, worker_memory_check_interval),
+            daemon=True,
+            name="watch_memory",
+        ).start()
+
+
+def child_exit(_server: Any, worker: Any) -> None:
+    """Stop reporting the gauges of a worker that's exited."""
+    # pylint: disable=import-outside-toplevel
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,81 @@
+"""Collect metrics about the HCI, and report them in Prometheus's text format.
+
+The metrics are kept by `prometheus_client`. When `PROMETHEUS_MULTIPROC_DIR` is set (as
+the production server sets it, before the application is loaded; see `config.gunicorn`),
+each process keeps its metrics in files of its own in that directory, and the metrics
+reported by any process are those of every process added together. So the metrics cover
+all of the server's workers, whichever worker is asked for them.
+
+Counters and histograms are added up across every process that has ever recorded them,
+including workers that have since exited, so they never go down. Gauges are only
+reported for the processes that are still running: the server marks each worker that
+exits as dead.
+"""
+
+import os
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# The directory each process keeps its metrics in is set with this environment variable,
+# which `prometheus_client` reads when it's imported.
+MULTIPROCESS_DIR_ENV_VAR = "PROMETHEUS_MULTIPROC_DIR"
+
+# Whether each process keeps its metrics in files. `prometheus_client` decides this when
+# it's imported, so setting the environment variable later makes no difference.
+MULTIPROCESS = MULTIPROCESS_DIR_ENV_VAR in os.environ
+
+# The upper bounds (in seconds) of the buckets of request latencies.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# The HCI's metrics, when each process only reports its own.
+registry = CollectorRegistry()
+
+REQUESTS = Counter(
+    "hci_requests_total",
+    "Requests served, by view, method and status code.",
+    ["view", "method", "status"],
+    registry=registry,
+)
+REQUEST_DURATION = Histogram(
+    "hci_request_duration_seconds",
+    "How long requests took to serve, by view.",
+    ["view"],
+    buckets=LATENCY_BUCKETS,
+    registry=registry,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "hci_requests_in_flight",
+    "Requests being served right now.",
+    multiprocess_mode="livesum",
+    registry=registry,
+)
+DB_QUERIES = Counter(
+    "hci_db_queries_total",
+    "Database queries made while serving requests, by view.",
+    ["view"],
+    registry=registry,
+)
+WORKER_MEMORY = Gauge(
+    "hci_worker_private_memory_bytes",
+    "Memory each worker doesn't share with other processes, by process ID.",
+    multiprocess_mode="liveall",
+    registry=registry,
+)
+
+
+def render_metrics() -> bytes:
+    """Return the metrics of every process, in Prometheus's text format."""
+    if not MULTIPROCESS:
+        return generate_latest(registry)
+    # The metrics are read from every process's files, rather than from this process's
+    # registry.
+    collected = CollectorRegistry()
+    multiprocess.MultiProcessCollector(collected)
+    return generate_latest(collected)
@@ -1,23 +1,235 @@
 """Set up custom middleware."""
 
-# pylint: skip-file
-# TODO(Liam): Don't skip lint in this module.
-
-# TODO(Liam): Don't use deprecated `MiddlewareMixin`.
-# https://docs.djangoproject.com/en/5.1/topics/http/middleware/#writing-your-own-middleware
+import hmac
+import json
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Tuple
 
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, connection
 from django.http import HttpRequest, HttpResponse
-from django.utils.deprecation import MiddlewareMixin
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from config.metrics import (
+    DB_QUERIES,
+    REQUEST_DURATION,
+    REQUESTS,
+    REQUESTS_IN_FLIGHT,
+    render_metrics,
+)
+from config.profiling import RequestProfile, current_profile
+
+logger = logging.getLogger(__name__)
+
+# Slow requests are logged here, so they can be filtered from other logs.
+slow_request_logger = logging.getLogger("config.middleware.slow_requests")
+
+# The paths of the health check and metrics endpoints.
+LIVENESS_PATH = "/ping/"
+READINESS_PATH = "/ready/"
+METRICS_PATHS = ("/metrics", "/metrics/")
 
+# How often (in seconds) each process checks whether it's ready, at most.
+READINESS_CHECK_INTERVAL = 5.0
 
-class HealthCheckMiddleware(MiddlewareMixin):
-    """Establish a health check endpoint.
+# The view label of requests that didn't match a URL pattern.
+UNMATCHED_VIEW = "unmatched"
 
-    We can use this to monitor the status of the application.
+
+class ReadinessCheck:
+    """Check whether the HCI can serve requests, at most once per interval.
+
+    Load balancers check readiness every few seconds, from several places, so the result
+    is cached, and only one thread checks at a time.
     """
 
-    def process_request(self, request: HttpRequest) -> HttpResponse | None:
-        """Process the HTTP request."""
-        if request.META["PATH_INFO"] == "/ping/":
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._checked_at: float | None = None
+        self._is_ready = False
+
+    def is_ready(self) -> bool:
+        """Return whether the HCI is ready, checking again if it's been long enough."""
+        with self._lock:
+            now = time.monotonic()
+            if self._checked_at is None or now - self._checked_at >= self.interval:
+                self._is_ready = self.check()
+                self._checked_at = now
+            return self._is_ready
+
+    @staticmethod
+    def check() -> bool:
+        """Return whether the database can be queried."""
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        except DatabaseError as err:
+            logger.warning("Not ready, since the database can't be queried: %s", err)
+            return False
+        return True
+
+
+readiness_check = ReadinessCheck(READINESS_CHECK_INTERVAL)
+
+
+class HealthCheckMiddleware:
+    """Answer health checks and requests for metrics, before any other middleware.
+
+    - The liveness check (`/ping/`) only shows the server is up, so it's always cheap.
+    - The readiness check (`/ready/`) shows the HCI can serve requests, i.e. it can
+      query the database. It's 503 Service Unavailable if not.
+    - The metrics (`/metrics`) are reported in Prometheus's text format, only to
+      requests with the `METRICS_TOKEN` setting as a bearer token. Without a token,
+      they're only reported when DEBUG is on, and are otherwise 404 Not Found.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        """Answer the request if it's for a health check or metrics."""
+        path = request.META["PATH_INFO"]
+        if path == LIVENESS_PATH:
             return HttpResponse("pong")
-        return None
+        if path == READINESS_PATH:
+            if readiness_check.is_ready():
+                return HttpResponse("ready")
+            return HttpResponse("not ready", status=503)
+        if path in METRICS_PATHS:
+            return self.get_metrics(request)
+        return self.get_response(request)
+
+    @staticmethod
+    def get_metrics(request: HttpRequest) -> HttpResponse:
+        """Return the metrics of every worker, if the request may see them."""
+        token = getattr(settings, "METRICS_TOKEN", None)
+        if not token and not settings.DEBUG:
+            return HttpResponse("Not Found", status=404)
+        if token:
+            authorization = request.headers.get("Authorization", "")
+            if not hmac.compare_digest(authorization, f"Bearer {token}"):
+                return HttpResponse("Unauthorized", status=401)
+        return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
+
+
+class MetricsMiddleware:
+    """Count requests, and how long they take, and the database queries they make."""
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        """Serve the request, and record its metrics."""
+        num_queries = 0
+
+        def count_query(execute: Callable[..., Any], *args: Any) -> Any:
+            nonlocal num_queries
+            num_queries += 1
+            return execute(*args)
+
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(count_query):
+                response = self.get_response(request)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+        elapsed = time.perf_counter() - start
+        view, method = self.get_labels(request)
+        REQUESTS.labels(view, method, str(response.status_code)).inc()
+        REQUEST_DURATION.labels(view).observe(elapsed)
+        DB_QUERIES.labels(view).inc(num_queries)
+        return response
+
+    @staticmethod
+    def get_labels(request: HttpRequest) -> Tuple[str, str]:
+        """Return the view and method to label the request's metrics with.
+
+        The labels only take a few values, so there are only a few samples. (Paths, for
+        example, would make a sample for every curation.)
+        """
+        match = request.resolver_match
+        view = match.view_name if match is not None else UNMATCHED_VIEW
+        method = request.method if request.method in ("GET", "POST") else "other"
+        return view, method
+
+
+class RequestProfilingMiddleware:
+    """Profile a sample of requests, and log the slow ones, with their queries.
+
+    Profiling is opt-in: set the `REQUEST_PROFILING_SAMPLE_RATE` setting to the fraction
+    of requests to profile (e.g. 0.1). Requests that aren't sampled aren't touched, so
+    leaving it on in production costs no more than the sampled requests' profiles.
+
+    A profiled request (see `config.profiling`) is logged as slow, as a JSON object, if
+    it took at least `REQUEST_PROFILING_SLOW_SECONDS`, made at least
+    `REQUEST_PROFILING_MAX_QUERIES` queries, or made the same query at least
+    `REQUEST_PROFILING_MAX_REPEATS` times (a sign of an N+1 query). The log lists the
+    repeated queries and the slowest queries, but not their parameters, which may hold
+    curators' data.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+        self.sample_rate = settings.REQUEST_PROFILING_SAMPLE_RATE
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        self.slow_seconds = settings.REQUEST_PROFILING_SLOW_SECONDS
+        self.max_queries = settings.REQUEST_PROFILING_MAX_QUERIES
+        self.max_repeats = settings.REQUEST_PROFILING_MAX_REPEATS
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        """Serve the request, profiling it if it's sampled."""
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(profile.record_query):
+                response = self.get_response(request)
+        finally:
+            current_profile.reset(token)
+        elapsed = time.perf_counter() - start
+        self.log_if_slow(request, response, profile, elapsed)
+        return response
+
+    def log_if_slow(
+        self,
+        request: HttpRequest,
+        response: HttpResponse,
+        profile: RequestProfile,
+        elapsed: float,
+    ) -> None:
+        """Log the request's profile if it's over any of the thresholds."""
+        repeated_queries = profile.get_repeated_queries(self.max_repeats)
+        reasons = []
+        if elapsed >= self.slow_seconds:
+            reasons.append("slow")
+        if len(profile.queries) >= self.max_queries:
+            reasons.append("many_queries")
+        if repeated_queries:
+            reasons.append("repeated_queries")
+        if not reasons:
+            return
+        match = request.resolver_match
+        report = {
+            "event": "slow_request",
+            "reasons": reasons,
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match is not None else UNMATCHED_VIEW,
+            "status": response.status_code,
+            "time_ms": round(elapsed * 1000, 1),
+            "db_time_ms": round(profile.db_time * 1000, 1),
+            "template_time_ms": round(profile.template_time * 1000, 1),
+            "num_queries": len(profile.queries),
+            "repeated_queries": repeated_queries,
+            "slowest_queries": profile.get_slowest_queries(),
+        }
+        slow_request_logger.warning(json.dumps(report))
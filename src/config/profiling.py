@@ -0,0 +1,122 @@
+"""Profile requests: the queries they make, and where their time goes.
+
+`config.middleware.RequestProfilingMiddleware` profiles a sample of requests, and logs
+the slow ones. While a request is profiled, its `RequestProfile` is the current profile,
+and records the request's queries and template rendering:
+
+- Queries are recorded by a database execute wrapper, with how long each took.
+- Template rendering is timed by `ProfiledDjangoTemplates`, the template backend when
+  profiling is turned on, when a view renders a template (e.g. with `render`).
+  Templates that template includes or extends are rendered within it, so they aren't
+  timed twice. Queries made while rendering (e.g. by a queryset a template loops over)
+  count towards both times.
+
+A query is only recorded by its SQL, not its parameters, so the same query made for
+each of many objects (an "N+1" query, e.g. a related object fetched in a loop rather
+than with `select_related`) shows up as one query repeated many times.
+"""
+
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.http import HttpRequest
+from django.template.backends.django import DjangoTemplates, Template
+
+# How many characters of each query's SQL to report.
+MAX_SQL_LENGTH = 500
+
+# How many of the slowest queries to report.
+NUM_SLOWEST_QUERIES = 5
+
+
+@dataclass
+class RequestProfile:
+    """Hold the queries a request made, and how long they and its templates took."""
+
+    # Each query's SQL, and how long (in seconds) it took.
+    queries: List[Tuple[str, float]] = field(default_factory=list)
+    db_time: float = 0.0
+    template_time: float = 0.0
+    # How many templates are being rendered, one within another.
+    template_depth: int = 0
+
+    def record_query(self, execute: Callable[..., Any], sql: str, *args: Any) -> Any:
+        """Make the query, and record it (as a database execute wrapper).
+
+        :param args: The query's params, whether it's executed many times, and its
+            context, passed on to `execute`.
+        """
+        start = time.perf_counter()
+        try:
+            return execute(sql, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.queries.append((sql, elapsed))
+            self.db_time += elapsed
+
+    def get_repeated_queries(self, min_count: int) -> List[Dict[str, Any]]:
+        """Return the queries that were made at least `min_count` times, most first."""
+        counts: Dict[str, List[float]] = {}
+        for sql, elapsed in self.queries:
+            counts.setdefault(sql, []).append(elapsed)
+        repeated = [
+            {
+                "sql": sql[:MAX_SQL_LENGTH],
+                "count": len(times),
+                "time_ms": round(sum(times) * 1000, 1),
+            }
+            for sql, times in counts.items()
+            if len(times) >= min_count
+        ]
+        return sorted(repeated, key=lambda query: -query["count"])
+
+    def get_slowest_queries(self) -> List[Dict[str, Any]]:
+        """Return the slowest queries, slowest first."""
+        slowest = sorted(self.queries, key=lambda query: -query[1])
+        return [
+            {"sql": sql[:MAX_SQL_LENGTH], "time_ms": round(elapsed * 1000, 1)}
+            for sql, elapsed in slowest[:NUM_SLOWEST_QUERIES]
+        ]
+
+
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar(
+    "current_profile", default=None
+)
+
+
+class ProfiledTemplate(Template):
+    """Time the rendering of a template, when the request is being profiled."""
+
+    def render(
+        self,
+        context: Optional[Dict[str, Any]] = None,
+        request: Optional[HttpRequest] = None,
+    ) -> str:
+        """Render the template, adding the time it took to the current profile."""
+        profile = current_profile.get()
+        if profile is None:
+            return super().render(context, request)
+        # A template rendered while rendering another one (e.g. by a template tag) is
+        # part of the other one's time.
+        profile.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            profile.template_depth -= 1
+            if profile.template_depth == 0:
+                profile.template_time += time.perf_counter() - start
+
+
+class ProfiledDjangoTemplates(DjangoTemplates):
+    """Render Django templates, timing them when the request is being profiled."""
+
+    def from_string(self, template_code: str) -> Template:
+        """Compile the template."""
+        return ProfiledTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name: str) -> Template:
+        """Find and compile the template."""
+        return ProfiledTemplate(super().get_template(template_name).template, self)
@@ -14,7 +14,7 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 
-from util.secrets import get_secret
+from util.secrets import get_secrets
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -29,12 +29,49 @@ load_dotenv(dotenv_path=BASE_DIR.parent / ".env")
 # 'production'.)
 HCI_HOST = os.getenv("HCI_HOST")
 
-# SECURITY WARNING: keep the secret key used in production secret!
+# The secrets the HCI needs, which are got all at once. (See `util.secrets`.)
 if HCI_HOST == "local" or HCI_HOST is None:
     # If we're running locally or in CI, use the staging secret key.
-    SECRET_KEY = get_secret("hci_django_secret_key_staging")
+    SECRET_KEY_NAME = "hci_django_secret_key_staging"
 else:
-    SECRET_KEY = get_secret(f"hci_django_secret_key_{HCI_HOST}")
+    SECRET_KEY_NAME = f"hci_django_secret_key_{HCI_HOST}"
+RDS_PASSWORD_NAME = f"hci_rds_password_{HCI_HOST}"
+METRICS_TOKEN_NAME = f"hci_metrics_token_{HCI_HOST}"
+# The database password and the metrics token are only kept where the HCI is deployed.
+# The HCI can't run without the secret key or the database password, but can without
+# the metrics token.
+_is_deployed = "RDS_DB_NAME" in os.environ
+_required_secret_names = [
+    SECRET_KEY_NAME,
+    *([RDS_PASSWORD_NAME] if _is_deployed else []),
+]
+_secrets = get_secrets(
+    [*_required_secret_names, *([METRICS_TOKEN_NAME] if _is_deployed else [])],
+    required=_required_secret_names,
+)
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = _secrets[SECRET_KEY_NAME]
+
+# If this is set, `/metrics` is only served to requests with it as a bearer token. If
+# it isn't, `/metrics` is only served when DEBUG is on. (See `config.middleware`.)
+METRICS_TOKEN = os.getenv("HCI_METRICS_TOKEN") or _secrets.get(METRICS_TOKEN_NAME)
+
+# Profile this fraction of requests, and log the ones that are slow, make many queries,
+# or make the same query many times. 0 (the default) turns profiling off. (See
+# `config.middleware.RequestProfilingMiddleware`.)
+REQUEST_PROFILING_SAMPLE_RATE = float(
+    os.getenv("HCI_REQUEST_PROFILING_SAMPLE_RATE", "0")
+)
+REQUEST_PROFILING_SLOW_SECONDS = float(
+    os.getenv("HCI_REQUEST_PROFILING_SLOW_SECONDS", "1")
+)
+REQUEST_PROFILING_MAX_QUERIES = int(
+    os.getenv("HCI_REQUEST_PROFILING_MAX_QUERIES", "50")
+)
+REQUEST_PROFILING_MAX_REPEATS = int(
+    os.getenv("HCI_REQUEST_PROFILING_MAX_REPEATS", "10")
+)
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = HCI_HOST == "local" or HCI_HOST is None
@@ -57,10 +94,13 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "hci",
 ]
 
 MIDDLEWARE = [
     "config.middleware.HealthCheckMiddleware",
+    "config.middleware.MetricsMiddleware",
+    "config.middleware.RequestProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -75,7 +115,14 @@ ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # Django templates, timed when requests are profiled (see `config.profiling`).
+        # Only then, so that templates aren't wrapped for nothing.
+        "BACKEND": (
+            "config.profiling.ProfiledDjangoTemplates"
+            if REQUEST_PROFILING_SAMPLE_RATE > 0
+            else "django.template.backends.django.DjangoTemplates"
+        ),
+        "NAME": "django",
         "DIRS": [BASE_DIR / "templates", BASE_DIR / "hci" / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -101,7 +148,7 @@ if "RDS_DB_NAME" in os.environ:
             "ENGINE": "django.db.backends.postgresql",
             "NAME": os.environ["RDS_DB_NAME"],
             "USER": os.environ["RDS_USERNAME"],
-            "PASSWORD": get_secret(f"hci_rds_password_{HCI_HOST}"),
+            "PASSWORD": _secrets[RDS_PASSWORD_NAME],
             "HOST": os.environ["RDS_HOSTNAME"],
             "PORT": os.environ["RDS_PORT"],
         }
@@ -0,0 +1,77 @@
+"""Warm the HCI's caches before it serves any requests.
+
+The production server (see `config.gunicorn`) calls `warm_caches` once the application
+is loaded. When the application is preloaded, that's in the server's master process,
+before it listens for requests or forks its workers. So the workers share one copy of
+the caches, copy-on-write, and the load balancer's health check doesn't pass until
+they're warm.
+"""
+
+import logging
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.loader import get_template
+
+from score.constants import get_framework_versions
+
+logger = logging.getLogger(__name__)
+
+
+def warm_scoring() -> None:
+    """Load the tables used to score associations."""
+    from hci.scoring import load_tables  # pylint: disable=import-outside-toplevel
+
+    for version in get_framework_versions():
+        load_tables(version)
+
+
+def warm_templates() -> None:
+    """Compile the HCI's own templates.
+
+    Django caches compiled templates when it isn't in debug mode.
+    """
+    for directory in engines["django"].dirs:
+        for path in sorted(Path(directory).glob("**/*.html")):
+            name = path.relative_to(directory).as_posix()
+            try:
+                get_template(name)
+            except (TemplateDoesNotExist, TemplateSyntaxError) as err:
+                logger.warning("Unable to compile template %s: %s", name, err)
+
+
+def warm_allele_names() -> None:
+    """Read the names of the alleles to suggest to curators."""
+    from hci.autocomplete import allele_names  # pylint: disable=import-outside-toplevel
+
+    allele_names.get_index()
+
+
+# The caches to warm, in order.
+WARMERS: Dict[str, Callable[[], None]] = {
+    "scoring": warm_scoring,
+    "templates": warm_templates,
+    "allele names": warm_allele_names,
+}
+
+
+def warm_caches() -> Dict[str, float]:
+    """Warm each cache.
+
+    A cache that can't be warmed (e.g. because the database isn't up yet) is logged, and
+    left to be filled when it's first needed.
+
+    :returns: The caches that were warmed, mapped to how long (in seconds) they took.
+    """
+    timings = {}
+    for name, warm in WARMERS.items():
+        start = time.monotonic()
+        try:
+            warm()
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.exception("Unable to warm the %s cache", name)
+            continue
+        timings[name] = time.monotonic() - start
+    return timings
@@ -1,9 +1,25 @@
 """Configure apps."""
 
 from django.apps import AppConfig
+from django.db.models.signals import m2m_changed, post_delete, post_save
 
 
 class HCIConfig(AppConfig):
     """Configure the HCI app."""
 
     name = "hci"
+
+    def ready(self) -> None:
+        """Keep data derived from the models up to date as they change."""
+        # The models can only be imported once the app registry is ready.
+        # pylint: disable=import-outside-toplevel
+        from hci.autocomplete import allele_names
+        from hci.models import Allele, update_haplotype_fingerprints
+
+        post_save.connect(allele_names.invalidate, sender=Allele)
+        post_delete.connect(allele_names.invalidate, sender=Allele)
+        # The model Django creates for `Haplotype.constituent_alleles`.
+        m2m_changed.connect(
+            update_haplotype_fingerprints,
+            sender=self.get_model("Haplotype_constituent_alleles"),
+        )
@@ -0,0 +1,130 @@
+"""Suggest allele names as curators type them.
+
+The names of the alleles that can be used for new curations are held in memory, sorted,
+so the names starting with what's been typed (e.g. "A*02:0") are found with a binary
+search, without querying the database. The names are read once per process, when they're
+first needed, and read again when the allele table changes: immediately when an allele
+is saved or deleted in the same process, and otherwise (e.g. after a release is loaded
+in bulk, which doesn't send signals) within `REFRESH_INTERVAL` seconds.
+"""
+
+import bisect
+import threading
+import time
+from datetime import datetime
+from typing import Any, Iterable, List, Tuple
+
+from django.db.models import Count, Max
+
+from hci.imgt import ALLELE_NAME_PREFIX
+from hci.models import Allele
+
+# The most names to suggest at a time.
+MAX_SUGGESTIONS = 20
+
+# How often (in seconds) to check whether the allele table has changed.
+REFRESH_INTERVAL = 60.0
+
+
+def normalize_query(query: str) -> str:
+    """Return the prefix of the allele names to suggest for what's been typed.
+
+    Names are matched case-insensitively, and the "HLA-" prefix is optional, e.g.
+    "a*02:0" is the prefix "HLA-A*02:0".
+    """
+    query = query.strip().upper()
+    if ALLELE_NAME_PREFIX.startswith(query) or query.startswith(ALLELE_NAME_PREFIX):
+        return query
+    return ALLELE_NAME_PREFIX + query
+
+
+class AlleleNameIndex:
+    """Find the allele names starting with a prefix."""
+
+    def __init__(self, names: Iterable[str]) -> None:
+        # Names are compared in upper case, and suggested as they're named.
+        pairs = sorted((name.upper(), name) for name in names)
+        self.keys = [key for key, _ in pairs]
+        self.names = [name for _, name in pairs]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def search(self, prefix: str, limit: int) -> List[str]:
+        """Return the first names, in order, that start with the (upper case) prefix."""
+        start = bisect.bisect_left(self.keys, prefix)
+        end = start
+        while (
+            end < len(self.keys)
+            and end - start < limit
+            and self.keys[end].startswith(prefix)
+        ):
+            end += 1
+        return self.names[start:end]
+
+
+class AlleleNameCache:
+    """Hold the index of allele names for a process, keeping it up to date."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._index: AlleleNameIndex | None = None
+        self._fingerprint: Tuple[int, int | None, datetime | None] | None = None
+        self._checked_at = 0.0
+
+    def get_index(self) -> AlleleNameIndex:
+        """Return the index, building it (again) if the allele table has changed."""
+        index = self._index
+        if index is not None and time.monotonic() - self._checked_at < REFRESH_INTERVAL:
+            return index
+        with self._lock:
+            # Another thread may have refreshed the index while this one was waiting.
+            now = time.monotonic()
+            if self._index is not None and now - self._checked_at < REFRESH_INTERVAL:
+                return self._index
+            fingerprint = self._get_fingerprint()
+            if self._index is None or fingerprint != self._fingerprint:
+                self._index = AlleleNameIndex(
+                    Allele.objects.filter(is_deleted=False)
+                    .values_list("imgt_name", flat=True)
+                    .iterator()
+                )
+                self._fingerprint = fingerprint
+            self._checked_at = now
+            return self._index
+
+    def invalidate(self, **_kwargs: Any) -> None:
+        """Build the index again the next time it's needed.
+
+        This is a signal receiver, so takes any keyword arguments.
+        """
+        with self._lock:
+            self._index = None
+
+    @staticmethod
+    def _get_fingerprint() -> Tuple[int, int | None, datetime | None]:
+        """Return how many alleles can be suggested, the newest one's ID, and when the
+        last one was changed.
+
+        These change whenever alleles are created, renamed, or marked as deleted or not,
+        by any process, so are checked cheaply instead of reading every name again.
+        """
+        result = Allele.objects.filter(is_deleted=False).aggregate(
+            count=Count("pk"), newest=Max("pk"), modified=Max("modified")
+        )
+        return result["count"], result["newest"], result["modified"]
+
+
+allele_names = AlleleNameCache()
+
+
+def suggest_allele_names(query: str) -> List[str]:
+    """Return the names of the alleles to suggest for what's been typed.
+
+    :param query: What's been typed, e.g. "A*02:0".
+    :returns: Up to `MAX_SUGGESTIONS` names, in order.
+    """
+    query = normalize_query(query)
+    if not query:
+        return []
+    return allele_names.get_index().search(query, MAX_SUGGESTIONS)
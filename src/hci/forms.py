@@ -24,3 +24,13 @@ class CustomSignUpForm(UserCreationForm):
             "password1",
             "password2",
         )
+
+
+class CurationFilterForm(forms.Form):
+    """Filter the curations in the curation browser, and page through them."""
+
+    disease = forms.CharField(required=False, label="Mondo ID")
+    allele = forms.CharField(required=False, label="IPD-IMGT/HLA name")
+    curator = forms.CharField(required=False, label="Curator username")
+    # The primary key of the last curation on the previous page.
+    after = forms.IntegerField(required=False, min_value=1, widget=forms.HiddenInput)
@@ -0,0 +1,96 @@
+"""Read alleles from a release of the IPD-IMGT/HLA Database.
+
+Two files in a release list the alleles, and either can be read. `Allelelist.txt` lists
+the current alleles as "AlleleID,Allele" rows, e.g. "HLA00001,A*01:01:01:01".
+`hla_nom.txt` lists every allele ever named as "Gene*;Name;Date assigned;Date
+deleted;..." rows, e.g. "A*;01:01:01:01;19890101;;;". Both are read as a stream of
+alleles, and lines starting with "#" are skipped. For the files, see:
+https://github.com/ANHIG/IMGTHLA
+"""
+
+import re
+from typing import IO, Iterator, NamedTuple, Tuple
+
+# Allele names in the files don't have the "HLA-" prefix of full allele names.
+ALLELE_NAME_PREFIX = "HLA-"
+
+# An allele name, e.g. "HLA-A*01:01:01:02N": the gene, up to four fields of digits
+# separated by colons, and an expression suffix. Fields and the suffix are optional, so
+# allele groups (e.g. "A*02") are names too.
+_ALLELE_NAME = re.compile(
+    r"(?:HLA-)?(?P<gene>[A-Z0-9]+)(?:\*(?P<fields>\d+(?::\d+){0,3})(?P<suffix>[A-Z]?))?"
+)
+
+
+class ImgtException(Exception):
+    """Define an exception for the imgt module."""
+
+
+class ImgtAllele(NamedTuple):
+    """Hold the parts of an allele in a release that are stored for an allele."""
+
+    imgt_name: str
+    is_deleted: bool
+
+
+class AlleleName(NamedTuple):
+    """Hold the parts of an allele name."""
+
+    gene: str
+    fields: Tuple[str, ...]
+    expression_suffix: str
+
+
+def parse_allele_name(name: str) -> AlleleName:
+    """Split an allele name into its gene, fields, and expression suffix.
+
+    For the nomenclature, see:
+    https://hla.alleles.org/pages/nomenclature/naming_alleles/
+
+    :param name: The name, with or without the "HLA-" prefix, e.g. "HLA-A*01:01:01:02N".
+    :raises ImgtException: If the name isn't an allele name.
+    :returns: The parts of the name, e.g. ("A", ("01", "01", "01", "02"), "N").
+    """
+    match = _ALLELE_NAME.fullmatch(name)
+    if match is None:
+        raise ImgtException(f"{name!r} isn't an allele name")
+    fields = match["fields"]
+    return AlleleName(
+        gene=match["gene"],
+        fields=tuple(fields.split(":")) if fields else (),
+        expression_suffix=match["suffix"] or "",
+    )
+
+
+def read_allelelist(lines: IO[str]) -> Iterator[ImgtAllele]:
+    """Read the alleles from an `Allelelist.txt` file.
+
+    :raises ImgtException: If a row doesn't have an allele ID and allele name.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith("#") or line == "AlleleID,Allele":
+            continue
+        fields = line.split(",")
+        if len(fields) != 2 or not fields[1]:
+            raise ImgtException(f"Line {line_number} isn't an allele ID and name")
+        yield ImgtAllele(ALLELE_NAME_PREFIX + fields[1], is_deleted=False)
+
+
+def read_hla_nom(lines: IO[str]) -> Iterator[ImgtAllele]:
+    """Read the alleles from an `hla_nom.txt` file.
+
+    Alleles with a deletion date are deleted.
+
+    :raises ImgtException: If a row doesn't have a gene, name, and deletion date.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        fields = line.split(";")
+        if len(fields) < 4 or not fields[0] or not fields[1]:
+            raise ImgtException(f"Line {line_number} isn't a gene, name, and dates")
+        yield ImgtAllele(
+            ALLELE_NAME_PREFIX + fields[0] + fields[1], is_deleted=bool(fields[3])
+        )
@@ -0,0 +1,233 @@
+"""Load the alleles in a release of the IPD-IMGT/HLA Database.
+
+Run this with a local copy of `Allelelist.txt` or `hla_nom.txt` from a release whenever
+a new release should be made available to curators. Only the differences from the
+alleles already loaded are written: new alleles are created, and alleles that have been
+deleted from (or restored to) the release are marked as deleted (or not). Alleles are
+never removed, since curations may refer to them. New alleles are created with the parts
+of their names (see `Allele.set_name_parts`), since they're created in bulk rather than
+saved one at a time.
+
+On PostgreSQL, the release is copied into a temporary table with `COPY`, and merged into
+the allele table with a couple of queries. Elsewhere (i.e. SQLite), it's merged in
+batches with the ORM.
+"""
+
+import itertools
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Set
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connection, transaction
+from django.utils import timezone
+
+from hci.imgt import ImgtAllele, ImgtException, read_allelelist, read_hla_nom
+from hci.models import Allele
+
+DEFAULT_BATCH_SIZE = 5_000
+
+
+def _check_not_empty(alleles: Iterable[ImgtAllele]) -> Iterator[ImgtAllele]:
+    """Pass the alleles on, making sure there's at least one.
+
+    A release with no alleles is almost certainly the wrong file, and loading it would
+    mark every allele as deleted.
+
+    :raises ImgtException: If there are no alleles.
+    """
+    is_empty = True
+    for allele in alleles:
+        is_empty = False
+        yield allele
+    if is_empty:
+        raise ImgtException("No alleles found")
+
+
+def _check_unique(alleles: Iterable[ImgtAllele]) -> Iterator[ImgtAllele]:
+    """Pass the alleles on, making sure no name is repeated.
+
+    A repeated name would otherwise be written twice, and fail the table's unique
+    constraint (or the temporary table's primary key) partway through the load.
+
+    :raises ImgtException: If a name is repeated.
+    """
+    names: Set[str] = set()
+    for allele in alleles:
+        if allele.imgt_name in names:
+            raise ImgtException(f"{allele.imgt_name} is listed more than once")
+        names.add(allele.imgt_name)
+        yield allele
+
+
+def _get_allele(allele: ImgtAllele) -> Allele:
+    """Return a new allele for an allele in a release, with the parts of its name."""
+    new_allele = Allele(**allele._asdict())
+    new_allele.set_name_parts()
+    return new_allele
+
+
+def _load_alleles_with_copy(alleles: Iterable[ImgtAllele]) -> Dict[str, int]:
+    """Merge the alleles into the allele table with `COPY` (PostgreSQL only)."""
+    # pylint: disable-next=protected-access,no-member
+    table = connection.ops.quote_name(Allele._meta.db_table)
+    release_fields = ("imgt_name", "is_deleted", *Allele.NAME_PARTS)
+    columns = ", ".join(release_fields)
+    name_part_columns = "".join(f", {part} varchar" for part in Allele.NAME_PARTS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE TEMPORARY TABLE hci_allele_release "
+            f"(imgt_name varchar PRIMARY KEY, is_deleted boolean{name_part_columns}) "
+            "ON COMMIT DROP"
+        )
+        with cursor.copy(f"COPY hci_allele_release ({columns}) FROM STDIN") as copy:
+            for allele in alleles:
+                new_allele = _get_allele(allele)
+                copy.write_row([getattr(new_allele, f) for f in release_fields])
+        # The system column `xmax` is 0 for inserted rows, and nonzero for updated ones.
+        cursor.execute(
+            f"""
+            WITH merged AS (
+                INSERT INTO {table} (car_id, {columns})
+                SELECT '', {columns} FROM hci_allele_release
+                ON CONFLICT (imgt_name)
+                DO UPDATE SET is_deleted = EXCLUDED.is_deleted, modified = now()
+                WHERE {table}.is_deleted <> EXCLUDED.is_deleted
+                RETURNING xmax = 0 AS inserted
+            )
+            SELECT
+                count(*) FILTER (WHERE inserted),
+                count(*) FILTER (WHERE NOT inserted)
+            FROM merged
+            """
+        )
+        num_created, num_updated = cursor.fetchone()
+        cursor.execute(
+            f"""
+            UPDATE {table} SET is_deleted = true, modified = now()
+            WHERE NOT is_deleted AND NOT EXISTS (
+                SELECT FROM hci_allele_release
+                WHERE hci_allele_release.imgt_name = {table}.imgt_name
+            )
+            """
+        )
+        num_removed = cursor.rowcount
+        cursor.execute("SELECT count(*) FROM hci_allele_release")
+        (num_alleles,) = cursor.fetchone()
+    return {
+        "created": num_created,
+        "updated": num_updated + num_removed,
+        "unchanged": num_alleles - num_created - num_updated,
+    }
+
+
+def _load_alleles_in_batches(
+    alleles: Iterable[ImgtAllele], batch_size: int
+) -> Dict[str, int]:
+    """Merge the alleles into the allele table in batches, with the ORM."""
+    counts = {"created": 0, "updated": 0, "unchanged": 0}
+    modified = timezone.now()
+    # The names in the release, to find the alleles that aren't in it. (Tens of
+    # thousands of names take a few megabytes.)
+    release_names: Set[str] = set()
+    for batch in itertools.batched(alleles, batch_size):
+        batch_alleles = {allele.imgt_name: allele for allele in batch}
+        release_names.update(batch_alleles)
+        existing = Allele.objects.filter(imgt_name__in=batch_alleles).only(
+            "imgt_name", "is_deleted"
+        )
+        changed = []
+        for allele in existing:
+            is_deleted = batch_alleles.pop(allele.imgt_name).is_deleted
+            if allele.is_deleted != is_deleted:
+                allele.is_deleted = is_deleted
+                allele.modified = modified
+                changed.append(allele)
+        Allele.objects.bulk_update(
+            changed, ["is_deleted", "modified"], batch_size=batch_size
+        )
+        Allele.objects.bulk_create(
+            [_get_allele(allele) for allele in batch_alleles.values()],
+            batch_size=batch_size,
+        )
+        counts["created"] += len(batch_alleles)
+        counts["updated"] += len(changed)
+        counts["unchanged"] += len(batch) - len(batch_alleles) - len(changed)
+    removed = [
+        pk
+        for pk, imgt_name in Allele.objects.filter(is_deleted=False)
+        .values_list("pk", "imgt_name")
+        .iterator(chunk_size=batch_size)
+        if imgt_name not in release_names
+    ]
+    for pks in itertools.batched(removed, batch_size):
+        Allele.objects.filter(pk__in=pks).update(is_deleted=True, modified=modified)
+    counts["updated"] += len(removed)
+    return counts
+
+
+def load_alleles(alleles: Iterable[ImgtAllele], batch_size: int) -> Dict[str, int]:
+    """Make the alleles in the database match the alleles in a release.
+
+    :raises ImgtException: If the release has no alleles, lists an allele more than
+        once, or can't be read. Nothing is changed if so.
+    :returns: How many alleles were created, updated (marked as deleted or not), and
+        already up to date.
+    """
+    alleles = _check_unique(_check_not_empty(alleles))
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            return _load_alleles_with_copy(alleles)
+        return _load_alleles_in_batches(alleles, batch_size)
+
+
+class Command(BaseCommand):
+    """Load the alleles in a release of the IPD-IMGT/HLA Database."""
+
+    help = "Load the alleles in a release of the IPD-IMGT/HLA Database"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add the command's arguments."""
+        parser.add_argument(
+            "path", type=Path, help="The Allelelist.txt or hla_nom.txt file to load"
+        )
+        parser.add_argument(
+            "--format",
+            choices=["allelelist", "hla_nom"],
+            default=None,
+            help="The format of the file (defaults to the format the file is named for)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="How many alleles to write at a time (without PostgreSQL)",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Load the alleles in the file, and report how many alleles changed."""
+        path: Path = options["path"]
+        file_format = options["format"]
+        if file_format is None:
+            if path.name.lower().startswith("allelelist"):
+                file_format = "allelelist"
+            elif path.name.lower().startswith("hla_nom"):
+                file_format = "hla_nom"
+            else:
+                raise CommandError(f"Unable to tell the format of {path}; use --format")
+        read_alleles = read_allelelist if file_format == "allelelist" else read_hla_nom
+        start = time.monotonic()
+        try:
+            with path.open(encoding="utf-8") as f:
+                counts = load_alleles(read_alleles(f), options["batch_size"])
+        except (ImgtException, OSError) as err:
+            raise CommandError(f"Unable to load {path}: {err}") from err
+        elapsed = time.monotonic() - start
+        self.stdout.write(
+            # Style's methods are made for each of Django's color roles at runtime.
+            # pylint: disable-next=no-member
+            self.style.SUCCESS(
+                f"Loaded {path} in {elapsed:.1f}s: {counts['created']} alleles "
+                f"created, {counts['updated']} updated, {counts['unchanged']} unchanged"
+            )
+        )
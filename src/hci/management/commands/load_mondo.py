@@ -0,0 +1,101 @@
+"""Load the diseases in a release of the Mondo Disease Ontology.
+
+Run this with a local copy of a Mondo release (e.g. `mondo.obo` or `mondo.json`)
+whenever a new release should be made available to curators. Terms are read as a stream
+and upserted in batches, so loading a release takes constant memory and a handful of
+queries per batch. Terms that haven't changed since the last release loaded aren't
+written.
+"""
+
+import itertools
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import transaction
+
+from hci.models import Disease
+from hci.mondo import MondoException, MondoTerm, read_json, read_obo
+
+DEFAULT_BATCH_SIZE = 5_000
+
+
+def load_terms(terms: Iterable[MondoTerm], batch_size: int) -> Dict[str, int]:
+    """Create or update a disease for each term.
+
+    :returns: How many diseases were created, updated, and already up to date.
+    """
+    counts = {"created": 0, "updated": 0, "unchanged": 0}
+    for batch in itertools.batched(terms, batch_size):
+        existing = {
+            mondo_id: MondoTerm(mondo_id, name, is_obsolete)
+            for mondo_id, name, is_obsolete in Disease.objects.filter(
+                mondo_id__in=[term.mondo_id for term in batch]
+            ).values_list("mondo_id", "name", "is_obsolete")
+        }
+        # A term can only be in a batch once, or the upsert would update the same row
+        # twice. The first one in the file wins, as it does when reading OBO tags.
+        changed = {}
+        for term in batch:
+            if term.mondo_id in changed or existing.get(term.mondo_id) == term:
+                continue
+            changed[term.mondo_id] = term
+        if changed:
+            with transaction.atomic():
+                Disease.objects.bulk_create(
+                    [Disease(**term._asdict()) for term in changed.values()],
+                    update_conflicts=True,
+                    unique_fields=["mondo_id"],
+                    update_fields=["name", "is_obsolete"],
+                )
+        num_updated = sum(mondo_id in existing for mondo_id in changed)
+        counts["created"] += len(changed) - num_updated
+        counts["updated"] += num_updated
+        counts["unchanged"] += len(batch) - len(changed)
+    return counts
+
+
+class Command(BaseCommand):
+    """Load the diseases in a release of the Mondo Disease Ontology."""
+
+    help = "Load the diseases in a release of the Mondo Disease Ontology"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add the command's arguments."""
+        parser.add_argument("path", type=Path, help="The Mondo release file to load")
+        parser.add_argument(
+            "--format",
+            choices=["obo", "json"],
+            default=None,
+            help="The format of the file (defaults to the file's extension)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="How many terms to write at a time",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Load the terms in the file, and report how many diseases changed."""
+        path: Path = options["path"]
+        file_format = options["format"] or path.suffix.removeprefix(".").lower()
+        if file_format not in ("obo", "json"):
+            raise CommandError(f"Unable to tell the format of {path}; use --format")
+        read_terms = read_obo if file_format == "obo" else read_json
+        start = time.monotonic()
+        try:
+            with path.open(encoding="utf-8") as f:
+                counts = load_terms(read_terms(f), options["batch_size"])
+        except (MondoException, OSError) as err:
+            raise CommandError(f"Unable to load {path}: {err}") from err
+        elapsed = time.monotonic() - start
+        self.stdout.write(
+            # Style's methods are made for each of Django's color roles at runtime.
+            # pylint: disable-next=no-member
+            self.style.SUCCESS(
+                f"Loaded {path} in {elapsed:.1f}s: {counts['created']} diseases "
+                f"created, {counts['updated']} updated, {counts['unchanged']} unchanged"
+            )
+        )
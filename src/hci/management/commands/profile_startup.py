@@ -0,0 +1,158 @@
+"""Report how long the HCI takes to start up, and which imports the time is spent on.
+
+The target is started in a new Python process with `-X importtime`, so nothing this
+command has already imported is counted:
+
+- "setup" sets up Django, as every management command (e.g. a migration task) does.
+- "checks" also runs the system checks, as most management commands do.
+- "wsgi" loads the WSGI application, as each new server does before its first request.
+
+The slowest imports are listed, including the time spent importing the modules they
+import, followed by the time spent importing each top-level package. Use this to find
+modules that should only be imported when they're needed (see e.g. `hci.scoring`).
+Python doesn't time the modules Django imports by name (e.g. each app's `models`), so
+they aren't listed themselves, but the modules they import are.
+"""
+
+import os
+import re
+import subprocess
+import sys
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+# The code that starts each target.
+TARGETS = {
+    "setup": "import django; django.setup()",
+    "checks": (
+        "import django; django.setup(); "
+        "from django.core import checks; checks.run_checks()"
+    ),
+    "wsgi": "import config.wsgi",
+}
+
+DEFAULT_LIMIT = 25
+
+# A line of the report written by `-X importtime`, e.g.
+# "import time:       307 |      29281 |   pydantic".
+_IMPORT_TIME = re.compile(r"import time:\s*(\d+) \|\s*(\d+) \| *(\S+)")
+
+
+class ImportTime(NamedTuple):
+    """Hold how long a module took to import, in microseconds."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_import_times(lines: Iterable[str]) -> List[ImportTime]:
+    """Return the import times in the report written by `-X importtime`.
+
+    Lines that aren't import times (e.g. the header, or errors) are ignored.
+    """
+    import_times = []
+    for line in lines:
+        match = _IMPORT_TIME.match(line)
+        if match:
+            import_times.append(ImportTime(match[3], int(match[1]), int(match[2])))
+    return import_times
+
+
+def get_package_times(import_times: Iterable[ImportTime]) -> Dict[str, int]:
+    """Return how long each top-level package took to import, slowest first."""
+    package_times: Dict[str, int] = {}
+    for import_time in import_times:
+        package = import_time.module.partition(".")[0]
+        package_times[package] = package_times.get(package, 0) + import_time.self_us
+    return dict(sorted(package_times.items(), key=lambda item: -item[1]))
+
+
+def profile_startup(target: str) -> Tuple[float, List[ImportTime]]:
+    """Start the target in a new process.
+
+    :raises CommandError: If the target fails to start.
+    :returns: How long (in seconds) the target took to start, and its import times.
+    """
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"{TARGETS[target]}; "
+        "print(time.perf_counter() - start)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        check=False,
+        cwd=settings.BASE_DIR,
+        env=os.environ.copy(),
+        text=True,
+    )
+    if result.returncode != 0:
+        errors = [
+            line
+            for line in result.stderr.splitlines()
+            if not line.startswith("import time:")
+        ]
+        raise CommandError(f"Unable to start {target}:\n" + "\n".join(errors[-20:]))
+    elapsed = float(result.stdout.splitlines()[-1])
+    return elapsed, parse_import_times(result.stderr.splitlines())
+
+
+class Command(BaseCommand):
+    """Report how long the HCI takes to start up, and which imports it's spent on."""
+
+    help = "Report how long the HCI takes to start up, and what it imports"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add the command's arguments."""
+        parser.add_argument(
+            "target",
+            nargs="?",
+            choices=list(TARGETS),
+            default="setup",
+            help="What to start (defaults to setting up Django)",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=DEFAULT_LIMIT,
+            help="How many imports and packages to list",
+        )
+        parser.add_argument(
+            "--sort",
+            choices=["cumulative", "self"],
+            default="cumulative",
+            help=(
+                "Sort imports by the time including the modules they import "
+                "(cumulative), or excluding them (self)"
+            ),
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Start the target, and report the slowest imports."""
+        target = options["target"]
+        limit = options["limit"]
+        elapsed, import_times = profile_startup(target)
+        total_us = sum(import_time.self_us for import_time in import_times)
+        self.stdout.write(
+            # Style's methods are made for each of Django's color roles at runtime.
+            # pylint: disable-next=no-member
+            self.style.SUCCESS(
+                f"Started {target} in {elapsed:.3f}s (importing {len(import_times)} "
+                f"modules took {total_us / 1e6:.3f}s, including Python's own startup)"
+            )
+        )
+        key = "cumulative_us" if options["sort"] == "cumulative" else "self_us"
+        slowest = sorted(import_times, key=lambda t: -getattr(t, key))[:limit]
+        self.stdout.write("\nSlowest imports (cumulative ms, self ms, module):")
+        for import_time in slowest:
+            self.stdout.write(
+                f"{import_time.cumulative_us / 1000:10.1f} "
+                f"{import_time.self_us / 1000:8.1f}  {import_time.module}"
+            )
+        package_times = list(get_package_times(import_times).items())
+        self.stdout.write("\nSlowest packages (ms, package):")
+        for package, package_us in package_times[:limit]:
+            self.stdout.write(f"{package_us / 1000:10.1f}  {package}")
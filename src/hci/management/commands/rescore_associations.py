@@ -0,0 +1,224 @@
+"""Recalculate the score of every association.
+
+Run this whenever the scoring framework in `score.steps` is revised, giving the new
+version of the framework. If the associations were scored with the previous version,
+give that too (with `--changed-since`), and only the associations that selected an
+option whose points changed, or that were scored with some other version, are rescored.
+The other associations keep their score, and the version it was calculated with, since
+it's the same in the new version.
+
+Associations are split into primary key ranges, and each range is scored by a worker
+process. Workers read just the fields needed for scoring, as rows rather than model
+instances, and write the scores back in short transactions, so the database is never
+held for long.
+"""
+
+import itertools
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Tuple
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection, connections, transaction
+from django.db.models import Max, Min, Q, QuerySet
+
+from hci.models import Association, AssociationQuerySet
+from hci.scoring import get_selected_options_filter
+from score.steps import (
+    DEFAULT_FRAMEWORK_VERSION,
+    get_changed_options,
+    get_framework_versions,
+    get_steps,
+)
+
+DEFAULT_RANGE_SIZE = 20_000
+DEFAULT_BATCH_SIZE = 1_000
+
+
+def get_associations(
+    version: str, changed_since: str | None, stale: bool = False
+) -> AssociationQuerySet:
+    """Return the associations whose scores could change with the given version.
+
+    :param changed_since: The version the associations were scored with. If not given,
+        every association is returned. If given, the associations that were scored with
+        another version (neither `changed_since` nor `version`) are returned too, since
+        it isn't known what changed since theirs.
+    :param stale: Only return the associations whose scores are stale, i.e. that were
+        changed without being rescored.
+    """
+    associations = Association.objects.all()
+    if stale:
+        associations = associations.filter(score_is_stale=True)
+    if changed_since is None:
+        return associations
+    changed_options = get_changed_options(get_steps(changed_since), get_steps(version))
+    return associations.filter(
+        get_selected_options_filter(changed_options)
+        | ~Q(score_framework_version__in=[changed_since, version])
+    )
+
+
+def rescore_range(
+    pk_range: Tuple[int, int],
+    batch_size: int,
+    version: str,
+    changed_since: str | None = None,
+    stale: bool = False,
+) -> int:
+    """Recalculate the scores of the associations in the given primary key range.
+
+    :param pk_range: The first and last primary keys of the range.
+    :param changed_since: The version the associations were scored with. If given, only
+        the associations whose scores could change are rescored.
+    :param stale: Only rescore the associations whose scores are stale.
+    :returns: The number of associations rescored.
+    """
+    rows = (
+        get_associations(version, changed_since, stale)
+        .filter(pk__range=pk_range)
+        .order_by("pk")
+        .values_list(*Association.RESCORE_ROW_FIELDS)
+        .iterator(chunk_size=batch_size)
+    )
+    if connection.vendor != "postgresql":
+        # Only PostgreSQL reads through a server-side cursor. Elsewhere (i.e. SQLite)
+        # an open cursor holds a read lock, which would block the other workers'
+        # writes, so read the whole range before writing any of it.
+        rows = iter(list(rows))
+    num_rescored = 0
+    for batch in itertools.batched(rows, batch_size):
+        associations = Association.get_rescored(batch, version)
+        with transaction.atomic():
+            Association.objects.bulk_update(
+                associations,
+                ["score_framework_version", *Association.SCORE_RESULT_FIELDS],
+            )
+        num_rescored += len(associations)
+    return num_rescored
+
+
+def get_pk_ranges(
+    associations: QuerySet[Association], range_size: int
+) -> Tuple[Tuple[int, int], ...]:
+    """Split the associations' primary keys into ranges of at most `range_size`."""
+    bounds = associations.aggregate(first=Min("pk"), last=Max("pk"))
+    if bounds["first"] is None:
+        return ()
+    return tuple(
+        (first_pk, min(first_pk + range_size - 1, bounds["last"]))
+        for first_pk in range(bounds["first"], bounds["last"] + 1, range_size)
+    )
+
+
+class Command(BaseCommand):
+    """Recalculate the score of every association."""
+
+    help = "Recalculate the score of every association"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add the command's arguments."""
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=multiprocessing.cpu_count(),
+            help="How many worker processes to score with (1 scores in this process)",
+        )
+        parser.add_argument(
+            "--range-size",
+            type=int,
+            default=DEFAULT_RANGE_SIZE,
+            help="How many primary keys to give a worker at a time",
+        )
+        parser.add_argument(
+            "--framework-version",
+            choices=get_framework_versions(),
+            default=DEFAULT_FRAMEWORK_VERSION,
+            help="The version of the scoring framework to score with",
+        )
+        parser.add_argument(
+            "--changed-since",
+            choices=get_framework_versions(),
+            default=None,
+            help="The version the associations were scored with, to rescore only the "
+            "associations whose scores could change",
+        )
+        parser.add_argument(
+            "--stale",
+            action="store_true",
+            help="Only rescore the associations that were changed without being "
+            "rescored",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="How many associations to read and write at a time",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Rescore the associations, reporting progress as ranges are finished."""
+        associations = get_associations(
+            options["framework_version"], options["changed_since"], options["stale"]
+        )
+        pk_ranges = get_pk_ranges(associations, options["range_size"])
+        total = associations.count()
+        self.stdout.write(
+            f"Rescoring {total} associations in {len(pk_ranges)} ranges "
+            f"with {options['workers']} worker(s), using framework version "
+            f"{options['framework_version']}"
+        )
+        start = time.monotonic()
+        num_rescored = 0
+
+        def report(num_rescored_in_range: int) -> None:
+            nonlocal num_rescored
+            num_rescored += num_rescored_in_range
+            elapsed = time.monotonic() - start
+            self.stdout.write(
+                f"  Rescored {num_rescored}/{total} associations "
+                f"({num_rescored / max(elapsed, 1e-9):.0f}/s)"
+            )
+
+        if options["workers"] <= 1:
+            for pk_range in pk_ranges:
+                report(
+                    rescore_range(
+                        pk_range,
+                        options["batch_size"],
+                        options["framework_version"],
+                        options["changed_since"],
+                        options["stale"],
+                    )
+                )
+        else:
+            # Workers are forked, so close the database connections first; otherwise
+            # the workers would share them.
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=options["workers"],
+                mp_context=multiprocessing.get_context("fork"),
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        rescore_range,
+                        pk_range,
+                        options["batch_size"],
+                        options["framework_version"],
+                        options["changed_since"],
+                        options["stale"],
+                    )
+                    for pk_range in pk_ranges
+                ]
+                for future in as_completed(futures):
+                    report(future.result())
+
+        elapsed = time.monotonic() - start
+        self.stdout.write(
+            # Style's methods are made for each of Django's color roles at runtime.
+            # pylint: disable-next=no-member
+            self.style.SUCCESS(
+                f"Rescored {num_rescored} associations in {elapsed:.1f}s"
+            )
+        )
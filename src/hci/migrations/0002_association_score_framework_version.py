@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hci", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="association",
+            name="score_framework_version",
+            field=models.CharField(default="v1"),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hci", "0002_association_score_framework_version"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="association",
+            name="additional_phenotypes",
+            field=models.CharField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="allele_field_resolution",
+            field=models.CharField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="cohort_size",
+            field=models.CharField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="low_field_resolution",
+            field=models.CharField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="p_value_type",
+            field=models.CharField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="phase",
+            field=models.CharField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="typing_method",
+            field=models.CharField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="weighing_association",
+            field=models.CharField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="zygosity",
+            field=models.CharField(db_index=True),
+        ),
+    ]
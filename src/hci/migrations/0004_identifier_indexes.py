@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hci", "0003_index_association_step_options"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="allele",
+            name="car_id",
+            field=models.CharField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="allele",
+            name="imgt_name",
+            field=models.CharField(unique=True),
+        ),
+        migrations.AlterField(
+            model_name="curator",
+            name="affiliation_id",
+            field=models.IntegerField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="disease",
+            name="mondo_id",
+            field=models.CharField(unique=True),
+        ),
+        migrations.AddConstraint(
+            model_name="publication",
+            constraint=models.UniqueConstraint(
+                fields=("publication_id", "publication_type"),
+                name="unique_publication_id_and_type",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hci", "0004_identifier_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="disease",
+            name="is_obsolete",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="disease",
+            name="name",
+            field=models.CharField(default=""),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hci", "0005_disease_name_and_is_obsolete"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="allele",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AlterField(
+            model_name="allele",
+            name="car_id",
+            field=models.CharField(db_index=True, default=""),
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:14
+
+import itertools
+import re
+
+from django.db import migrations, models
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+from django.db.migrations.state import StateApps
+
+# An allele name, e.g. "HLA-A*01:01:01:02N", as `hci.imgt.parse_allele_name` parsed it
+# when this migration was written.
+ALLELE_NAME = re.compile(
+    r"(?:HLA-)?(?P<gene>[A-Z0-9]+)(?:\*(?P<fields>\d+(?::\d+){0,3})(?P<suffix>[A-Z]?))?"
+)
+
+BATCH_SIZE = 5_000
+
+
+def set_name_parts(apps: StateApps, _schema_editor: BaseDatabaseSchemaEditor) -> None:
+    """Set the parts of the names of the alleles that already exist.
+
+    Alleles whose names aren't allele names are left as they are.
+    """
+    Allele = apps.get_model("hci", "Allele")
+    alleles = Allele.objects.only("imgt_name").order_by("pk")
+    for batch in itertools.batched(alleles.iterator(chunk_size=BATCH_SIZE), BATCH_SIZE):
+        parsed_alleles = []
+        for allele in batch:
+            match = ALLELE_NAME.fullmatch(allele.imgt_name)
+            if match is None:
+                continue
+            allele.gene = match["gene"]
+            fields = match["fields"].split(":") if match["fields"] else []
+            fields += [""] * (4 - len(fields))
+            allele.field_1, allele.field_2, allele.field_3, allele.field_4 = fields
+            allele.expression_suffix = match["suffix"] or ""
+            parsed_alleles.append(allele)
+        Allele.objects.bulk_update(
+            parsed_alleles,
+            ["gene", "field_1", "field_2", "field_3", "field_4", "expression_suffix"],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hci", "0006_allele_is_deleted"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="allele",
+            name="expression_suffix",
+            field=models.CharField(default=""),
+        ),
+        migrations.AddField(
+            model_name="allele",
+            name="field_1",
+            field=models.CharField(default=""),
+        ),
+        migrations.AddField(
+            model_name="allele",
+            name="field_2",
+            field=models.CharField(default=""),
+        ),
+        migrations.AddField(
+            model_name="allele",
+            name="field_3",
+            field=models.CharField(default=""),
+        ),
+        migrations.AddField(
+            model_name="allele",
+            name="field_4",
+            field=models.CharField(default=""),
+        ),
+        migrations.AddField(
+            model_name="allele",
+            name="gene",
+            field=models.CharField(default=""),
+        ),
+        migrations.AddIndex(
+            model_name="allele",
+            index=models.Index(
+                fields=["gene", "field_1", "field_2", "field_3", "field_4"],
+                name="allele_nomenclature_idx",
+            ),
+        ),
+        migrations.RunPython(set_name_parts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:15
+
+import hashlib
+import itertools
+
+from django.db import migrations, models
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+from django.db.migrations.state import StateApps
+
+BATCH_SIZE = 1_000
+
+
+def set_fingerprints(apps: StateApps, _schema_editor: BaseDatabaseSchemaEditor) -> None:
+    """Set the fingerprints of the haplotypes that already exist.
+
+    This hashes them as `Haplotype.get_fingerprint` did when this migration was written.
+    """
+    Haplotype = apps.get_model("hci", "Haplotype")
+    haplotypes = Haplotype.objects.order_by("pk").prefetch_related(
+        "constituent_alleles"
+    )
+    for batch in itertools.batched(haplotypes.iterator(BATCH_SIZE), BATCH_SIZE):
+        for haplotype in batch:
+            allele_ids = sorted(
+                allele.pk for allele in haplotype.constituent_alleles.all()
+            )
+            order = haplotype.chromosome_mapping_order
+            text = f"{order}\n{','.join(map(str, allele_ids))}"
+            haplotype.fingerprint = hashlib.sha256(text.encode()).hexdigest()
+        Haplotype.objects.bulk_update(batch, ["fingerprint"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hci", "0007_allele_nomenclature"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="haplotype",
+            name="fingerprint",
+            field=models.CharField(db_index=True, default=""),
+        ),
+        migrations.RunPython(set_fingerprints, migrations.RunPython.noop),
+    ]
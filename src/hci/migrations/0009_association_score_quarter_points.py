@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:18
+
+from django.db import migrations, models
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+from django.db.migrations.state import StateApps
+from django.db.models.functions import Cast, Round
+
+
+def copy_scores(apps: StateApps, _schema_editor: BaseDatabaseSchemaEditor) -> None:
+    """Copy the scores into quarter points, and mark them as stale.
+
+    Scores weren't calculated when associations were saved, so they should all be
+    recalculated, with `rescore_associations --stale`.
+    """
+    Association = apps.get_model("hci", "Association")
+    Association.objects.update(
+        score_quarter_points=Cast(
+            Round(models.F("score") * 4), output_field=models.IntegerField()
+        ),
+        score_is_stale=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hci", "0008_haplotype_fingerprint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="association",
+            name="score_is_stale",
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.AddField(
+            model_name="association",
+            name="score_quarter_points",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(copy_scores, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="association",
+            name="score",
+        ),
+    ]
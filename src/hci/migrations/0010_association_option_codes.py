@@ -0,0 +1,248 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:21
+
+import functools
+import itertools
+
+from django.db import migrations, models
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+from django.db.migrations.state import StateApps
+
+import hci.scoring
+
+# The names of the options of the steps, indexed by their codes, as they were when this
+# migration was written.
+OPTION_NAMES = {
+    "1B": ("1-field", "2-field", "3-field, G-group, P-group", "4-field"),
+    "1C": ("Monoallelic (heterozygous)", "Biallelic (homozygous)"),
+    "1D": ("Phase not confirmed", "Phase confirmed"),
+    "2": (
+        "Tag SNPs or Microarrays",
+        "Serological",
+        "Imputation",
+        "Low Resolution Typing",
+        "High Resolution Typing",
+        "Whole Exome Sequencing",
+        "Sanger Sequencing-Based Typing",
+        "Whole Gene Sequencing",
+        "Whole Genome Sequencing and/or Panel-Based NGS (>50x coverage)",
+    ),
+    "3A": (
+        "GWAS >=1x10e-5, Non-GWAS >=0.05",
+        "GWAS <1x10e-5, Non-GWAS <0.05",
+        "GWAS <5x10e-8, Non-GWAS <0.01",
+        "GWAS <1x10e-11, Non-GWAS <0.0005",
+        "GWAS <1x10e-14, Non-GWAS <0.0001",
+    ),
+    "3B": ("Overall correction for multiple testing", "2-step p-value correction"),
+    "3C": (
+        "OR/RR: ≥2 or ≤0.5, Beta: ≥0.5 or ≤-0.5",
+        "CI does not cross 1 (OR/RR) or 0 (beta)",
+    ),
+    "4": (
+        "GWAS <1,000, Non-GWAS <50",
+        "GWAS 1,000-2,499, Non-GWAS 50-99",
+        "GWAS 2,500-4,999, Non-GWAS 100-249",
+        "GWAS 5,000-9,999, Non-GWAS 250-499",
+        "GWAS >=10,000, Non-GWAS >=500",
+    ),
+    "5": ("specific disease-related phenotype", "only disease tested"),
+    "6A": (
+        "significant association with disease",
+        "no significant association with disease",
+    ),
+    "6B": ("1-field resolution (from Step 1B)", ">1-field resolution"),
+}
+
+# The fields that hold the option selected for a single-select step.
+OPTION_FIELDS = {
+    "allele_field_resolution": "1B",
+    "zygosity": "1C",
+    "phase": "1D",
+    "typing_method": "2",
+    "p_value_type": "3A",
+    "cohort_size": "4",
+    "additional_phenotypes": "5",
+    "weighing_association": "6A",
+    "low_field_resolution": "6B",
+}
+
+# The fields that hold the options selected for a multi-select step.
+OPTIONS_FIELDS = {"multiple_testing_correction": "3B", "effect_size": "3C"}
+
+BATCH_SIZE = 1_000
+
+
+def encode_options(apps: StateApps, _schema_editor: BaseDatabaseSchemaEditor) -> None:
+    """Replace the names of the selected options with their codes.
+
+    Codes are written as text (or JSON numbers), which the fields are then converted to.
+    Options that aren't options of their step are replaced with null (or dropped from
+    bitmasks), and the associations they're in are marked as stale.
+    """
+    Association = apps.get_model("hci", "Association")
+    fields = [*OPTION_FIELDS, *OPTIONS_FIELDS]
+    associations = Association.objects.only(*fields, "score_is_stale").order_by("pk")
+    for batch in itertools.batched(associations.iterator(BATCH_SIZE), BATCH_SIZE):
+        for association in batch:
+            is_stale = False
+            for field, step_number in OPTION_FIELDS.items():
+                names = OPTION_NAMES[step_number]
+                name = getattr(association, field)
+                is_stale |= name not in names
+                code = str(names.index(name)) if name in names else None
+                setattr(association, field, code)
+            for field, step_number in OPTIONS_FIELDS.items():
+                names = OPTION_NAMES[step_number]
+                selected = set(getattr(association, field) or [])
+                is_stale |= not selected.issubset(names)
+                mask = sum(1 << names.index(name) for name in selected if name in names)
+                setattr(association, field, mask)
+            association.score_is_stale |= is_stale
+        Association.objects.bulk_update(batch, [*fields, "score_is_stale"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hci", "0009_association_score_quarter_points"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="association",
+            name="allele_field_resolution",
+            field=models.CharField(db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="zygosity",
+            field=models.CharField(db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="phase",
+            field=models.CharField(db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="typing_method",
+            field=models.CharField(db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="p_value_type",
+            field=models.CharField(db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="cohort_size",
+            field=models.CharField(db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="additional_phenotypes",
+            field=models.CharField(db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="weighing_association",
+            field=models.CharField(db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="low_field_resolution",
+            field=models.CharField(db_index=True, null=True),
+        ),
+        migrations.RunPython(encode_options, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="association",
+            name="additional_phenotypes",
+            field=models.PositiveSmallIntegerField(
+                choices=functools.partial(hci.scoring.get_option_choices, "5"),
+                db_index=True,
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="allele_field_resolution",
+            field=models.PositiveSmallIntegerField(
+                choices=functools.partial(hci.scoring.get_option_choices, "1B"),
+                db_index=True,
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="cohort_size",
+            field=models.PositiveSmallIntegerField(
+                choices=functools.partial(hci.scoring.get_option_choices, "4"),
+                db_index=True,
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="effect_size",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="low_field_resolution",
+            field=models.PositiveSmallIntegerField(
+                choices=functools.partial(hci.scoring.get_option_choices, "6B"),
+                db_index=True,
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="multiple_testing_correction",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="p_value_type",
+            field=models.PositiveSmallIntegerField(
+                choices=functools.partial(hci.scoring.get_option_choices, "3A"),
+                db_index=True,
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="phase",
+            field=models.PositiveSmallIntegerField(
+                choices=functools.partial(hci.scoring.get_option_choices, "1D"),
+                db_index=True,
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="typing_method",
+            field=models.PositiveSmallIntegerField(
+                choices=functools.partial(hci.scoring.get_option_choices, "2"),
+                db_index=True,
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="weighing_association",
+            field=models.PositiveSmallIntegerField(
+                choices=functools.partial(hci.scoring.get_option_choices, "6A"),
+                db_index=True,
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="zygosity",
+            field=models.PositiveSmallIntegerField(
+                choices=functools.partial(hci.scoring.get_option_choices, "1C"),
+                db_index=True,
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hci", "0010_association_option_codes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="association",
+            name="effect_size",
+            field=models.PositiveSmallIntegerField(db_index=True, default=0),
+        ),
+        migrations.AlterField(
+            model_name="association",
+            name="multiple_testing_correction",
+            field=models.PositiveSmallIntegerField(db_index=True, default=0),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:29
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hci", "0011_index_association_option_masks"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="allele",
+            name="modified",
+            field=models.DateTimeField(
+                auto_now=True, db_default=django.db.models.functions.datetime.Now()
+            ),
+        ),
+    ]
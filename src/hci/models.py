@@ -4,12 +4,78 @@ NOTE: The first line of the docstrings in this module do not need to be in the
 imperative mood.
 """
 
+import functools
+import hashlib
+import itertools
+from typing import Any, Collection, Dict, Iterable, List, Self, Sequence, Set, Tuple
+
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Now
+
+from hci.imgt import AlleleName, ImgtException, parse_allele_name
+from hci.scoring import (
+    ASSOCIATION_STEP_FIELDS,
+    MULTI_SELECT_FIELDS,
+    QUARTER_POINTS_PER_POINT,
+    SCORE_FIELDS,
+    get_masked_option_names,
+    get_option_choices,
+    get_option_names,
+    score_rows_in_quarter_points,
+)
+from score.constants import DEFAULT_FRAMEWORK_VERSION
 
 DECIMAL_PLACES = 5
 DECIMAL_MAX_DIGITS = 5
 
+# How many associations to rescore at a time.
+RESCORE_BATCH_SIZE = 1_000
+
+
+def get_option_code_field(step_number: str) -> models.PositiveSmallIntegerField:
+    """Return a field that holds the code of the option selected for a step.
+
+    The field's choices are the step's options (see `hci.scoring`). It's null if no
+    option has been selected.
+    """
+    return models.PositiveSmallIntegerField(
+        choices=functools.partial(get_option_choices, step_number),
+        db_index=True,
+        null=True,
+    )
+
+
+class NaturalKeyManager(models.Manager):
+    """Look up objects by their natural key: the fields that uniquely identify them."""
+
+    def __init__(self, *natural_key_fields: str) -> None:
+        super().__init__()
+        self.natural_key_fields = natural_key_fields
+
+    def get_by_natural_key(self, *natural_key: Any) -> Any:
+        """Return the object with the given natural key.
+
+        :raises DoesNotExist: If there's no such object.
+        """
+        return self.get(**dict(zip(self.natural_key_fields, natural_key)))
+
+    def get_or_create_by_natural_key(
+        self, *natural_key: Any, defaults: Dict[str, Any] | None = None
+    ) -> Tuple[Any, bool]:
+        """Return the object with the given natural key, creating it if necessary.
+
+        This is safe when the same object is created concurrently: the natural key has a
+        unique constraint, so only one insert succeeds, and the others get the object it
+        inserted.
+
+        :param defaults: Values for the other fields, if the object is created.
+        :returns: The object, and whether it was created.
+        """
+        return self.get_or_create(
+            defaults=defaults, **dict(zip(self.natural_key_fields, natural_key))
+        )
+
 
 class Disease(models.Model):
     """A disease is uniquely identified by its Mondo ID.
@@ -19,7 +85,45 @@ class Disease(models.Model):
     https://mondo.monarchinitiative.org
     """
 
-    mondo_id: models.CharField = models.CharField()
+    mondo_id: models.CharField = models.CharField(unique=True)
+    name: models.CharField = models.CharField(default="")
+    # Obsolete diseases are kept, since curations may refer to them, but shouldn't be
+    # used for new curations.
+    is_obsolete: models.BooleanField = models.BooleanField(default=False)
+
+    objects = NaturalKeyManager("mondo_id")
+
+    def natural_key(self) -> Tuple[str]:
+        """Return the Mondo ID."""
+        return (self.mondo_id,)
+
+
+class AlleleQuerySet(models.QuerySet):
+    """Query alleles by the parts of their names."""
+
+    def in_group(self, name: str, num_fields: int | None = None) -> "AlleleQuerySet":
+        """Return the alleles in a group, i.e. whose names start with the group's.
+
+        For example, the A*02 group has A*02:01, A*02:01:01:01, A*02:02, etc. This is a
+        range of the nomenclature index, so is quick however many alleles there are.
+
+        :param name: The name of the group (or allele), e.g. "HLA-A*02" or "A*02:01".
+        :param num_fields: Only return alleles whose names have this many fields, e.g. 2
+            for the 2-field alleles in the group.
+        :raises ImgtException: If the name isn't an allele name.
+        """
+        parsed = parse_allele_name(name)
+        filters = {"gene": parsed.gene}
+        for number, field in enumerate(parsed.fields, start=1):
+            filters[f"field_{number}"] = field
+        if parsed.expression_suffix:
+            filters["expression_suffix"] = parsed.expression_suffix
+        alleles = self.filter(**filters)
+        if num_fields is not None:
+            alleles = alleles.exclude(**{f"field_{num_fields}": ""})
+            if num_fields < len(Allele.NAME_FIELDS):
+                alleles = alleles.filter(**{f"field_{num_fields + 1}": ""})
+        return alleles
 
 
 class Allele(models.Model):
@@ -33,8 +137,87 @@ class Allele(models.Model):
     https://www.ebi.ac.uk/ipd/imgt/hla
     """
 
-    imgt_name: models.CharField = models.CharField()
-    car_id: models.CharField = models.CharField()
+    imgt_name: models.CharField = models.CharField(unique=True)
+    # The ClinGen Allele Registry ID, which isn't known for every allele.
+    car_id: models.CharField = models.CharField(db_index=True, default="")
+    # Deleted alleles are kept, since curations may refer to them, but shouldn't be
+    # used for new curations.
+    is_deleted: models.BooleanField = models.BooleanField(default=False)
+    # When the allele was last created or changed, so that processes holding allele
+    # names (see `hci.autocomplete`) can tell when to read them again. Bulk updates set
+    # this themselves.
+    modified: models.DateTimeField = models.DateTimeField(
+        auto_now=True, db_default=Now()
+    )
+
+    # The parts of the IPD-IMGT/HLA name, e.g. "A", "01", "01", "01", "02", and "N" for
+    # "HLA-A*01:01:01:02N", so alleles can be queried by group with an index. These are
+    # set from the name whenever an allele is saved (and by `load_imgt_alleles`), and
+    # are blank if the name isn't an allele name.
+    gene: models.CharField = models.CharField(default="")
+    field_1: models.CharField = models.CharField(default="")
+    field_2: models.CharField = models.CharField(default="")
+    field_3: models.CharField = models.CharField(default="")
+    field_4: models.CharField = models.CharField(default="")
+    expression_suffix: models.CharField = models.CharField(default="")
+
+    # The fields that hold the fields of the name, and all of the parts of the name.
+    NAME_FIELDS = ("field_1", "field_2", "field_3", "field_4")
+    NAME_PARTS = ("gene", *NAME_FIELDS, "expression_suffix")
+
+    objects = NaturalKeyManager.from_queryset(AlleleQuerySet)("imgt_name")
+
+    class Meta:
+        """Index the parts of the names, to query alleles by group."""
+
+        indexes = [
+            models.Index(
+                fields=["gene", "field_1", "field_2", "field_3", "field_4"],
+                name="allele_nomenclature_idx",
+            )
+        ]
+
+    def natural_key(self) -> Tuple[str]:
+        """Return the IPD-IMGT/HLA name."""
+        return (self.imgt_name,)
+
+    def set_name_parts(self) -> None:
+        """Set the parts of the name from the name."""
+        try:
+            parsed = parse_allele_name(self.imgt_name)
+        except ImgtException:
+            parsed = AlleleName(gene="", fields=(), expression_suffix="")
+        self.gene = parsed.gene
+        for number, field_name in enumerate(self.NAME_FIELDS):
+            field = parsed.fields[number] if number < len(parsed.fields) else ""
+            setattr(self, field_name, field)
+        self.expression_suffix = parsed.expression_suffix
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        """Save the allele, with the parts of its name."""
+        self.set_name_parts()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "imgt_name" in update_fields:
+            kwargs["update_fields"] = {*update_fields, *self.NAME_PARTS}
+        super().save(*args, **kwargs)
+
+
+class HaplotypeQuerySet(models.QuerySet):
+    """Find haplotypes by their chromosome mapping order and constituent alleles."""
+
+    def find(
+        self, chromosome_mapping_order: str, alleles: Iterable[Allele | int]
+    ) -> "HaplotypeQuerySet":
+        """Return the haplotypes with this order and exactly these alleles.
+
+        :param alleles: The alleles, or their IDs.
+        """
+        allele_ids = [
+            allele.pk if isinstance(allele, Allele) else allele for allele in alleles
+        ]
+        return self.filter(
+            fingerprint=Haplotype.get_fingerprint(chromosome_mapping_order, allele_ids)
+        )
 
 
 class Haplotype(models.Model):
@@ -51,6 +234,90 @@ class Haplotype(models.Model):
 
     chromosome_mapping_order: models.CharField = models.CharField()
     constituent_alleles: models.ManyToManyField = models.ManyToManyField(Allele)
+    # A hash of the chromosome mapping order and constituent alleles, so a haplotype
+    # with the same ones can be found with one indexed query (see `find`). It's kept up
+    # to date when the haplotype is saved, and when its alleles change (see
+    # `update_haplotype_fingerprints`).
+    fingerprint: models.CharField = models.CharField(db_index=True, default="")
+
+    objects = HaplotypeQuerySet.as_manager()
+
+    @staticmethod
+    def get_fingerprint(
+        chromosome_mapping_order: str, allele_ids: Iterable[int]
+    ) -> str:
+        """Return the fingerprint of a haplotype with this order and these alleles.
+
+        The alleles are a set, so their IDs are sorted first.
+        """
+        joined_ids = ",".join(str(allele_id) for allele_id in sorted(set(allele_ids)))
+        text = f"{chromosome_mapping_order}\n{joined_ids}"
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def set_fingerprint(self) -> None:
+        """Set the fingerprint from the chromosome mapping order and alleles."""
+        allele_ids = (
+            Allele.objects.filter(haplotype=self).values_list("pk", flat=True)
+            if self.pk
+            else []
+        )
+        self.fingerprint = self.get_fingerprint(
+            self.chromosome_mapping_order, allele_ids
+        )
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        """Save the haplotype, with its fingerprint."""
+        self.set_fingerprint()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "fingerprint"}
+        super().save(*args, **kwargs)
+
+
+def update_haplotype_fingerprints(
+    instance: models.Model,
+    action: str,
+    reverse: bool,
+    pk_set: Set[int] | None,
+    **_kwargs: Any,
+) -> None:
+    """Update the fingerprints of haplotypes whose constituent alleles changed.
+
+    This receives the `m2m_changed` signal of `Haplotype.constituent_alleles`, which is
+    sent with the haplotype as the instance, or (when the alleles' side of the relation
+    is changed, e.g. `allele.haplotype_set.add(...)`) an allele.
+    """
+    removed_allele_ids: Set[int] = set()
+    if not reverse:
+        if action not in ("post_add", "post_remove", "post_clear"):
+            return
+        haplotype_ids = {instance.pk}
+    elif action in ("post_add", "post_remove"):
+        haplotype_ids = pk_set or set()
+    elif action == "pre_clear":
+        # The haplotypes an allele is cleared from aren't sent once they're cleared, so
+        # their fingerprints are updated (without the allele) before, in the same
+        # transaction as the clear.
+        haplotype_ids = set(
+            Haplotype.objects.filter(constituent_alleles=instance.pk).values_list(
+                "pk", flat=True
+            )
+        )
+        removed_allele_ids = {instance.pk}
+    else:
+        return
+    for haplotype in Haplotype.objects.filter(pk__in=haplotype_ids).only(
+        "chromosome_mapping_order"
+    ):
+        allele_ids = Allele.objects.filter(haplotype=haplotype).values_list(
+            "pk", flat=True
+        )
+        Haplotype.objects.filter(pk=haplotype.pk).update(
+            fingerprint=Haplotype.get_fingerprint(
+                haplotype.chromosome_mapping_order,
+                set(allele_ids) - removed_allele_ids,
+            )
+        )
 
 
 class Publication(models.Model):
@@ -66,13 +333,116 @@ class Publication(models.Model):
     year: models.CharField = models.CharField()
     title: models.CharField = models.CharField()
 
+    objects = NaturalKeyManager("publication_id", "publication_type")
+
+    class Meta:
+        """Make sure each publication is only stored once."""
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=["publication_id", "publication_type"],
+                name="unique_publication_id_and_type",
+            )
+        ]
+
+    def natural_key(self) -> Tuple[str, str]:
+        """Return the ID and type."""
+        return (self.publication_id, self.publication_type)
+
 
 class Curator(models.Model):
     """A curator is a user with an affiliation."""
 
-    affiliation_id: models.IntegerField = models.IntegerField()
+    affiliation_id: models.IntegerField = models.IntegerField(db_index=True)
     user: models.OneToOneField = models.OneToOneField(User, on_delete=models.CASCADE)
 
+    objects: models.Manager["Curator"] = models.Manager()
+
+
+class AssociationQuerySet(models.QuerySet):
+    """Load only the fields of associations that are needed, and keep scores up to date.
+
+    Associations have dozens of fields, some of them long free text, so lists of them
+    should load just the fields they use. Fields that aren't loaded are still loaded if
+    they're accessed, with a query per association.
+
+    Saving an association scores it (see `Association.save`), and so do the bulk methods
+    here, which don't call `save`.
+    """
+
+    def for_listing(self) -> "AssociationQuerySet":
+        """Return the associations with just the fields lists of them show."""
+        return self.only(*Association.LISTED_FIELDS)
+
+    def bulk_create(
+        self, objs: Iterable["Association"], *args: Any, **kwargs: Any
+    ) -> Any:
+        """Score the associations, and create them."""
+        objs = list(objs)
+        Association.set_scores(objs)
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(
+        self,
+        objs: Iterable["Association"],
+        fields: Iterable[str],
+        *args: Any,
+        **kwargs: Any,
+    ) -> int:
+        """Update the fields of the associations, and their scores if they could change.
+
+        Associations that haven't changed since they were scored aren't rescored, and
+        neither are updates that set the scores too (e.g. from `rescore`).
+        """
+        objs = list(objs)
+        fields = list(fields)
+        if set(fields) & set(Association.SCORED_FIELDS) and set(fields).isdisjoint(
+            Association.SCORE_RESULT_FIELDS
+        ):
+            Association.set_scores([obj for obj in objs if obj.needs_rescoring()])
+            fields = [*fields, *Association.SCORE_RESULT_FIELDS]
+        return super().bulk_update(objs, set(fields), *args, **kwargs)
+
+    def update(self, **kwargs: Any) -> int:
+        """Update the associations, and rescore them if their scores could change.
+
+        The associations are marked as stale by the update, and rescored after it, so if
+        rescoring fails they can be found and rescored later. Only the associations this
+        updated are rescored, not others that were already stale. Updates that set the
+        scores too (e.g. from `bulk_update`) aren't rescored.
+        """
+        fields = set(kwargs)
+        if fields.isdisjoint(Association.SCORED_FIELDS) or not fields.isdisjoint(
+            Association.SCORE_RESULT_FIELDS
+        ):
+            return super().update(**kwargs)
+        # The primary keys are read first, since the update may change which
+        # associations match the filter.
+        with transaction.atomic():
+            pks = list(self.values_list("pk", flat=True))
+            num_updated = super().update(score_is_stale=True, **kwargs)
+        for batch in itertools.batched(pks, RESCORE_BATCH_SIZE):
+            Association.objects.filter(pk__in=batch, score_is_stale=True).rescore()
+        return num_updated
+
+    def rescore(self, batch_size: int = RESCORE_BATCH_SIZE) -> int:
+        """Recalculate the scores of the associations, with their framework versions.
+
+        :returns: The number of associations rescored.
+        """
+        rows = self.order_by("pk").values_list(*Association.RESCORE_ROW_FIELDS)
+        num_rescored = 0
+        for batch in itertools.batched(
+            rows.iterator(chunk_size=batch_size), batch_size
+        ):
+            associations = Association.get_rescored(batch)
+            with transaction.atomic():
+                Association.objects.bulk_update(
+                    associations, Association.SCORE_RESULT_FIELDS
+                )
+            num_rescored += len(associations)
+        return num_rescored
+
 
 class Association(models.Model):
     """An association is a relationship between a disease and an allele."""
@@ -82,9 +452,11 @@ class Association(models.Model):
     cohort_type: models.CharField = models.CharField()
     label: models.CharField = models.CharField()
 
-    allele_field_resolution: models.CharField = models.CharField()
+    allele_field_resolution: models.PositiveSmallIntegerField = get_option_code_field(
+        "1B"
+    )
     is_haplotype: models.BooleanField = models.BooleanField()
-    zygosity: models.CharField = models.CharField()
+    zygosity: models.PositiveSmallIntegerField = get_option_code_field("1C")
 
     # Allele identification methods:
     allele_name_in_publication: models.CharField = models.CharField()
@@ -146,15 +518,178 @@ class Association(models.Model):
     p_value: models.DecimalField = models.DecimalField(
         decimal_places=DECIMAL_PLACES, max_digits=DECIMAL_MAX_DIGITS
     )
-    p_value_type: models.CharField = models.CharField()
+    p_value_type: models.PositiveSmallIntegerField = get_option_code_field("3A")
     is_conditional: models.BooleanField = models.BooleanField()
     condition_on: models.TextField = models.TextField()
 
     direction_of_effect: models.CharField = models.CharField()
     comments: models.TextField = models.TextField()
-    score: models.DecimalField = models.DecimalField(
-        decimal_places=DECIMAL_PLACES, max_digits=DECIMAL_MAX_DIGITS
+
+    # Score (the options selected for the scoring steps that don't have a field
+    # above). See `hci.scoring` for which field holds the option(s) for each step, and
+    # the option codes they hold. The fields are indexed, so that the associations that
+    # selected an option can be found without scanning the table. The fields that hold
+    # the options of a multi-select step hold a bitmask of their codes, and the
+    # bitmasks with an option's bit set are looked up in the index.
+    phase: models.PositiveSmallIntegerField = get_option_code_field("1D")
+    typing_method: models.PositiveSmallIntegerField = get_option_code_field("2")
+    multiple_testing_correction: models.PositiveSmallIntegerField = (
+        models.PositiveSmallIntegerField(db_index=True, default=0)
+    )
+    effect_size: models.PositiveSmallIntegerField = models.PositiveSmallIntegerField(
+        db_index=True, default=0
     )
+    cohort_size: models.PositiveSmallIntegerField = get_option_code_field("4")
+    additional_phenotypes: models.PositiveSmallIntegerField = get_option_code_field("5")
+    weighing_association: models.PositiveSmallIntegerField = get_option_code_field("6A")
+    low_field_resolution: models.PositiveSmallIntegerField = get_option_code_field("6B")
+
+    # The score, in whole quarter points (see `hci.scoring`), so it's stored exactly.
+    # Use `score` for the score in points. It's calculated from the fields above when
+    # the association is saved.
+    score_quarter_points: models.IntegerField = models.IntegerField(default=0)
+    # The version of the scoring framework (see `score.steps`) the score was
+    # calculated with.
+    score_framework_version: models.CharField = models.CharField(
+        default=DEFAULT_FRAMEWORK_VERSION
+    )
+    # Whether the fields above were changed without recalculating the score, e.g. if
+    # rescoring after an update failed. `rescore_associations --stale` rescores these.
+    score_is_stale: models.BooleanField = models.BooleanField(
+        db_index=True, default=False
+    )
+
+    # The fields lists of associations (e.g. in the curation browser) show.
+    LISTED_FIELDS = ("score_quarter_points",)
+
+    # The fields the score is calculated from (including the framework version), and
+    # the fields that hold the score.
+    SCORED_FIELDS = (*SCORE_FIELDS, "score_framework_version")
+    SCORE_RESULT_FIELDS = ("score_quarter_points", "score_is_stale")
+    # The fields to read with `.values_list()` to rescore associations in bulk, with
+    # `get_rescored`.
+    RESCORE_ROW_FIELDS = ("pk", "score_framework_version", *SCORE_FIELDS)
+
+    objects = AssociationQuerySet.as_manager()
+
+    # The values of `SCORED_FIELDS` when the association was last scored or loaded, to
+    # tell whether saving it needs to rescore it. (See `needs_rescoring`.)
+    scored_values: Tuple[Any, ...] | None = None
+
+    @property
+    def score(self) -> float:
+        """The score, in points."""
+        return float(self.score_quarter_points / QUARTER_POINTS_PER_POINT)
+
+    @score.setter
+    def score(self, value: float) -> None:
+        self.score_quarter_points = round(value * QUARTER_POINTS_PER_POINT)
+
+    @classmethod
+    def from_db(
+        cls, db: str | None, field_names: Collection[str], values: Collection[Any]
+    ) -> Self:
+        """Load an association, remembering what its score was calculated from."""
+        association = super().from_db(db, field_names, values)
+        # Only use the fields that were loaded, since getting the others would load
+        # them, with a query each.
+        loaded = dict(zip(field_names, values))
+        if loaded.keys() >= {*cls.SCORED_FIELDS, "score_is_stale"} and not loaded.get(
+            "score_is_stale"
+        ):
+            association.scored_values = tuple(
+                loaded[field] for field in cls.SCORED_FIELDS
+            )
+        return association
+
+    def get_scored_values(self) -> Tuple[Any, ...]:
+        """Return the values of the fields the score is calculated from."""
+        return tuple(getattr(self, field) for field in self.SCORED_FIELDS)
+
+    def needs_rescoring(self) -> bool:
+        """Return whether anything the score is calculated from changed since it was."""
+        return self.scored_values != self.get_scored_values()
+
+    def get_selected_options(self, step_number: str) -> List[str]:
+        """Return the names of the options selected for a step, e.g. "3C"."""
+        value = getattr(self, ASSOCIATION_STEP_FIELDS[step_number])
+        if step_number == "1A":
+            return ["Haplotype" if value else "Allele"]
+        if ASSOCIATION_STEP_FIELDS[step_number] in MULTI_SELECT_FIELDS:
+            return get_masked_option_names(step_number, value)
+        option_names = get_option_names(step_number)
+        return [option_names[value]] if value is not None else []
+
+    @classmethod
+    def set_scores(cls, associations: Sequence["Association"]) -> None:
+        """Calculate the scores of the associations (without saving them).
+
+        The associations are scored together, with one call to the calculator for each
+        framework version.
+        """
+        by_version: Dict[str, List["Association"]] = {}
+        for association in associations:
+            by_version.setdefault(association.score_framework_version, []).append(
+                association
+            )
+        for version, version_associations in by_version.items():
+            scores = score_rows_in_quarter_points(
+                (
+                    [getattr(association, field) for field in SCORE_FIELDS]
+                    for association in version_associations
+                ),
+                version,
+            )
+            for association, score in zip(version_associations, scores):
+                association.score_quarter_points = score
+                association.score_is_stale = False
+                association.scored_values = association.get_scored_values()
+
+    @classmethod
+    def get_rescored(
+        cls, rows: Iterable[Sequence[Any]], version: str | None = None
+    ) -> List["Association"]:
+        """Score rows of `RESCORE_ROW_FIELDS` values, without loading the associations.
+
+        The rows are scored together, with one call to the calculator for each framework
+        version. The associations returned only have their primary key, framework
+        version and score fields set, so save them with `bulk_update`, with those
+        fields.
+
+        :param version: The framework version to score with. Defaults to the version
+            each association was scored with.
+        """
+        by_version: Dict[str, List[Sequence[Any]]] = {}
+        for row in rows:
+            by_version.setdefault(version or row[1], []).append(row)
+        associations: List["Association"] = []
+        for row_version, version_rows in by_version.items():
+            scores = score_rows_in_quarter_points(
+                (row[2:] for row in version_rows), row_version
+            )
+            associations.extend(
+                cls(
+                    pk=row[0],
+                    score_framework_version=row_version,
+                    score_quarter_points=score,
+                    score_is_stale=False,
+                )
+                for row, score in zip(version_rows, scores)
+            )
+        return associations
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        """Save the association, rescoring it if anything it's scored from changed."""
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or set(update_fields) & set(self.SCORED_FIELDS):
+            if self.needs_rescoring():
+                self.set_scores([self])
+                if update_fields is not None:
+                    kwargs["update_fields"] = {
+                        *update_fields,
+                        *self.SCORE_RESULT_FIELDS,
+                    }
+        super().save(*args, **kwargs)
 
 
 class Classification(models.Model):
@@ -166,6 +701,8 @@ class Classification(models.Model):
     curator: models.ForeignKey = models.ForeignKey(Curator, on_delete=models.PROTECT)
     association: models.ManyToManyField = models.ManyToManyField(Association)
 
+    objects: models.Manager["Classification"] = models.Manager()
+
 
 class Curation(models.Model):
     """A curation is a set of classifications for a given disease and allele or
@@ -177,3 +714,5 @@ class Curation(models.Model):
         Haplotype, on_delete=models.PROTECT
     )
     classifications: models.ManyToManyField = models.ManyToManyField(Classification)
+
+    objects: models.Manager["Curation"] = models.Manager()
@@ -0,0 +1,129 @@
+"""Read diseases from a release of the Mondo Disease Ontology.
+
+Mondo is released as an OBO file and as an OBO Graphs JSON file, e.g. `mondo.obo` and
+`mondo.json` from
+https://mondo.monarchinitiative.org/pages/download/.
+Both are read as
+a stream of terms, so only one term is held in memory at a time, however large the
+release.
+"""
+
+import json
+import re
+from typing import IO, Dict, Iterator, NamedTuple
+
+# The prefix of Mondo IDs, e.g. "MONDO:0005147".
+MONDO_ID_PREFIX = "MONDO:"
+
+# The prefix of Mondo IRIs, which are used as IDs in OBO Graphs JSON files.
+MONDO_IRI_PREFIX = "http://purl.obolibrary.org/obo/MONDO_"
+
+# How many characters of a JSON file to read at a time.
+JSON_CHUNK_SIZE = 1 << 20
+
+# The start of the array of nodes in an OBO Graphs JSON file.
+_NODES_START = re.compile(r'"nodes"\s*:\s*\[')
+
+
+class MondoException(Exception):
+    """Define an exception for the mondo module."""
+
+
+class MondoTerm(NamedTuple):
+    """Hold the parts of a Mondo term that are stored for a disease."""
+
+    mondo_id: str
+    name: str
+    is_obsolete: bool
+
+
+def read_obo(lines: IO[str]) -> Iterator[MondoTerm]:
+    """Read the Mondo terms from an OBO file.
+
+    :param lines: The lines of the file.
+    :returns: The terms, in the order they're in the file.
+    """
+    tags: Dict[str, str] = {}
+    in_term = False
+    for line in lines:
+        line = line.strip()
+        if line.startswith("["):
+            if in_term and tags.get("id", "").startswith(MONDO_ID_PREFIX):
+                yield _get_obo_term(tags)
+            in_term = line == "[Term]"
+            tags = {}
+        elif in_term and ": " in line:
+            tag, value = line.split(": ", 1)
+            tags.setdefault(tag, value)
+    if in_term and tags.get("id", "").startswith(MONDO_ID_PREFIX):
+        yield _get_obo_term(tags)
+
+
+def _get_obo_term(tags: Dict[str, str]) -> MondoTerm:
+    """Return the term with the given OBO tags."""
+    return MondoTerm(
+        mondo_id=tags["id"],
+        name=tags.get("name", ""),
+        is_obsolete=tags.get("is_obsolete") == "true",
+    )
+
+
+def _read_json_nodes(text: IO[str]) -> Iterator[dict]:
+    """Read the nodes of the first graph in an OBO Graphs JSON file, one at a time.
+
+    The file is read in chunks, and each node is decoded as soon as all of it has been
+    read.
+
+    :raises MondoException: If the file doesn't have an array of nodes, or a node isn't
+        valid JSON.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    # Find the start of the array of nodes.
+    while (match := _NODES_START.search(buffer)) is None:
+        chunk = text.read(JSON_CHUNK_SIZE)
+        if not chunk:
+            raise MondoException("No nodes found in the JSON file")
+        # Keep the end of the buffer, in case the start of the array is split across
+        # chunks.
+        buffer = buffer[-64:] + chunk
+    position = match.end()
+    at_eof = False
+    while True:
+        # Skip to the next node, or the end of the array.
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position < len(buffer) and buffer[position] == "]":
+            return
+        try:
+            if position == len(buffer):
+                raise ValueError("Need more data")
+            node, position = decoder.raw_decode(buffer, position)
+        except ValueError as err:
+            if at_eof:
+                raise MondoException(
+                    "Unable to decode a node in the JSON file"
+                ) from err
+            chunk = text.read(JSON_CHUNK_SIZE)
+            at_eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield node
+
+
+def read_json(text: IO[str]) -> Iterator[MondoTerm]:
+    """Read the Mondo terms from an OBO Graphs JSON file.
+
+    :param text: The file.
+    :returns: The terms, in the order they're in the file.
+    """
+    for node in _read_json_nodes(text):
+        iri = node.get("id", "")
+        if node.get("type") != "CLASS" or not iri.startswith(MONDO_IRI_PREFIX):
+            continue
+        yield MondoTerm(
+            mondo_id=MONDO_ID_PREFIX + iri.removeprefix(MONDO_IRI_PREFIX),
+            name=node.get("lbl", ""),
+            is_obsolete=bool(node.get("meta", {}).get("deprecated", False)),
+        )
@@ -0,0 +1,271 @@
+"""Score associations with the `score` package.
+
+The options selected for each scoring step are stored in fields of `Association`, as
+small integer option codes (or, for multi-select steps, bitmasks of option codes). This
+module defines the codes, and scores associations from them.
+
+An option's stored code is its position in `get_option_names`, which lists every option
+of a step in every version of the framework, in the order they first appear. So a new
+version of the framework only ever adds codes, and never changes the meaning of a stored
+code. Stored codes are translated to each version's own codes when scoring.
+
+This module is imported by `hci.models`, so by every management command and worker.
+numpy and the `score` package's models are only imported when something is scored, so
+commands that don't score anything (including the system checks) start up quicker.
+"""
+
+import functools
+import logging
+import re
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Sequence, Tuple
+
+from django.db.models import Q
+
+from score.constants import (
+    DEFAULT_FRAMEWORK_VERSION,
+    STEP_FIELDS,
+    get_framework_versions,
+    read_option_names,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Map each step number to the association field that holds the option(s) selected for
+# that step. Step 1A is stored as a boolean; see `get_score_data`.
+ASSOCIATION_STEP_FIELDS: Dict[str, str] = {
+    "1A": "is_haplotype",
+    "1B": "allele_field_resolution",
+    "1C": "zygosity",
+    "1D": "phase",
+    "2": "typing_method",
+    "3A": "p_value_type",
+    "3B": "multiple_testing_correction",
+    "3C": "effect_size",
+    "4": "cohort_size",
+    "5": "additional_phenotypes",
+    "6A": "weighing_association",
+    "6B": "low_field_resolution",
+}
+
+# The association fields that hold a bitmask of the options selected for a
+# multi-select step.
+MULTI_SELECT_FIELDS = ("multiple_testing_correction", "effect_size")
+
+# Scores are stored as whole quarter points. Every option's points are a multiple of
+# 0.5, and step 6 multiplies by 0.5 or 1, so every score is exactly a whole number of
+# quarter points, and sums of scores in the database are exact.
+QUARTER_POINTS_PER_POINT = 4
+
+# The association fields needed to score an association, in step order. Query these
+# with `.values_list(*SCORE_FIELDS)` and pass the rows to `score_rows`.
+SCORE_FIELDS = tuple(
+    ASSOCIATION_STEP_FIELDS[step_number] for step_number in STEP_FIELDS
+)
+
+
+def _get_version_key(version: str) -> Tuple[int, str]:
+    """Return a key to sort framework versions by, so that e.g. "v2" is before "v10"."""
+    match = re.fullmatch(r"v(\d+)", version)
+    return (int(match[1]), "") if match else (-1, version)
+
+
+@functools.cache
+def get_option_names(step_number: str) -> Tuple[str, ...]:
+    """Return the names of a step's options, indexed by their stored option codes.
+
+    The names are read without loading the `score` package's models, since the fields'
+    choices are read by Django's system checks, which most management commands run.
+
+    :param step_number: The step number, e.g. "1B".
+    """
+    names: Dict[str, None] = {}
+    for version in sorted(get_framework_versions(), key=_get_version_key):
+        names.update(dict.fromkeys(read_option_names(version).get(step_number, ())))
+    return tuple(names)
+
+
+def get_option_choices(step_number: str) -> List[Tuple[int, str]]:
+    """Return the (stored option code, option name) choices for a step's field."""
+    return list(enumerate(get_option_names(step_number)))
+
+
+def get_option_code(step_number: str, option_name: str) -> int:
+    """Return the stored code of an option.
+
+    :raises ValueError: If the step has no such option.
+    """
+    return get_option_names(step_number).index(option_name)
+
+
+def get_option_mask(step_number: str, option_names: Iterable[str]) -> int:
+    """Return the bitmask of the stored codes of options for a multi-select step.
+
+    :raises ValueError: If the step doesn't have one of the options.
+    """
+    mask = 0
+    for option_name in option_names:
+        mask |= 1 << get_option_code(step_number, option_name)
+    return mask
+
+
+def get_masked_option_names(step_number: str, mask: int) -> List[str]:
+    """Return the names of the options in a bitmask of stored codes, in code order."""
+    return [
+        option_name
+        for code, option_name in enumerate(get_option_names(step_number))
+        if mask & (1 << code)
+    ]
+
+
+def get_score_data(row: Sequence[Any]) -> dict:
+    """Return the score data for a row of `SCORE_FIELDS` values.
+
+    Codes that aren't the code of any option are left as they are, so the score data
+    doesn't validate.
+    """
+    score_data: Dict[str, Dict[str, Any]] = {}
+    for step_number, value in zip(STEP_FIELDS, row):
+        option_names = get_option_names(step_number)
+        if step_number == "1A":
+            value = "Haplotype" if value else "Allele"
+        elif ASSOCIATION_STEP_FIELDS[step_number] in MULTI_SELECT_FIELDS:
+            if value is not None and 0 <= value < 1 << len(option_names):
+                value = get_masked_option_names(step_number, value)
+        elif value is not None and 0 <= value < len(option_names):
+            value = option_names[value]
+        step_name, field_name = STEP_FIELDS[step_number]
+        score_data.setdefault(step_name, {})[field_name] = value
+    return score_data
+
+
+@functools.cache
+def _get_code_tables(version: str) -> Dict[str, "np.ndarray"]:
+    """Return each step number mapped to an array of the version's option codes.
+
+    The arrays are indexed by stored option code (or bitmask, for multi-select steps),
+    and hold -1 for the codes of options that aren't in the version.
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    from score.steps import get_steps  # pylint: disable=import-outside-toplevel
+
+    tables = {}
+    for step_number, step_index in get_steps(version).index.items():
+        option_names = get_option_names(step_number)
+        codes = [step_index.option_to_code.get(name, -1) for name in option_names]
+        if step_index.multi_select:
+            table = []
+            for mask in range(1 << len(option_names)):
+                masked = [codes[code] for code in range(len(codes)) if mask & 1 << code]
+                table.append(-1 if -1 in masked else sum(1 << code for code in masked))
+            codes = table
+        tables[step_number] = np.array(codes, dtype=np.intp)
+    return tables
+
+
+def score_rows(
+    rows: Iterable[Sequence[Any]], version: str | None = None
+) -> "np.ndarray":
+    """Score rows of `SCORE_FIELDS` values.
+
+    The stored option codes are translated to the version's option codes with a lookup
+    per step, and scored without building any score data.
+
+    :param version: The framework version to score with. Defaults to the default
+        version.
+    :returns: An array of scores, in the same order as the rows. Rows that have no
+        option, or an option that isn't in the version, for a step get a score of 0.0.
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    # pylint: disable-next=import-outside-toplevel
+    from score.calculator import calculate_many
+
+    code_tables = _get_code_tables(version or DEFAULT_FRAMEWORK_VERSION)
+    rows = list(rows)
+    columns = {}
+    for position, step_number in enumerate(STEP_FIELDS):
+        table = code_tables[step_number]
+        stored = np.array(
+            [-1 if row[position] is None else row[position] for row in rows],
+            dtype=np.intp,
+        )
+        is_known = (stored >= 0) & (stored < len(table))
+        columns[step_number] = np.where(
+            is_known, table[np.where(is_known, stored, 0)], -1
+        )
+    num_invalid = np.count_nonzero(
+        np.any([codes < 0 for codes in columns.values()], axis=0)
+    )
+    if num_invalid:
+        logger.error("Unable to score %d association(s)", num_invalid)
+    return calculate_many(columns, version)
+
+
+def load_tables(version: str | None = None) -> None:
+    """Load the options and tables used to score associations with a version.
+
+    They're otherwise loaded (and numpy imported) the first time something is scored.
+    Load them before a server forks its workers, so the workers share them.
+
+    :param version: The framework version. Defaults to the default version.
+    """
+    # Scoring no rows loads everything that scoring any rows would.
+    score_rows([], version)
+
+
+def score_rows_in_quarter_points(
+    rows: Iterable[Sequence[Any]], version: str | None = None
+) -> List[int]:
+    """Score rows of `SCORE_FIELDS` values, in whole quarter points.
+
+    :param version: The framework version to score with. Defaults to the default
+        version.
+    :returns: The scores, in the same order as the rows.
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    scores = score_rows(rows, version) * QUARTER_POINTS_PER_POINT
+    quarter_points: List[int] = np.rint(scores).astype(np.int64).tolist()
+    return quarter_points
+
+
+def get_selected_options_filter(options: Iterable[Tuple[str, str]]) -> Q:
+    """Return a filter for the associations that selected any of the given options.
+
+    :param options: (step number, option name) pairs, e.g. from
+        `score.steps.get_changed_options`. Steps that no association field holds the
+        options for are ignored.
+    """
+    option_names: Dict[str, set[str]] = {}
+    for step_number, option_name in options:
+        option_names.setdefault(step_number, set()).add(option_name)
+    selected = Q(pk__in=[])
+    for step_number, names in option_names.items():
+        field = ASSOCIATION_STEP_FIELDS.get(step_number)
+        if field is None:
+            continue
+        if step_number == "1A":
+            values = {name == "Haplotype" for name in names & {"Allele", "Haplotype"}}
+            if values:
+                selected |= Q(**{f"{field}__in": values})
+            continue
+        codes = [
+            code
+            for code, name in enumerate(get_option_names(step_number))
+            if name in names
+        ]
+        if not codes:
+            continue
+        if field in MULTI_SELECT_FIELDS:
+            # There are only a few options per step, so list every bitmask with any of
+            # the options' bits set, which can be looked up in an index (unlike a
+            # bitwise and).
+            bits = sum(1 << code for code in codes)
+            num_masks = 1 << len(get_option_names(step_number))
+            codes = [mask for mask in range(num_masks) if mask & bits]
+        selected |= Q(**{f"{field}__in": codes})
+    return selected
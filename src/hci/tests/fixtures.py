@@ -0,0 +1,83 @@
+"""Define data and helpers shared by the HCI's tests."""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any, Dict
+
+from hci.models import Association
+from hci.scoring import get_option_code, get_option_mask
+
+# Score data for an association, and the fields that hold it.
+SCORE_DATA: Dict[str, Any] = {
+    "step_1": {
+        "a_allele_or_haplotype": "Haplotype",
+        "b_allele_resolution": "2-field",
+        "c_zygosity": "Biallelic (homozygous)",
+        "d_phase": "Phase confirmed",
+    },
+    "step_2": {"typing_method": "Low Resolution Typing"},
+    "step_3": {
+        "a_statistics_p_value": "GWAS <5x10e-8, Non-GWAS <0.01",
+        "b_multiple_testing_correction": ["Overall correction for multiple testing"],
+        "c_statistics_effect_size": [
+            "OR/RR: ≥2 or ≤0.5, Beta: ≥0.5 or ≤-0.5",
+            "CI does not cross 1 (OR/RR) or 0 (beta)",
+        ],
+    },
+    "step_4": {"cohort_size": "GWAS 2,500-4,999, Non-GWAS 100-249"},
+    "step_5": {"additional_phenotypes": "specific disease-related phenotype"},
+    "step_6": {
+        "a_weighing_association": "significant association with disease",
+        "b_low_field_resolution": "1-field resolution (from Step 1B)",
+    },
+}
+
+
+SCORE_DATA_FIELDS = {
+    "is_haplotype": True,
+    "allele_field_resolution": get_option_code("1B", "2-field"),
+    "zygosity": get_option_code("1C", "Biallelic (homozygous)"),
+    "phase": get_option_code("1D", "Phase confirmed"),
+    "typing_method": get_option_code("2", "Low Resolution Typing"),
+    "p_value_type": get_option_code("3A", "GWAS <5x10e-8, Non-GWAS <0.01"),
+    "multiple_testing_correction": get_option_mask(
+        "3B", ["Overall correction for multiple testing"]
+    ),
+    "effect_size": get_option_mask(
+        "3C",
+        [
+            "OR/RR: ≥2 or ≤0.5, Beta: ≥0.5 or ≤-0.5",
+            "CI does not cross 1 (OR/RR) or 0 (beta)",
+        ],
+    ),
+    "cohort_size": get_option_code("4", "GWAS 2,500-4,999, Non-GWAS 100-249"),
+    "additional_phenotypes": get_option_code("5", "specific disease-related phenotype"),
+    "weighing_association": get_option_code(
+        "6A", "significant association with disease"
+    ),
+    "low_field_resolution": get_option_code("6B", "1-field resolution (from Step 1B)"),
+}
+
+
+def create_association(**fields: Any) -> Association:
+    """Create an association, with placeholder values for the fields not given."""
+    defaults: dict[str, Any] = {
+        field.name: False if field.get_internal_type() == "BooleanField" else 0
+        # pylint: disable-next=protected-access,no-member
+        for field in Association._meta.concrete_fields
+        if not field.primary_key
+        and field.get_internal_type()
+        in ("BooleanField", "IntegerField", "PositiveIntegerField", "DecimalField")
+    }
+    defaults.update(SCORE_DATA_FIELDS)
+    defaults.update(fields)
+    return Association.objects.create(**defaults)
+
+
+def make_temporary_directory(test: unittest.TestCase) -> Path:
+    """Make a temporary directory that's removed once the test has run."""
+    directory = Path(tempfile.mkdtemp())
+    test.addCleanup(shutil.rmtree, directory)
+    return directory
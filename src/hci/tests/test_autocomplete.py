@@ -0,0 +1,85 @@
+"""Test suggesting allele names."""
+
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db.models.functions import Now
+from django.test import TestCase
+from django.urls import reverse
+
+from hci import autocomplete
+from hci.models import Allele
+
+
+class AlleleAutocompleteTests(TestCase):
+    """Make sure allele names are suggested from memory, and kept up to date."""
+
+    def setUp(self) -> None:
+        """Create alleles, and start with no index of their names."""
+        for imgt_name in [
+            "HLA-A*02:01:01:01",
+            "HLA-A*02:02",
+            "HLA-A*02:10",
+            "HLA-A*03:01",
+            "HLA-B*07:02",
+        ]:
+            Allele.objects.create(imgt_name=imgt_name)
+        Allele.objects.create(imgt_name="HLA-A*02:03", is_deleted=True)
+        self.client.force_login(User.objects.create_user(username="curator"))
+        autocomplete.allele_names.invalidate()
+        self.addCleanup(autocomplete.allele_names.invalidate)
+
+    def get_suggestions(self, query: str) -> list[str]:
+        """Return the names suggested by the endpoint."""
+        response = self.client.get(reverse("allele_autocomplete"), {"allele": query})
+        self.assertEqual(200, response.status_code)
+        return [
+            line.split('"')[1]
+            for line in response.content.decode().splitlines()
+            if line.startswith("<option")
+        ]
+
+    def test_suggestions(self) -> None:
+        """Names should match case-insensitively, with or without "HLA-"."""
+        self.assertEqual(
+            ["HLA-A*02:01:01:01", "HLA-A*02:02"], self.get_suggestions("a*02:0")
+        )
+        self.assertEqual(["HLA-B*07:02"], self.get_suggestions(" HLA-B"))
+        self.assertEqual([], self.get_suggestions("C*"))
+        self.assertEqual([], self.get_suggestions(""))
+        with mock.patch.object(autocomplete, "MAX_SUGGESTIONS", 2):
+            self.assertEqual(2, len(autocomplete.suggest_allele_names("HL")))
+
+    def test_cached(self) -> None:
+        """Names should only be read from the database once."""
+        self.get_suggestions("A*")
+        with self.assertNumQueries(0):
+            self.assertEqual(["HLA-A*03:01"], autocomplete.suggest_allele_names("A*03"))
+
+    def test_refresh(self) -> None:
+        """Saved alleles should be suggested immediately, and bulk loaded ones soon."""
+        self.assertEqual([], self.get_suggestions("C*"))
+        Allele.objects.create(imgt_name="HLA-C*01:02")
+        self.assertEqual(["HLA-C*01:02"], self.get_suggestions("C*"))
+        Allele.objects.bulk_create([Allele(imgt_name="HLA-C*01:03")])
+        Allele.objects.filter(imgt_name="HLA-A*02:03").update(is_deleted=False)
+        self.assertEqual(["HLA-C*01:02"], self.get_suggestions("C*"))
+        with mock.patch.object(autocomplete, "REFRESH_INTERVAL", 0):
+            self.assertEqual(["HLA-C*01:02", "HLA-C*01:03"], self.get_suggestions("C*"))
+            self.assertIn("HLA-A*02:03", self.get_suggestions("A*02:0"))
+
+    def test_refresh_same_count(self) -> None:
+        """Changes that keep the number of names and the newest ID should be seen."""
+        self.assertEqual(["HLA-B*07:02"], self.get_suggestions("B*"))
+        # An allele renamed by another process, which doesn't signal this one.
+        Allele.objects.filter(imgt_name="HLA-B*07:02").update(
+            imgt_name="HLA-B*07:03", modified=Now()
+        )
+        with mock.patch.object(autocomplete, "REFRESH_INTERVAL", 0):
+            self.assertEqual(["HLA-B*07:03"], self.get_suggestions("B*"))
+
+    def test_login_required(self) -> None:
+        """Only curators who are logged in should get suggestions."""
+        self.client.logout()
+        response = self.client.get(reverse("allele_autocomplete"), {"allele": "A*"})
+        self.assertEqual(302, response.status_code)
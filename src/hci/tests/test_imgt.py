@@ -0,0 +1,185 @@
+"""Test reading and loading IPD-IMGT/HLA releases, and querying allele names."""
+
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from hci.imgt import (
+    AlleleName,
+    ImgtException,
+    parse_allele_name,
+    read_allelelist,
+    read_hla_nom,
+)
+from hci.models import Allele
+from hci.tests.fixtures import make_temporary_directory
+
+ALLELELIST = """# file: Allelelist.txt
+# date: 2024-01-17
+# version: IPD-IMGT/HLA 3.55.0
+AlleleID,Allele
+HLA00001,A*01:01:01:01
+HLA00002,A*01:01:01:02N
+HLA00132,B*07:02:01:01
+"""
+
+
+HLA_NOM = """# file: hla_nom.txt
+A*;01:01:01:01;19890101;;;
+A*;01:01:01:02N;19890101;;;
+A*;01:01:01:03;19990101;20000101;A*01:01:01:01;Identical to A*01:01:01:01
+B*;07:02:01:01;19890101;;;
+"""
+
+
+class LoadImgtAllelesTests(TestCase):
+    """Make sure IPD-IMGT/HLA releases are read and loaded as alleles."""
+
+    def setUp(self) -> None:
+        """Write the release files to a temporary directory."""
+        directory = make_temporary_directory(self)
+        self.allelelist_path = directory / "Allelelist.txt"
+        self.allelelist_path.write_text(ALLELELIST, encoding="utf-8")
+        self.hla_nom_path = directory / "hla_nom.txt"
+        self.hla_nom_path.write_text(HLA_NOM, encoding="utf-8")
+
+    def get_alleles(self) -> list[tuple[str, bool]]:
+        """Return the names of the alleles, and whether they're deleted."""
+        return list(
+            Allele.objects.order_by("imgt_name").values_list("imgt_name", "is_deleted")
+        )
+
+    def test_read(self) -> None:
+        """Both formats should have the same current alleles."""
+        with self.allelelist_path.open(encoding="utf-8") as f:
+            allelelist = list(read_allelelist(f))
+        with self.hla_nom_path.open(encoding="utf-8") as f:
+            hla_nom = list(read_hla_nom(f))
+        self.assertEqual(
+            allelelist, [allele for allele in hla_nom if not allele.is_deleted]
+        )
+        self.assertEqual(("HLA-A*01:01:01:03", True), hla_nom[2])
+
+    def test_load(self) -> None:
+        """Reloading a release should only write the alleles that changed."""
+        output = StringIO()
+        call_command(
+            "load_imgt_alleles", self.hla_nom_path, batch_size=2, stdout=output
+        )
+        self.assertIn("4 alleles created, 0 updated, 0 unchanged", output.getvalue())
+        Allele.objects.create(imgt_name="HLA-C*01:02:01:01")
+        self.allelelist_path.write_text(
+            ALLELELIST + "HLA00401,C*01:02:01:02\n", encoding="utf-8"
+        )
+        output = StringIO()
+        call_command("load_imgt_alleles", self.allelelist_path, stdout=output)
+        self.assertIn("1 alleles created, 1 updated, 3 unchanged", output.getvalue())
+        self.assertEqual(
+            [
+                ("HLA-A*01:01:01:01", False),
+                ("HLA-A*01:01:01:02N", False),
+                ("HLA-A*01:01:01:03", True),
+                ("HLA-B*07:02:01:01", False),
+                ("HLA-C*01:02:01:01", True),
+                ("HLA-C*01:02:01:02", False),
+            ],
+            self.get_alleles(),
+        )
+
+    def test_name_parts(self) -> None:
+        """Loaded alleles should have the parts of their names."""
+        call_command(
+            "load_imgt_alleles", self.hla_nom_path, batch_size=2, stdout=StringIO()
+        )
+        self.assertEqual(
+            ("A", "01", "01", "01", "02", "N"),
+            Allele.objects.values_list(*Allele.NAME_PARTS).get(
+                imgt_name="HLA-A*01:01:01:02N"
+            ),
+        )
+
+    def test_empty_release(self) -> None:
+        """An empty release shouldn't mark every allele as deleted."""
+        Allele.objects.create(imgt_name="HLA-A*01:01:01:01")
+        self.allelelist_path.write_text("AlleleID,Allele\n", encoding="utf-8")
+        with self.assertRaises(CommandError):
+            call_command("load_imgt_alleles", self.allelelist_path)
+        self.assertEqual([("HLA-A*01:01:01:01", False)], self.get_alleles())
+
+    def test_repeated_name(self) -> None:
+        """A release that lists an allele twice shouldn't be loaded at all."""
+        self.allelelist_path.write_text(
+            ALLELELIST + "HLA00001,A*01:01:01:01\n", encoding="utf-8"
+        )
+        with self.assertRaisesMessage(CommandError, "HLA-A*01:01:01:01 is listed"):
+            call_command("load_imgt_alleles", self.allelelist_path, batch_size=2)
+        self.assertEqual([], self.get_alleles())
+
+
+class AlleleNomenclatureTests(TestCase):
+    """Make sure alleles can be queried by the parts of their names."""
+
+    def test_parse(self) -> None:
+        """Names should be split into their gene, fields, and expression suffix."""
+        self.assertEqual(
+            AlleleName("DRB1", ("15", "01", "01", "02"), "N"),
+            parse_allele_name("HLA-DRB1*15:01:01:02N"),
+        )
+        self.assertEqual(AlleleName("A", ("02",), ""), parse_allele_name("A*02"))
+        for name in ["", "HLA-A*", "A*02:01:01:01:01", "a*02"]:
+            with self.subTest(name=name), self.assertRaises(ImgtException):
+                parse_allele_name(name)
+
+    def test_save(self) -> None:
+        """Saving an allele should set (or clear) the parts of its name."""
+        allele = Allele.objects.create(imgt_name="HLA-A*02:01:01")
+        self.assertEqual(
+            ("A", "02", "01", "01", "", ""),
+            tuple(getattr(allele, part) for part in Allele.NAME_PARTS),
+        )
+        allele.imgt_name = "unknown"
+        allele.save(update_fields=["imgt_name"])
+        allele.refresh_from_db()
+        self.assertEqual("", allele.gene)
+        self.assertEqual("", allele.field_1)
+
+    def test_in_group(self) -> None:
+        """Alleles in a group should be found by the group's name."""
+        for imgt_name in [
+            "HLA-A*02:01",
+            "HLA-A*02:01:01:01",
+            "HLA-A*02:01:01:02N",
+            "HLA-A*02:02",
+            "HLA-A*03:01",
+            "HLA-B*02:01",
+        ]:
+            Allele.objects.create(imgt_name=imgt_name)
+        for name, num_fields, expected in [
+            (
+                "A*02",
+                None,
+                [
+                    "HLA-A*02:01",
+                    "HLA-A*02:01:01:01",
+                    "HLA-A*02:01:01:02N",
+                    "HLA-A*02:02",
+                ],
+            ),
+            (
+                "HLA-A*02:01",
+                None,
+                ["HLA-A*02:01", "HLA-A*02:01:01:01", "HLA-A*02:01:01:02N"],
+            ),
+            ("A*02", 2, ["HLA-A*02:01", "HLA-A*02:02"]),
+            ("A*02:01", 4, ["HLA-A*02:01:01:01", "HLA-A*02:01:01:02N"]),
+            ("HLA-A*02:01:01:02N", None, ["HLA-A*02:01:01:02N"]),
+            ("C", None, []),
+        ]:
+            with self.subTest(name=name, num_fields=num_fields):
+                alleles = Allele.objects.in_group(name, num_fields).order_by(
+                    "imgt_name"
+                )
+                self.assertEqual(
+                    expected, list(alleles.values_list("imgt_name", flat=True))
+                )
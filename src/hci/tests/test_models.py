@@ -0,0 +1,95 @@
+"""Test the HCI's models."""
+
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+
+from hci.models import Allele, Disease, Haplotype, Publication
+
+
+class NaturalKeyTests(TestCase):
+    """Make sure objects are unique by, and can be looked up by, their natural key."""
+
+    def test_get_or_create_by_natural_key(self) -> None:
+        """An object should only be created the first time its key is given."""
+        disease, created = Disease.objects.get_or_create_by_natural_key("MONDO:0005147")
+        self.assertTrue(created)
+        self.assertEqual(
+            (disease, False),
+            Disease.objects.get_or_create_by_natural_key("MONDO:0005147"),
+        )
+        self.assertEqual(
+            disease, Disease.objects.get_by_natural_key(*disease.natural_key())
+        )
+        allele, created = Allele.objects.get_or_create_by_natural_key(
+            "HLA-B*27:05", defaults={"car_id": "CA123"}
+        )
+        self.assertTrue(created)
+        self.assertEqual("CA123", allele.car_id)
+
+    def test_unique_natural_keys(self) -> None:
+        """Objects with the same natural key can't be created."""
+        Disease.objects.create(mondo_id="MONDO:0005147")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Disease.objects.create(mondo_id="MONDO:0005147")
+        publication_fields = {"author": "", "year": "", "title": ""}
+        Publication.objects.create(
+            publication_id="123", publication_type="pubmed", **publication_fields
+        )
+        Publication.objects.create(
+            publication_id="123", publication_type="biorxiv", **publication_fields
+        )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Publication.objects.create(
+                publication_id="123", publication_type="pubmed", **publication_fields
+            )
+        self.assertEqual(
+            "pubmed",
+            Publication.objects.get_by_natural_key("123", "pubmed").publication_type,
+        )
+
+
+class HaplotypeFingerprintTests(TestCase):
+    """Make sure haplotypes with the same alleles are found by their fingerprint."""
+
+    def setUp(self) -> None:
+        """Create alleles to make haplotypes of."""
+        self.alleles = [
+            Allele.objects.create(imgt_name=f"HLA-DRB1*15:0{index}")
+            for index in range(3)
+        ]
+
+    def test_find(self) -> None:
+        """Haplotypes should be found whatever order their alleles were added in."""
+        haplotype = Haplotype.objects.create(chromosome_mapping_order="cis")
+        haplotype.constituent_alleles.add(self.alleles[1], self.alleles[0])
+        with self.assertNumQueries(1):
+            found = list(
+                Haplotype.objects.find("cis", [self.alleles[0], self.alleles[1].pk])
+            )
+        self.assertEqual([haplotype], found)
+        self.assertFalse(Haplotype.objects.find("trans", self.alleles[:2]).exists())
+        self.assertFalse(Haplotype.objects.find("cis", self.alleles).exists())
+
+    def test_kept_up_to_date(self) -> None:
+        """Fingerprints should change with the haplotype's alleles and order."""
+        haplotype = Haplotype.objects.create(chromosome_mapping_order="cis")
+        self.assertEqual([haplotype], list(Haplotype.objects.find("cis", [])))
+        haplotype.constituent_alleles.set(self.alleles)
+        self.assertEqual([haplotype], list(Haplotype.objects.find("cis", self.alleles)))
+        haplotype.constituent_alleles.remove(self.alleles[2])
+        self.alleles[2].haplotype_set.add(haplotype)
+        self.alleles[0].haplotype_set.remove(haplotype)
+        expected = self.alleles[1:]
+        self.assertEqual([haplotype], list(Haplotype.objects.find("cis", expected)))
+        self.alleles[1].haplotype_set.clear()
+        self.assertEqual(
+            [haplotype], list(Haplotype.objects.find("cis", self.alleles[2:]))
+        )
+        haplotype.refresh_from_db()
+        haplotype.chromosome_mapping_order = "trans"
+        haplotype.save(update_fields=["chromosome_mapping_order"])
+        self.assertEqual(
+            [haplotype], list(Haplotype.objects.find("trans", self.alleles[2:]))
+        )
+        haplotype.constituent_alleles.clear()
+        self.assertEqual([haplotype], list(Haplotype.objects.find("trans", [])))
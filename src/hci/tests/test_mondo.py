@@ -0,0 +1,137 @@
+"""Test reading and loading Mondo releases."""
+
+import copy
+import json
+from io import StringIO
+from typing import Any, Dict
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from hci.models import Disease
+from hci.mondo import read_json, read_obo
+from hci.tests.fixtures import make_temporary_directory
+
+MONDO_OBO = """format-version: 1.2
+ontology: mondo
+
+[Term]
+id: MONDO:0000001
+name: disease
+def: "A disease is a disposition to undergo pathological processes." []
+
+[Term]
+id: MONDO:0005147
+name: type 1 diabetes mellitus
+is_a: MONDO:0000001 ! disease
+
+[Term]
+id: HP:0000001
+name: All
+
+[Typedef]
+id: part_of
+name: part of
+
+[Term]
+id: MONDO:0000004
+name: obsolete adrenocortical insufficiency
+is_obsolete: true
+"""
+
+
+MONDO_JSON: Dict[str, Any] = {
+    "graphs": [
+        {
+            "id": "http://purl.obolibrary.org/obo/mondo.owl",
+            "nodes": [
+                {
+                    "id": "http://purl.obolibrary.org/obo/MONDO_0000001",
+                    "lbl": "disease",
+                    "type": "CLASS",
+                },
+                {
+                    "id": "http://purl.obolibrary.org/obo/MONDO_0005147",
+                    "lbl": "type 1 diabetes mellitus",
+                    "type": "CLASS",
+                },
+                {
+                    "id": "http://purl.obolibrary.org/obo/HP_0000001",
+                    "lbl": "All",
+                    "type": "CLASS",
+                },
+                {
+                    "id": "http://purl.obolibrary.org/obo/mondo#part_of",
+                    "lbl": "part of",
+                    "type": "PROPERTY",
+                },
+                {
+                    "id": "http://purl.obolibrary.org/obo/MONDO_0000004",
+                    "lbl": "obsolete adrenocortical insufficiency",
+                    "type": "CLASS",
+                    "meta": {"deprecated": True},
+                },
+            ],
+            "edges": [],
+        }
+    ]
+}
+
+
+MONDO_TERMS = [
+    ("MONDO:0000001", "disease", False),
+    ("MONDO:0005147", "type 1 diabetes mellitus", False),
+    ("MONDO:0000004", "obsolete adrenocortical insufficiency", True),
+]
+
+
+class LoadMondoTests(TestCase):
+    """Make sure Mondo releases are read and loaded as diseases."""
+
+    def setUp(self) -> None:
+        """Write the releases to a temporary directory."""
+        directory = make_temporary_directory(self)
+        self.obo_path = directory / "mondo.obo"
+        self.obo_path.write_text(MONDO_OBO, encoding="utf-8")
+        self.json_path = directory / "mondo.json"
+        self.json_path.write_text(json.dumps(MONDO_JSON), encoding="utf-8")
+
+    def test_read(self) -> None:
+        """Both formats should have the same Mondo terms."""
+        with self.obo_path.open(encoding="utf-8") as f:
+            self.assertEqual(MONDO_TERMS, list(read_obo(f)))
+        with self.json_path.open(encoding="utf-8") as f:
+            self.assertEqual(MONDO_TERMS, list(read_json(f)))
+
+    def test_read_json_in_small_chunks(self) -> None:
+        """Nodes split across chunks should be read whole."""
+        with mock.patch("hci.mondo.JSON_CHUNK_SIZE", 7):
+            with self.json_path.open(encoding="utf-8") as f:
+                self.assertEqual(MONDO_TERMS, list(read_json(f)))
+
+    def test_load(self) -> None:
+        """Loading a release should only write the terms that changed."""
+        output = StringIO()
+        call_command("load_mondo", self.obo_path, batch_size=2, stdout=output)
+        self.assertIn("3 diseases created, 0 updated, 0 unchanged", output.getvalue())
+        self.assertEqual(
+            MONDO_TERMS,
+            list(
+                Disease.objects.order_by("pk").values_list(
+                    "mondo_id", "name", "is_obsolete"
+                )
+            ),
+        )
+        release = copy.deepcopy(MONDO_JSON)
+        release["graphs"][0]["nodes"][1]["meta"] = {"deprecated": True}
+        self.json_path.write_text(json.dumps(release), encoding="utf-8")
+        output = StringIO()
+        call_command("load_mondo", self.json_path, stdout=output)
+        self.assertIn("0 diseases created, 1 updated, 2 unchanged", output.getvalue())
+        self.assertTrue(Disease.objects.get(mondo_id="MONDO:0005147").is_obsolete)
+
+    def test_unknown_format(self) -> None:
+        """Files in an unknown format shouldn't be loaded."""
+        with self.assertRaises(CommandError):
+            call_command("load_mondo", self.obo_path.with_suffix(".owl"))
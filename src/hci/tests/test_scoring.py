@@ -0,0 +1,273 @@
+"""Test how associations are scored, and how their options are stored."""
+
+import copy
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase
+
+from hci.models import Association, AssociationQuerySet
+from hci.scoring import (
+    SCORE_FIELDS,
+    get_option_code,
+    get_option_names,
+    get_score_data,
+    get_selected_options_filter,
+)
+from hci.tests.fixtures import SCORE_DATA, SCORE_DATA_FIELDS, create_association
+from score.calculator import calculate
+from score.constants import DEFAULT_FRAMEWORK_VERSION, read_option_names
+
+
+class RescoreAssociationsTests(TestCase):
+    """Make sure the rescore_associations command scores every association."""
+
+    def test_rescore(self) -> None:
+        """Every association should get the score the calculator gives it."""
+        associations = [create_association() for _ in range(5)]
+        with self.assertLogs("hci.scoring", level="ERROR"):
+            invalid = create_association(zygosity=None)
+        output = StringIO()
+        with self.assertLogs("hci.scoring", level="ERROR"):
+            call_command(
+                "rescore_associations",
+                workers=1,
+                range_size=2,
+                batch_size=2,
+                stdout=output,
+            )
+        self.assertIn("Rescored 6 associations", output.getvalue())
+        for association in associations:
+            association.refresh_from_db()
+            self.assertEqual(calculate(SCORE_DATA), association.score)
+            self.assertEqual(
+                DEFAULT_FRAMEWORK_VERSION, association.score_framework_version
+            )
+        invalid.refresh_from_db()
+        self.assertEqual(0, invalid.score)
+
+    def test_no_associations(self) -> None:
+        """Rescoring no associations should do nothing."""
+        output = StringIO()
+        call_command("rescore_associations", workers=1, stdout=output)
+        self.assertIn("Rescored 0 associations", output.getvalue())
+
+    def test_changed_since_same_version(self) -> None:
+        """Nothing changes between a version and itself, so nothing is rescored."""
+        association = create_association()
+        output = StringIO()
+        call_command(
+            "rescore_associations",
+            workers=1,
+            changed_since=DEFAULT_FRAMEWORK_VERSION,
+            stdout=output,
+        )
+        self.assertIn("Rescored 0 associations", output.getvalue())
+        association.refresh_from_db()
+        self.assertEqual(calculate(SCORE_DATA), association.score)
+
+    def test_changed_since_other_version(self) -> None:
+        """Associations scored with a third version should be rescored anyway."""
+        current = create_association()
+        older = create_association()
+        Association.objects.filter(pk=older.pk).update(
+            score_framework_version="v0", score_quarter_points=0
+        )
+        output = StringIO()
+        call_command(
+            "rescore_associations",
+            workers=1,
+            changed_since=DEFAULT_FRAMEWORK_VERSION,
+            stdout=output,
+        )
+        self.assertIn("Rescored 1 associations", output.getvalue())
+        older.refresh_from_db()
+        self.assertEqual(calculate(SCORE_DATA), older.score)
+        self.assertEqual(DEFAULT_FRAMEWORK_VERSION, older.score_framework_version)
+        current.refresh_from_db()
+        self.assertEqual(calculate(SCORE_DATA), current.score)
+
+    def test_selected_options_filter(self) -> None:
+        """Only the associations that selected a changed option should be matched."""
+        selected = create_association()
+        not_selected = create_association(
+            is_haplotype=False,
+            p_value_type=get_option_code("3A", "GWAS <1x10e-5, Non-GWAS <0.05"),
+        )
+        not_selected.effect_size = 0
+        not_selected.save()
+        for options, expected in [
+            ([], []),
+            ([("7", "Not a step")], []),
+            ([("1A", "Allele")], [not_selected]),
+            ([("3A", "GWAS <5x10e-8, Non-GWAS <0.01")], [selected]),
+            ([("3C", "CI does not cross 1 (OR/RR) or 0 (beta)")], [selected]),
+            ([("3C", "CI does not cross 1")], []),
+            ([("1A", "Haplotype"), ("2", "Serological")], [selected]),
+        ]:
+            with self.subTest(options=options):
+                self.assertQuerySetEqual(
+                    Association.objects.filter(
+                        get_selected_options_filter(options)
+                    ).order_by("pk"),
+                    expected,
+                )
+
+
+class AssociationProjectionTests(TestCase):
+    """Make sure associations can be loaded without the fields that aren't needed."""
+
+    def setUp(self) -> None:
+        """Create an association with some free text."""
+        self.association = create_association(comments="A long comment.")
+
+    def test_for_listing(self) -> None:
+        """Only the fields lists show should be loaded, and free text when accessed."""
+        association = Association.objects.for_listing().get()
+        with self.assertNumQueries(0):
+            self.assertEqual(calculate(SCORE_DATA), association.score)
+        self.assertIn("study_type", association.get_deferred_fields())
+        with self.assertNumQueries(1):
+            self.assertEqual("A long comment.", association.comments)
+
+    def test_rescore_reads_rows(self) -> None:
+        """Rescoring in bulk should read rows of values, not load associations."""
+        Association.objects.update(score_quarter_points=0)
+        with mock.patch.object(
+            Association, "from_db", side_effect=AssertionError("Loaded an association")
+        ):
+            self.assertEqual(1, Association.objects.all().rescore())
+        self.assertEqual(calculate(SCORE_DATA), Association.objects.get().score)
+
+
+class ScoreOnWriteTests(TestCase):
+    """Make sure associations are scored whenever what they're scored from changes."""
+
+    def setUp(self) -> None:
+        """Create an association, and the scores with and without a changed option."""
+        self.association = create_association()
+        self.score = calculate(SCORE_DATA)
+        score_data = copy.deepcopy(SCORE_DATA)
+        score_data["step_2"]["typing_method"] = "Serological"
+        self.serological = get_option_code("2", "Serological")
+        self.changed_score = calculate(score_data)
+        self.assertNotEqual(self.score, self.changed_score)
+
+    def get_score(self) -> float:
+        """Return the association's score in the database."""
+        return Association.objects.get(pk=self.association.pk).score
+
+    def test_save(self) -> None:
+        """Saving should only rescore an association if its options changed."""
+        self.assertEqual(self.score, self.get_score())
+        self.assertEqual(self.score * 4, self.association.score_quarter_points)
+        association = Association.objects.get()
+        with mock.patch("hci.models.score_rows_in_quarter_points") as score:
+            association.comments = "Not scored."
+            association.save()
+        score.assert_not_called()
+        association.typing_method = self.serological
+        association.save(update_fields=["typing_method"])
+        self.assertEqual(self.changed_score, self.get_score())
+        association.effect_size = 0
+        association.save()
+        self.assertLess(self.get_score(), self.changed_score)
+
+    def test_bulk(self) -> None:
+        """Bulk creates and updates should score the associations."""
+        association = Association.objects.get()
+        association.pk = None
+        (created,) = Association.objects.bulk_create([association])
+        self.assertEqual(self.score, created.score)
+        self.association.typing_method = self.serological
+        Association.objects.bulk_update([self.association], ["typing_method"])
+        self.assertEqual(self.changed_score, self.get_score())
+        Association.objects.filter(pk=self.association.pk).update(
+            typing_method=SCORE_DATA_FIELDS["typing_method"]
+        )
+        self.assertEqual(self.score, self.get_score())
+        self.assertFalse(Association.objects.filter(score_is_stale=True).exists())
+        self.assertEqual(
+            2 * self.score * 4,
+            Association.objects.aggregate(total=Sum("score_quarter_points"))["total"],
+        )
+
+    def test_update_rescores_updated(self) -> None:
+        """An update should only rescore the associations it updated."""
+        stale = create_association()
+        with mock.patch.object(AssociationQuerySet, "rescore"):
+            Association.objects.filter(pk=stale.pk).update(
+                typing_method=self.serological
+            )
+        Association.objects.filter(pk=self.association.pk).update(
+            typing_method=self.serological
+        )
+        self.assertEqual(self.changed_score, self.get_score())
+        stale.refresh_from_db()
+        self.assertTrue(stale.score_is_stale)
+        self.assertEqual(self.score, stale.score)
+
+    def test_rescore_stale(self) -> None:
+        """Stale associations should be rescored by rescore_associations --stale."""
+        with mock.patch.object(AssociationQuerySet, "rescore"):
+            Association.objects.update(typing_method=self.serological)
+        self.assertEqual(self.score, self.get_score())
+        output = StringIO()
+        call_command("rescore_associations", workers=1, stale=True, stdout=output)
+        self.assertIn("Rescored 1 associations", output.getvalue())
+        self.assertEqual(self.changed_score, self.get_score())
+        self.assertFalse(Association.objects.get().score_is_stale)
+
+
+class OptionCodeTests(TestCase):
+    """Make sure selected options are stored as codes, and read back as names."""
+
+    def test_selected_options(self) -> None:
+        """Codes and bitmasks should map back to the names of the options."""
+        association = create_association()
+        self.assertEqual("2-field", association.get_allele_field_resolution_display())
+        self.assertEqual(["Haplotype"], association.get_selected_options("1A"))
+        self.assertEqual(
+            [
+                "OR/RR: ≥2 or ≤0.5, Beta: ≥0.5 or ≤-0.5",
+                "CI does not cross 1 (OR/RR) or 0 (beta)",
+            ],
+            association.get_selected_options("3C"),
+        )
+        association.zygosity = None
+        self.assertEqual([], association.get_selected_options("1C"))
+        self.assertEqual(
+            SCORE_DATA,
+            get_score_data(Association.objects.values_list(*SCORE_FIELDS).get()),
+        )
+
+    def test_codes_are_stable(self) -> None:
+        """Options added by a new framework version should get new codes."""
+        option_names = read_option_names(DEFAULT_FRAMEWORK_VERSION)
+        new_option_names = {
+            **option_names,
+            "1B": (*reversed(option_names["1B"]), "5-field"),
+        }
+        get_option_names.cache_clear()
+        self.addCleanup(get_option_names.cache_clear)
+        with (
+            mock.patch("hci.scoring.get_framework_versions", return_value=["v2", "v1"]),
+            mock.patch(
+                "hci.scoring.read_option_names",
+                side_effect=lambda version: (
+                    new_option_names if version == "v2" else option_names
+                ),
+            ),
+        ):
+            self.assertEqual(
+                (
+                    "1-field",
+                    "2-field",
+                    "3-field, G-group, P-group",
+                    "4-field",
+                    "5-field",
+                ),
+                get_option_names("1B"),
+            )
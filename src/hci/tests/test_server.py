@@ -0,0 +1,267 @@
+"""Test how the HCI is started, served, and monitored."""
+
+import json
+import signal
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.http import HttpRequest, HttpResponse
+from django.template import engines
+from django.test import RequestFactory, TestCase, override_settings
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+from prometheus_client.values import MultiProcessValue
+
+from config import gunicorn, warmup
+from config.metrics import render_metrics
+from config.middleware import ReadinessCheck, RequestProfilingMiddleware
+from config.warmup import warm_caches
+from hci import autocomplete
+from hci.management.commands.profile_startup import (
+    ImportTime,
+    get_package_times,
+    parse_import_times,
+)
+from hci.models import Allele
+from hci.tests.fixtures import make_temporary_directory
+
+
+class ProfileStartupTests(TestCase):
+    """Make sure startup is profiled, and doesn't import what it needn't."""
+
+    def test_parse(self) -> None:
+        """Import times should be parsed, and added up by package."""
+        import_times = parse_import_times(
+            [
+                "import time: self [us] | cumulative | imported package",
+                "import time:       307 |      29281 |   pydantic",
+                "import time:      3289 |     219626 | hci.scoring",
+                "import time:      2114 |       2114 | hci.autocomplete",
+                "Traceback (most recent call last):",
+            ]
+        )
+        self.assertEqual(
+            [
+                ImportTime("pydantic", 307, 29281),
+                ImportTime("hci.scoring", 3289, 219626),
+                ImportTime("hci.autocomplete", 2114, 2114),
+            ],
+            import_times,
+        )
+        self.assertEqual(
+            {"hci": 5403, "pydantic": 307}, get_package_times(import_times)
+        )
+
+    def test_setup_is_lazy(self) -> None:
+        """Starting up, or running the checks, shouldn't import the score models."""
+        for target in ("setup", "checks"):
+            with self.subTest(target=target):
+                output = StringIO()
+                call_command("profile_startup", target, limit=1000, stdout=output)
+                self.assertIn("  hci.scoring\n", output.getvalue())
+                for module in ("numpy", "pydantic", "score.steps", "score.validator"):
+                    self.assertNotIn(f"  {module}\n", output.getvalue())
+
+
+class ServerConfigTests(TestCase):
+    """Make sure the production server warms its caches, and watches its memory."""
+
+    def test_warm_caches(self) -> None:
+        """Every cache should be warmed, including the allele names."""
+        Allele.objects.create(imgt_name="HLA-A*01:01:01:01")
+        autocomplete.allele_names.invalidate()
+        self.assertEqual(list(warm_caches()), ["scoring", "templates", "allele names"])
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                ["HLA-A*01:01:01:01"], autocomplete.suggest_allele_names("A*01")
+            )
+
+    def test_warm_caches_failure(self) -> None:
+        """A cache that can't be warmed should be logged, and left to be filled
+        later."""
+        fail = mock.Mock(side_effect=DatabaseError("The database isn't up"))
+        with (
+            mock.patch.dict(warmup.WARMERS, {"allele names": fail}),
+            self.assertLogs("config.warmup", level="ERROR"),
+        ):
+            self.assertEqual(list(warm_caches()), ["scoring", "templates"])
+
+    def test_watch_memory(self) -> None:
+        """A worker using too much private memory should be stopped gracefully."""
+        memory = gunicorn.get_private_memory()
+        if memory is None:
+            self.skipTest("The kernel doesn't report private memory")
+        self.assertGreater(memory, 0)
+        # The first check passes, and the second stops the worker.
+        worker = mock.Mock(alive=True, pid=1234)
+        with (
+            mock.patch(
+                "config.gunicorn.get_private_memory", side_effect=[2**20, 2**30]
+            ),
+            mock.patch("config.gunicorn.os.kill") as kill,
+        ):
+            gunicorn.watch_memory(worker, max_memory=2**29, interval=0)
+        kill.assert_called_once_with(1234, signal.SIGTERM)
+
+
+class MonitoringTests(TestCase):
+    """Make sure health checks and metrics are answered, and metrics are collected."""
+
+    def test_liveness(self) -> None:
+        """The liveness check shouldn't query anything."""
+        with self.assertNumQueries(0):
+            response = self.client.get("/ping/")
+        self.assertEqual(b"pong", response.content)
+
+    def test_readiness(self) -> None:
+        """The readiness check should query the database, at most once per interval."""
+        with mock.patch("config.middleware.readiness_check", ReadinessCheck(60)):
+            with self.assertNumQueries(1):
+                self.assertEqual(200, self.client.get("/ready/").status_code)
+            with self.assertNumQueries(0):
+                self.assertEqual(200, self.client.get("/ready/").status_code)
+        with (
+            mock.patch("config.middleware.readiness_check", ReadinessCheck(60)),
+            mock.patch(
+                "config.middleware.connection.cursor",
+                side_effect=DatabaseError("The database isn't up"),
+            ),
+            self.assertLogs("config.middleware", level="WARNING"),
+        ):
+            self.assertEqual(503, self.client.get("/ready/").status_code)
+
+    @override_settings(DEBUG=True, METRICS_TOKEN=None)
+    def test_metrics(self) -> None:
+        """Requests should be counted by view and status, with their queries."""
+        self.client.get("/")
+        self.client.get("/no/such/page/")
+        metrics = self.client.get("/metrics").content.decode()
+        self.assertIn(
+            'hci_requests_total{method="GET",status="200",view="home"}', metrics
+        )
+        self.assertIn(
+            'hci_requests_total{method="GET",status="404",view="unmatched"}', metrics
+        )
+        self.assertIn(
+            'hci_request_duration_seconds_bucket{le="+Inf",view="home"}', metrics
+        )
+        self.assertIn('hci_db_queries_total{view="home"}', metrics)
+        self.assertIn("hci_requests_in_flight 0.0", metrics)
+
+    @override_settings(METRICS_TOKEN="token")
+    def test_metrics_token(self) -> None:
+        """Metrics should only be reported with the token, if there is one."""
+        self.assertEqual(401, self.client.get("/metrics").status_code)
+        response = self.client.get(
+            "/metrics", headers={"Authorization": "Bearer token"}
+        )
+        self.assertEqual(200, response.status_code)
+
+    @override_settings(DEBUG=False, METRICS_TOKEN=None)
+    def test_metrics_without_token(self) -> None:
+        """Metrics shouldn't be reported without a token, unless debugging."""
+        self.assertEqual(404, self.client.get("/metrics").status_code)
+
+    def test_workers(self) -> None:
+        """Metrics should be added up across workers, including workers that exited."""
+        directory = make_temporary_directory(self)
+        with (
+            mock.patch.dict("os.environ", {"PROMETHEUS_MULTIPROC_DIR": str(directory)}),
+            mock.patch("config.metrics.MULTIPROCESS", True),
+        ):
+            for pid in (101, 102):
+                with mock.patch(
+                    "prometheus_client.values.ValueClass",
+                    MultiProcessValue(lambda pid=pid: pid),
+                ):
+                    registry = CollectorRegistry()
+                    Counter(
+                        "requests_total", "Requests.", ["view"], registry=registry
+                    ).labels("home").inc()
+                    Gauge(
+                        "in_flight",
+                        "Requests in flight.",
+                        multiprocess_mode="livesum",
+                        registry=registry,
+                    ).inc()
+                    Histogram(
+                        "duration_seconds",
+                        "Durations.",
+                        buckets=[0.1, 1],
+                        registry=registry,
+                    ).observe(0.5)
+            gunicorn.child_exit(None, mock.Mock(pid=101))
+            metrics = render_metrics().decode()
+        self.assertIn('requests_total{view="home"} 2.0', metrics)
+        self.assertIn("in_flight 1.0", metrics)
+        self.assertIn('duration_seconds_bucket{le="0.1"} 0.0', metrics)
+        self.assertIn('duration_seconds_bucket{le="1.0"} 2.0', metrics)
+        self.assertIn('duration_seconds_bucket{le="+Inf"} 2.0', metrics)
+        self.assertIn("duration_seconds_sum 1.0", metrics)
+        self.assertIn("duration_seconds_count 2.0", metrics)
+
+
+# The templates when requests are profiled.
+PROFILED_TEMPLATES = [
+    {**settings.TEMPLATES[0], "BACKEND": "config.profiling.ProfiledDjangoTemplates"}
+]
+
+
+class RequestProfilingTests(TestCase):
+    """Make sure sampled requests are profiled, and slow ones are logged."""
+
+    def test_off(self) -> None:
+        """Requests shouldn't be profiled unless it's turned on."""
+        with self.assertRaises(MiddlewareNotUsed):
+            RequestProfilingMiddleware(HttpResponse)
+
+    @override_settings(
+        REQUEST_PROFILING_SAMPLE_RATE=1,
+        TEMPLATES=PROFILED_TEMPLATES,
+        REQUEST_PROFILING_SLOW_SECONDS=60,
+        REQUEST_PROFILING_MAX_QUERIES=100,
+        REQUEST_PROFILING_MAX_REPEATS=3,
+    )
+    def test_repeated_queries(self) -> None:
+        """A request that makes the same query many times should be logged."""
+
+        def view(_request: HttpRequest) -> HttpResponse:
+            for username in ("a", "b", "c"):
+                User.objects.filter(username=username).exists()
+            return HttpResponse(engines["django"].from_string("{{ x }}").render())
+
+        middleware = RequestProfilingMiddleware(view)
+        with self.assertLogs("config.middleware.slow_requests") as logs:
+            middleware(RequestFactory().get("/curations/"))
+        report = json.loads(logs.records[0].getMessage())
+        self.assertEqual(["repeated_queries"], report["reasons"])
+        self.assertEqual("/curations/", report["path"])
+        self.assertEqual(3, report["num_queries"])
+        self.assertEqual(1, len(report["repeated_queries"]))
+        self.assertEqual(3, report["repeated_queries"][0]["count"])
+        self.assertIn('FROM "auth_user"', report["repeated_queries"][0]["sql"])
+        self.assertEqual(3, len(report["slowest_queries"]))
+        self.assertIn("template_time_ms", report)
+
+        with self.assertNoLogs("config.middleware.slow_requests"):
+            middleware = RequestProfilingMiddleware(HttpResponse)
+            middleware(RequestFactory().get("/"))
+
+    @override_settings(
+        REQUEST_PROFILING_SAMPLE_RATE=1,
+        TEMPLATES=PROFILED_TEMPLATES,
+        REQUEST_PROFILING_SLOW_SECONDS=0,
+    )
+    def test_slow_request(self) -> None:
+        """A slow request should be logged with its view and timings."""
+        with self.assertLogs("config.middleware.slow_requests") as logs:
+            self.client.get("/")
+        report = json.loads(logs.records[0].getMessage())
+        self.assertIn("slow", report["reasons"])
+        self.assertEqual("home", report["view"])
+        self.assertEqual(200, report["status"])
+        self.assertGreater(report["template_time_ms"], 0)
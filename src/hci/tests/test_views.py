@@ -0,0 +1,207 @@
+"""Test the HCI's views."""
+
+from django.contrib.auth.models import User
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from hci.forms import CustomSignUpForm
+from hci.models import (
+    Allele,
+    Classification,
+    Curation,
+    Curator,
+    Disease,
+    Haplotype,
+    Publication,
+)
+from hci.tests.fixtures import create_association
+from hci.views import CURATIONS_PER_PAGE
+
+
+class ViewTests(TestCase):
+    """Make sure the views of the HCI are behaving as expected."""
+
+    def test_home_page(self) -> None:
+        """The home page should return a status code of 200."""
+        response = self.client.get("/", follow=True)
+        self.assertEqual(response.status_code, 200)
+
+
+class SignupViewTests(TestCase):
+    """Make sure the signup view works as expected."""
+
+    def setUp(self) -> None:
+        """Set up the test environment."""
+        self.client = Client()
+        self.signup_url = reverse("signup")
+        self.user_data = {
+            "username": "test_user",
+            "email": "test@example.com",
+            "first_name": "Test",
+            "last_name": "User",
+            "password1": "secure_password_123",
+            "password2": "secure_password_123",
+        }
+
+    def test_signup_page_loads(self) -> None:
+        """Make sure the signup page loads correctly with a GET request."""
+        response = self.client.get(self.signup_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "registration/signup.html")
+        self.assertIsInstance(response.context["form"], CustomSignUpForm)
+
+    def test_signup_successful(self) -> None:
+        """Make sure a user can successfully sign up with valid data."""
+        response = self.client.post(self.signup_url, self.user_data)
+
+        # Check we're redirected to home page.
+        self.assertRedirects(response, reverse("home"))
+
+        # Check user was created in the database.
+        self.assertTrue(User.objects.filter(username="test_user").exists())
+
+        # Check user is logged in.
+        user = response.wsgi_request.user
+        self.assertTrue(user.is_authenticated)
+        if isinstance(user, User):
+            self.assertEqual(user.username, "test_user")
+            self.assertEqual(user.email, "test@example.com")
+            self.assertEqual(user.first_name, "Test")
+            self.assertEqual(user.last_name, "User")
+
+    def test_signup_invalid_form(self) -> None:
+        """Make sure we can't sign up with invalid data."""
+        # Remove required field.
+        invalid_data = self.user_data.copy()
+        invalid_data.pop("email")
+
+        response = self.client.post(self.signup_url, invalid_data)
+
+        # The form should be returned with validation errors.
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "registration/signup.html")
+        self.assertFalse(response.context["form"].is_valid())
+
+        # Check user wasn't created.
+        self.assertFalse(User.objects.filter(username="test_user").exists())
+
+    def test_signup_password_mismatch(self) -> None:
+        """Make sure we can't sign up when passwords don't match."""
+        invalid_data = self.user_data.copy()
+        invalid_data["password2"] = "different_password"
+
+        response = self.client.post(self.signup_url, invalid_data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "registration/signup.html")
+        self.assertFalse(response.context["form"].is_valid())
+        self.assertIn("password2", response.context["form"].errors)
+
+        # Check user wasn't created.
+        self.assertFalse(User.objects.filter(username="test_user").exists())
+
+    def test_signup_duplicate_username(self) -> None:
+        """Make sure we can't sign up with a duplicate username."""
+        # Create a user first.
+        User.objects.create_user(
+            username="test_user", email="existing@example.com", password="password_123"
+        )
+
+        response = self.client.post(self.signup_url, self.user_data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "registration/signup.html")
+        self.assertFalse(response.context["form"].is_valid())
+        self.assertIn("username", response.context["form"].errors)
+
+        # Only the original user should exist.
+        self.assertEqual(User.objects.filter(username="test_user").count(), 1)
+
+
+class AllCurationsViewTests(TestCase):
+    """Make sure the curation browser lists curations efficiently."""
+
+    def setUp(self) -> None:
+        """Create curators to curate with."""
+        self.curators = [
+            Curator.objects.create(
+                affiliation_id=10000 + i,
+                user=User.objects.create_user(username=f"curator{i}"),
+            )
+            for i in range(2)
+        ]
+
+    def create_curation(self, index: int) -> Curation:
+        """Create a curation with a classification by each curator."""
+        allele = Allele.objects.create(imgt_name=f"HLA-B*27:{index:02}", car_id="")
+        haplotype = Haplotype.objects.create(chromosome_mapping_order="")
+        haplotype.constituent_alleles.add(allele)
+        curation = Curation.objects.create(
+            disease=Disease.objects.create(mondo_id=f"MONDO:{index:07}"),
+            allele=allele,
+            haplotype=haplotype,
+        )
+        for curator in self.curators:
+            classification = Classification.objects.create(
+                publication=Publication.objects.create(
+                    publication_id=f"{index}-{curator.pk}",
+                    publication_type="pubmed",
+                    author="",
+                    year="",
+                    title="",
+                ),
+                curator=curator,
+            )
+            classification.association.add(create_association())
+            curation.classifications.add(classification)
+        return curation
+
+    def test_fixed_query_count(self) -> None:
+        """Listing a page of curations takes the same queries however many there are."""
+        # One query for the curations, and one each for the haplotypes' alleles, the
+        # classifications, and the classifications' associations.
+        self.create_curation(0)
+        with self.assertNumQueries(4):
+            self.client.get(reverse("curation"))
+        for index in range(1, CURATIONS_PER_PAGE + 5):
+            self.create_curation(index)
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse("curation"))
+        self.assertContains(response, "HLA-B*27:")
+        self.assertContains(response, "curator1")
+
+    def test_pagination(self) -> None:
+        """Following the next page links should list every curation once."""
+        curations = [self.create_curation(index) for index in range(30)]
+        listed = []
+        url = reverse("curation")
+        while True:
+            response = self.client.get(url)
+            listed.extend(response.context["curations"])
+            if response.context["next_cursor"] is None:
+                break
+            url = f"{reverse('curation')}?after={response.context['next_cursor']}"
+        self.assertEqual(curations[::-1], listed)
+
+    def test_filters(self) -> None:
+        """Curations should be filtered by disease, allele, and curator."""
+        curations = [self.create_curation(index) for index in range(3)]
+        for query, expected in [
+            ({"disease": "MONDO:0000001"}, [curations[1]]),
+            ({"allele": "HLA-B*27:02"}, [curations[2]]),
+            ({"allele": "B*27"}, curations[::-1]),
+            ({"allele": "not an allele"}, []),
+            ({"curator": "curator0"}, curations[::-1]),
+            ({"curator": "someone else"}, []),
+            ({"disease": "MONDO:0000001", "allele": "HLA-B*27:02"}, []),
+        ]:
+            with self.subTest(query=query):
+                response = self.client.get(reverse("curation"), query)
+                self.assertEqual(expected, response.context["curations"])
+
+    def test_invalid_cursor(self) -> None:
+        """An invalid cursor should be reported, not crash the page."""
+        response = self.client.get(reverse("curation"), {"after": "not a number"})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([], response.context["curations"])
+        self.assertIn("after", response.context["form"].errors)
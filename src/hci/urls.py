@@ -13,6 +13,7 @@ urlpatterns = [
         views.new_allele_haplotype,
         name="new_allele_haplotype",
     ),
+    path("allele/autocomplete/", views.allele_autocomplete, name="allele_autocomplete"),
     path("curation/", views.all_curations, name="curation"),
     path("curation/new/", views.new_curation, name="new_curation"),
     path("disease/new/", views.new_disease, name="new_disease"),
@@ -3,10 +3,17 @@
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
+from django.db.models import Prefetch, QuerySet
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import redirect, render
 
-from hci.forms import CustomSignUpForm
+from hci.autocomplete import suggest_allele_names
+from hci.forms import CurationFilterForm, CustomSignUpForm
+from hci.imgt import ImgtException
+from hci.models import Allele, Association, Classification, Curation
+
+# How many curations the curation browser shows at a time.
+CURATIONS_PER_PAGE = 25
 
 
 def signup(request: HttpRequest) -> HttpResponse:
@@ -60,9 +67,82 @@ def affiliation(request: HttpRequest) -> HttpResponse:
     return render(request, "hci/affiliation.html", context)
 
 
+def get_curations(
+    disease: str = "", allele: str = "", curator: str = ""
+) -> QuerySet[Curation]:
+    """Return the curations to browse, newest first, with everything they show.
+
+    Related objects are fetched up front, with a fixed number of queries however many
+    curations there are, so listing them doesn't query the database once per curation.
+
+    :param disease: Only return curations of the disease with this Mondo ID.
+    :param allele: Only return curations of the alleles in the group with this IPD-
+        IMGT/HLA name, e.g. "HLA-A*02" or "HLA-A*02:01".
+    :param curator: Only return curations with a classification by this curator's
+        username.
+    """
+    associations: QuerySet[Association] = Association.objects.for_listing()
+    classifications: QuerySet[Classification] = Classification.objects.select_related(
+        "publication", "curator__user"
+    ).prefetch_related(Prefetch("association", queryset=associations))
+    curations = Curation.objects.select_related(
+        "disease", "allele", "haplotype"
+    ).prefetch_related(
+        "haplotype__constituent_alleles",
+        Prefetch("classifications", queryset=classifications),
+    )
+    if disease:
+        curations = curations.filter(disease__mondo_id=disease)
+    if allele:
+        try:
+            alleles = Allele.objects.in_group(allele)
+        except ImgtException:
+            alleles = Allele.objects.filter(imgt_name=allele)
+        curations = curations.filter(allele__in=alleles)
+    if curator:
+        # Filter through a subquery rather than a join, so a curation with several
+        # classifications by the curator is only returned once.
+        curations = curations.filter(
+            pk__in=Curation.objects.filter(
+                classifications__curator__user__username=curator
+            ).values("pk")
+        )
+    return curations.order_by("-pk")
+
+
 def all_curations(request: HttpRequest) -> HttpResponse:
-    """Allow the user to browse existing curations."""
-    return render(request, "hci/all_curations.html")
+    """Allow the user to browse existing curations.
+
+    Curations are paged through with a cursor (the primary key of the last curation on
+    the previous page) rather than an offset, so every page is as quick to fetch as the
+    first.
+    """
+    form = CurationFilterForm(request.GET)
+    context = {"form": form, "curations": [], "next_cursor": None}
+    if form.is_valid():
+        curations = get_curations(
+            form.cleaned_data["disease"],
+            form.cleaned_data["allele"],
+            form.cleaned_data["curator"],
+        )
+        if form.cleaned_data["after"] is not None:
+            curations = curations.filter(pk__lt=form.cleaned_data["after"])
+        # Fetch one more curation than fits on the page, to tell if there's a next page.
+        page = list(curations[: CURATIONS_PER_PAGE + 1])
+        context["curations"] = page[:CURATIONS_PER_PAGE]
+        if len(page) > CURATIONS_PER_PAGE:
+            context["next_cursor"] = page[CURATIONS_PER_PAGE - 1].pk
+    return render(request, "hci/all_curations.html", context)
+
+
+@login_required
+def allele_autocomplete(request: HttpRequest) -> HttpResponse:
+    """Suggest the names of alleles starting with what's been typed.
+
+    This returns the options of a datalist, for an allele input to fetch as it changes.
+    """
+    names = suggest_allele_names(request.GET.get("allele", ""))
+    return render(request, "hci/partials/allele_name_options.html", {"names": names})
 
 
 @login_required
@@ -0,0 +1,82 @@
+"""Score a file of HLA classifications from the command line.
+
+Example, scoring a JSONL file of score data into a CSV file:
+    python -m score exported_score_data.jsonl --output scores.csv --format csv
+
+Input is read from stdin and results are written to stdout by default, so this can be
+used in a pipeline:
+    gunzip -c exported_score_data.jsonl.gz | python -m score > scores.jsonl
+"""
+
+from typing import IO
+
+import click
+
+from score.steps import DEFAULT_FRAMEWORK_VERSION, get_framework_versions
+from score.stream import DEFAULT_CHUNK_SIZE, score_lines, write_csv, write_jsonl
+
+
+@click.command()
+@click.argument(
+    "input_file", type=click.File("r", encoding="utf-8", lazy=False), default="-"
+)
+@click.option(
+    "--output",
+    type=click.File("w", encoding="utf-8", lazy=False),
+    default="-",
+    help="Where to write the results (defaults to stdout)",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["jsonl", "csv"]),
+    default="jsonl",
+    help="The format of the results",
+)
+@click.option(
+    "--chunk-size",
+    type=click.IntRange(min=1),
+    default=DEFAULT_CHUNK_SIZE,
+    help="How many lines to validate and score at a time",
+)
+@click.option(
+    "--id-field",
+    default=None,
+    help="A field of the score data to copy into the results, e.g. an association ID",
+)
+@click.option(
+    "--framework-version",
+    type=click.Choice(get_framework_versions()),
+    default=DEFAULT_FRAMEWORK_VERSION,
+    help="The version of the scoring framework to score with",
+)
+# Click passes each option to the command as an argument.
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def main(
+    input_file: IO[str],
+    output: IO[str],
+    output_format: str,
+    chunk_size: int,
+    id_field: str | None,
+    framework_version: str,
+) -> None:
+    """Score lines of JSON score data, writing a result for each line."""
+    results = score_lines(
+        input_file,
+        chunk_size=chunk_size,
+        id_field=id_field,
+        version=framework_version,
+    )
+    if output_format == "csv":
+        counts = write_csv(results, output)
+    else:
+        counts = write_jsonl(results, output)
+    output.flush()
+    click.echo(
+        f"Scored {counts['scored']} lines, {counts['errors']} lines with errors",
+        err=True,
+    )
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,317 @@
+"""Benchmark the score package.
+
+Each benchmark runs an operation over a set of synthetic score data in rounds, and
+reports the operations per second and percentiles of the time per operation across the
+rounds. Results can be saved as a baseline, and later results compared against it.
+
+To save a baseline before a change:
+    python -m score.benchmark --save baseline.json
+
+To check for regressions against the baseline after the change:
+    python -m score.benchmark --compare baseline.json
+
+Comparing exits with status 1 if any benchmark is slower than the baseline by more than
+the threshold. Only compare results from the same machine, with the same options.
+"""
+
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import click
+
+from score.calculator import calculate, calculate_many, encode_many
+from score.lattice import get_lattice
+from score.steps import steps
+from score.validator import STEP_FIELDS, ValidScoreData, validate
+
+DEFAULT_SIZE = 1_000
+DEFAULT_ROUNDS = 20
+DEFAULT_THRESHOLD = 0.2
+
+# The percentiles of the time per operation to report.
+PERCENTILES = (50, 90, 99)
+
+# The module whose import time is benchmarked.
+IMPORT_TIME_MODULE = "score.validator"
+
+
+def generate_score_data(rng: random.Random, invalid_rate: float = 0.0) -> dict:
+    """Return random score data.
+
+    :param rng: The random number generator to choose options with.
+    :param invalid_rate: The probability that the score data has an unknown option.
+    """
+    data: dict = {}
+    for step_number, (step_name, field_name) in STEP_FIELDS.items():
+        step_index = steps.index[step_number]
+        option_or_options: str | List[str]
+        if step_index.multi_select and rng.random() < 0.5:
+            option_or_options = rng.sample(
+                step_index.option_names, rng.randint(0, len(step_index.option_names))
+            )
+        else:
+            option_or_options = rng.choice(step_index.option_names)
+        data.setdefault(step_name, {})[field_name] = option_or_options
+    if rng.random() < invalid_rate:
+        data["step_2"]["typing_method"] = "Not an option"
+    return data
+
+
+def _get_benchmarks(payloads: List[dict]) -> Dict[str, Tuple[Callable[[], Any], int]]:
+    """Return the benchmarks for the given score data.
+
+    :returns: Each benchmark's name mapped to a function that runs a round of it, and
+        the number of operations in a round.
+    """
+    lookups = [
+        (step_number, option_name)
+        for step_number in STEP_FIELDS
+        for option_name in steps.index[step_number].option_names
+    ]
+    columns = encode_many(payloads)
+
+    def steps_get_option_to_points_map() -> None:
+        for step_number, _ in lookups:
+            steps.get_option_to_points_map(step_number)
+
+    def steps_index_lookup() -> None:
+        for step_number, option_name in lookups:
+            _ = steps.index[step_number].option_to_points[option_name]
+
+    def valid_score_data() -> None:
+        for data in payloads:
+            ValidScoreData.model_validate(data)
+
+    def validate_compiled() -> None:
+        for data in payloads:
+            validate(data)
+
+    def calculate_scalar() -> None:
+        for data in payloads:
+            calculate(data)
+
+    return {
+        "steps_get_option_to_points_map": (
+            steps_get_option_to_points_map,
+            len(lookups),
+        ),
+        "steps_index_lookup": (steps_index_lookup, len(lookups)),
+        "valid_score_data": (valid_score_data, len(payloads)),
+        "validate_compiled": (validate_compiled, len(payloads)),
+        "calculate": (calculate_scalar, len(payloads)),
+        "calculate_many": (lambda: calculate_many(payloads), len(payloads)),
+        "calculate_many_codes": (lambda: calculate_many(columns), len(payloads)),
+        "lattice_calculate_many": (
+            lambda: get_lattice().calculate_many(payloads),
+            len(payloads),
+        ),
+        "lattice_calculate_many_codes": (
+            lambda: get_lattice().calculate_many(columns),
+            len(payloads),
+        ),
+    }
+
+
+def _summarize(seconds_per_op: List[float]) -> Dict[str, float]:
+    """Summarize the time per operation of each round of a benchmark."""
+    if len(seconds_per_op) > 1:
+        cut_points = statistics.quantiles(seconds_per_op, n=100, method="inclusive")
+    else:
+        cut_points = seconds_per_op * 99
+    summary = {"ops_per_sec": 1 / statistics.median(seconds_per_op)}
+    for percentile in PERCENTILES:
+        summary[f"p{percentile}_us"] = cut_points[percentile - 1] * 1e6
+    return summary
+
+
+def run_benchmark(func: Callable[[], Any], ops: int, rounds: int) -> Dict[str, float]:
+    """Time rounds of a benchmark, after an untimed round to warm up caches.
+
+    :param func: A function that runs a round of the benchmark.
+    :param ops: The number of operations in a round.
+    :param rounds: The number of rounds to time.
+    :returns: The operations per second, and percentiles of the time per operation in
+        microseconds.
+    """
+    func()
+    seconds_per_op = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        seconds_per_op.append((time.perf_counter() - start) / max(ops, 1))
+    return _summarize(seconds_per_op)
+
+
+def measure_import_time(module: str, rounds: int) -> Dict[str, float]:
+    """Time importing a module in fresh interpreters, with `python -X importtime`.
+
+    :returns: The imports per second, and percentiles of the time per import in
+        microseconds.
+    """
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).resolve().parent.parent))
+    seconds_per_import = []
+    for _ in range(rounds):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            check=True,
+            env=env,
+            text=True,
+        )
+        # Lines look like "import time: <self us> | <cumulative us> | <module>".
+        for line in result.stderr.splitlines():
+            fields = line.split("|")
+            if len(fields) == 3 and fields[2].strip() == module:
+                seconds_per_import.append(int(fields[1]) / 1e6)
+    return _summarize(seconds_per_import)
+
+
+def run_benchmarks(
+    size: int = DEFAULT_SIZE,
+    rounds: int = DEFAULT_ROUNDS,
+    seed: int = 0,
+    names: List[str] | None = None,
+) -> Dict[str, Dict[str, float]]:
+    """Run the benchmarks on synthetic score data.
+
+    :param size: How much score data to generate.
+    :param rounds: How many rounds to time each benchmark for.
+    :param seed: The seed of the random number generator that generates score data.
+    :param names: The names of the benchmarks to run. Defaults to all of them.
+    :returns: Each benchmark's name mapped to its results.
+    """
+    rng = random.Random(seed)
+    payloads = [generate_score_data(rng) for _ in range(size)]
+    results = {}
+    for name, (func, ops) in _get_benchmarks(payloads).items():
+        if names is None or name in names:
+            results[name] = run_benchmark(func, ops, rounds)
+    if names is None or "import_time" in names:
+        results["import_time"] = measure_import_time(IMPORT_TIME_MODULE, rounds)
+    return results
+
+
+def get_benchmark_names() -> List[str]:
+    """Return the names of the benchmarks."""
+    return [*_get_benchmarks([]), "import_time"]
+
+
+def compare_results(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[str]:
+    """Compare results against a baseline.
+
+    :param threshold: How much slower than the baseline a benchmark can be before it's a
+        regression, e.g. 0.2 for 20% fewer operations per second.
+    :returns: A description of each regression. Benchmarks missing from either the
+        results or the baseline are skipped.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        change = result["ops_per_sec"] / baseline[name]["ops_per_sec"] - 1
+        if change < -threshold:
+            regressions.append(
+                f"{name}: {result['ops_per_sec']:,.0f} ops/s is {-change:.0%} slower "
+                f"than the baseline's {baseline[name]['ops_per_sec']:,.0f} ops/s"
+            )
+    return regressions
+
+
+@click.command()
+@click.option(
+    "--size",
+    type=click.IntRange(min=1),
+    default=DEFAULT_SIZE,
+    help="How much synthetic score data to run the benchmarks on",
+)
+@click.option(
+    "--rounds",
+    type=click.IntRange(min=1),
+    default=DEFAULT_ROUNDS,
+    help="How many rounds to time each benchmark for",
+)
+@click.option("--seed", type=int, default=0, help="The seed for the score data")
+@click.option(
+    "--only",
+    type=click.Choice(get_benchmark_names()),
+    multiple=True,
+    help="A benchmark to run (can be given more than once; defaults to all of them)",
+)
+@click.option(
+    "--save",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Where to save the results as a baseline",
+)
+@click.option(
+    "--compare",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="A saved baseline to compare the results against",
+)
+@click.option(
+    "--threshold",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_THRESHOLD,
+    help="How much slower than the baseline is a regression, e.g. 0.2 for 20%",
+)
+# Click passes each option to the command as an argument.
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def main(
+    size: int,
+    rounds: int,
+    seed: int,
+    only: Tuple[str, ...],
+    save: Path | None,
+    compare: Path | None,
+    threshold: float,
+) -> None:
+    """Run the score benchmarks, optionally saving or comparing against a baseline."""
+    results = run_benchmarks(size, rounds, seed, list(only) or None)
+    header = f"{'benchmark':<32}{'ops/s':>14}" + "".join(
+        f"{f'p{percentile} (us)':>12}" for percentile in PERCENTILES
+    )
+    click.echo(header)
+    for name, result in results.items():
+        click.echo(
+            f"{name:<32}{result['ops_per_sec']:>14,.0f}"
+            + "".join(
+                f"{result[f'p{percentile}_us']:>12.2f}" for percentile in PERCENTILES
+            )
+        )
+    if save is not None:
+        baseline = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "size": size,
+            "rounds": rounds,
+            "seed": seed,
+            "results": results,
+        }
+        save.write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+        click.echo(f"Saved the results to {save}")
+    if compare is not None:
+        baseline = json.loads(compare.read_text(encoding="utf-8"))
+        regressions = compare_results(results, baseline["results"], threshold)
+        if regressions:
+            click.echo("Regressions:", err=True)
+            for regression in regressions:
+                click.echo(f"  {regression}", err=True)
+            sys.exit(1)
+        click.echo(f"No regressions against {compare}")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -8,62 +8,93 @@ Output:
 This module contains the scoring logic.
 """
 
+import functools
 import logging
-from typing import List
+import time
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Tuple, TypeVar
 
+import numpy as np
 from pydantic import ValidationError
 
-from score.steps import steps
+from score import instrumentation
+from score.instrumentation import Collector
+from score.steps import DEFAULT_FRAMEWORK_VERSION, get_steps
 from score.validator import (
-    ValidScoreData,
+    STEP_FIELDS,
+    ScoreCodes,
     ValidStep1Data,
     ValidStep2Data,
     ValidStep3Data,
     ValidStep4Data,
     ValidStep5Data,
     ValidStep6Data,
+    get_score_codes,
+    get_validator,
+    validate,
 )
 
 logger = logging.getLogger(__name__)
 
+Points = TypeVar("Points", float, np.ndarray)
+
 
 class CalculatorException(Exception):
     """Define an exception for the calculator module."""
 
 
-def _get_points_for_single_option(option: str, step_number: str) -> float:
+def _get_points_for_single_option(
+    option: str, step_number: str, version: str | None = None
+) -> float:
     """Return points for the given option/step combination."""
-    options_to_points_map = steps.get_option_to_points_map(step_number)
-    if option in options_to_points_map:
-        return options_to_points_map[option]
+    step_index = get_steps(version).index.get(step_number)
+    if step_index is None:
+        raise CalculatorException(
+            f"Step number {step_number} not found in canonical list of step numbers"
+        )
+    if option in step_index.option_to_points:
+        return step_index.option_to_points[option]
     raise CalculatorException(
         f"Option name {option} not found in canonical list of option names"
     )
 
 
-def _get_points_for_multiple_options(options: List[str], step_number: str) -> float:
-    """Return points for the given options/step combination."""
+def _get_points_for_multiple_options(
+    options: List[str], step_number: str, version: str | None = None
+) -> float:
+    """Return points for the given options/step combination.
+
+    The options are a subset of the step's options, so an option that's listed more than
+    once is only counted once.
+    """
     points = 0.0
+    seen = set()
     for option in options:
-        if isinstance(option, str):
-            points += _get_points_for_single_option(option, step_number)
-        else:
+        if not isinstance(option, str):
             raise CalculatorException("Received non-string option")
+        if option not in seen:
+            seen.add(option)
+            points += _get_points_for_single_option(option, step_number, version)
     return points
 
 
-def _get_points(option_or_options: str | List[str] | None, step_number: str) -> float:
+def _get_points(
+    option_or_options: str | List[str] | None,
+    step_number: str,
+    version: str | None = None,
+) -> float:
     """Return points for the given option(s)/step combination.
 
     :param option_or_options: A single option or a list of options.
     :param step_number: The step number we're interested in getting points for, e.g. "1A".
+    :param version: The framework version to get points from. Defaults to the default
+        version.
     :raises CalculatorException: If `option_or_options` is the wrong type.
     :returns: The points for the given `option_or_options`.
     """
     if isinstance(option_or_options, str):
-        return _get_points_for_single_option(option_or_options, step_number)
+        return _get_points_for_single_option(option_or_options, step_number, version)
     if isinstance(option_or_options, list):
-        return _get_points_for_multiple_options(option_or_options, step_number)
+        return _get_points_for_multiple_options(option_or_options, step_number, version)
     if option_or_options is None:
         return 0.0
     raise CalculatorException(
@@ -71,71 +102,300 @@ def _get_points(option_or_options: str | List[str] | None, step_number: str) ->
     )
 
 
-def calculate_step_1_points(data: ValidStep1Data) -> float:
+def calculate_step_1_points(data: ValidStep1Data, version: str | None = None) -> float:
     """Calculate points for step 1."""
     step_1_points = 0.0
-    step_1_points += _get_points(data.a_allele_or_haplotype, "1A")
-    step_1_points += _get_points(data.b_allele_resolution, "1B")
-    step_1_points += _get_points(data.c_zygosity, "1C")
-    step_1_points += _get_points(data.d_phase, "1D")
+    step_1_points += _get_points(data.a_allele_or_haplotype, "1A", version)
+    step_1_points += _get_points(data.b_allele_resolution, "1B", version)
+    step_1_points += _get_points(data.c_zygosity, "1C", version)
+    step_1_points += _get_points(data.d_phase, "1D", version)
     return step_1_points
 
 
-def calculate_step_2_points(data: ValidStep2Data) -> float:
+def calculate_step_2_points(data: ValidStep2Data, version: str | None = None) -> float:
     """Calculate points for step 2."""
-    return _get_points(data.typing_method, "2")
+    return _get_points(data.typing_method, "2", version)
 
 
-def calculate_step_3_points(data: ValidStep3Data) -> float:
+def calculate_step_3_points(data: ValidStep3Data, version: str | None = None) -> float:
     """Calculate points for step 3."""
     step_3_points = 0.0
-    step_3_points += _get_points(data.a_statistics_p_value, "3A")
-    step_3_points += _get_points(data.b_multiple_testing_correction, "3B")
-    step_3_points += _get_points(data.c_statistics_effect_size, "3C")
+    step_3_points += _get_points(data.a_statistics_p_value, "3A", version)
+    step_3_points += _get_points(data.b_multiple_testing_correction, "3B", version)
+    step_3_points += _get_points(data.c_statistics_effect_size, "3C", version)
     return step_3_points
 
 
-def calculate_step_4_points(data: ValidStep4Data) -> float:
+def calculate_step_4_points(data: ValidStep4Data, version: str | None = None) -> float:
     """Calculate points for step 4."""
-    return _get_points(data.cohort_size, "4")
+    return _get_points(data.cohort_size, "4", version)
 
 
-def calculate_step_5_points(data: ValidStep5Data) -> float:
+def calculate_step_5_points(data: ValidStep5Data, version: str | None = None) -> float:
     """Calculate points for step 5."""
-    return _get_points(data.additional_phenotypes, "5")
+    return _get_points(data.additional_phenotypes, "5", version)
 
 
-def calculate_step_6_points(data: ValidStep6Data) -> float:
+def calculate_step_6_points(data: ValidStep6Data, version: str | None = None) -> float:
     """Calculate points for step 6."""
-    factor_a = _get_points(data.a_weighing_association, "6A")
-    factor_b = _get_points(data.b_low_field_resolution, "6B")
+    factor_a = _get_points(data.a_weighing_association, "6A", version)
+    factor_b = _get_points(data.b_low_field_resolution, "6B", version)
     return factor_a * factor_b
 
 
-def calculate(data: dict) -> float:
-    """Calculate a score for an HLA classification.
+def _calculate_step_points(
+    step: str,
+    calculate_step_points: Callable[[Any, str | None], float],
+    data: Any,
+    version: str | None,
+) -> float:
+    """Calculate points for a step, timing it if instrumentation is on."""
+    collector = instrumentation.collector
+    if collector is None:
+        return calculate_step_points(data, version)
+    start = time.perf_counter()
+    try:
+        return calculate_step_points(data, version)
+    finally:
+        collector.record_step(step, time.perf_counter() - start)
+
+
+def _calculate_steps(data: Any, version: str | None) -> float:
+    """Calculate a score step by step from score data validated by pydantic.
 
-    :raises ValidationError: Couldn't validate data.
-    :raises CalculatorException: Something wrong with option(s).
-    :returns: The score for an HLA classification.
+    :raises CalculatorException: If the points for a step can't be calculated.
     """
     score = 0.0
+    score += _calculate_step_points("1", calculate_step_1_points, data.step_1, version)
+    score += _calculate_step_points("2", calculate_step_2_points, data.step_2, version)
+    score += _calculate_step_points("3", calculate_step_3_points, data.step_3, version)
+    score += _calculate_step_points("4", calculate_step_4_points, data.step_4, version)
+    score += _calculate_step_points("5", calculate_step_5_points, data.step_5, version)
+    score *= _calculate_step_points("6", calculate_step_6_points, data.step_6, version)
+    return score
+
 
+def _calculate_strict(data: dict, version: str | None) -> float:
+    """Calculate a score step by step from score data validated by pydantic."""
     try:
-        data = ValidScoreData(**data)  # type: ignore
+        valid_data = get_validator(version).score_model(**data)
     except ValidationError as err:
         logger.error("Unable to validate score")
         logger.error(err.errors())
+        return 0.0
 
     try:
-        score += calculate_step_1_points(data.step_1)  # type: ignore
-        score += calculate_step_2_points(data.step_2)  # type: ignore
-        score += calculate_step_3_points(data.step_3)  # type: ignore
-        score += calculate_step_4_points(data.step_4)  # type: ignore
-        score += calculate_step_5_points(data.step_4)  # type: ignore
-        score *= calculate_step_6_points(data.step_6)  # type: ignore
+        return _calculate_steps(valid_data, version)
     except CalculatorException as err:
         logger.error("Unable to calculate score")
         logger.error(err)
+        return 0.0
+
+
+def _record_options(
+    collector: Collector, score_codes: ScoreCodes, version: str | None
+) -> None:
+    """Record the options selected in valid score data, from its option codes."""
+    index = get_steps(version).index
+    for step_number, code in zip(STEP_FIELDS, score_codes):
+        step_index = index[step_number]
+        if not step_index.multi_select:
+            collector.record_option(step_number, step_index.option_names[code])
+            continue
+        for option_code, option_name in enumerate(step_index.option_names):
+            if code & (1 << option_code):
+                collector.record_option(step_number, option_name)
+
+
+def _calculate_instrumented(
+    data: dict, strict: bool, version: str | None, collector: Collector
+) -> float:
+    """Calculate a score, recording measurements of it with the given collector.
 
+    This returns the same score, and logs the same errors, as `calculate`.
+    """
+    start = time.perf_counter()
+    try:
+        if strict:
+            valid_data = get_validator(version).score_model(**data)
+            score_codes = get_score_codes(valid_data, get_steps(version))
+        else:
+            score_codes = validate(data, version=version)
+    except ValidationError as err:
+        collector.record_validation(time.perf_counter() - start, succeeded=False)
+        logger.error("Unable to validate score")
+        logger.error(err.errors())
+        return 0.0
+    collector.record_validation(time.perf_counter() - start, succeeded=True)
+    _record_options(collector, score_codes, version)
+
+    start = time.perf_counter()
+    try:
+        if strict:
+            score = _calculate_steps(valid_data, version)
+        else:
+            score = calculate_codes(score_codes, version)
+    except CalculatorException as err:
+        collector.record_calculation(time.perf_counter() - start, succeeded=False)
+        logger.error("Unable to calculate score")
+        logger.error(err)
+        return 0.0
+    collector.record_calculation(time.perf_counter() - start, succeeded=True)
     return score
+
+
+def calculate(data: dict, strict: bool = False, version: str | None = None) -> float:
+    """Calculate a score for an HLA classification.
+
+    By default, the data is validated by the compiled validator and scored from its
+    option codes. In strict mode, the data is validated by the pydantic models and
+    scored step by step. Both modes return identical scores. If instrumentation is on
+    (see `score.instrumentation`), the validation and calculation are measured.
+
+    :param data: The score data.
+    :param strict: Validate and score the data the reference way.
+    :param version: The framework version to score with. Defaults to the default
+        version.
+    :returns: The score for an HLA classification, or 0.0 if the data couldn't be
+        validated.
+    """
+    collector = instrumentation.collector
+    if collector is not None:
+        return _calculate_instrumented(data, strict, version, collector)
+
+    if strict:
+        return _calculate_strict(data, version)
+
+    try:
+        score_codes = validate(data, version=version)
+    except ValidationError as err:
+        logger.error("Unable to validate score")
+        logger.error(err.errors())
+        return 0.0
+
+    return calculate_codes(score_codes, version)
+
+
+@functools.cache
+def _build_points_tables(version: str) -> Dict[str, np.ndarray]:
+    """Build the points tables for the given version of the framework."""
+    points_tables = {}
+    for step_number, step_index in get_steps(version).index.items():
+        option_points = np.array(step_index.option_points, dtype=np.float64)
+        if step_index.multi_select:
+            masks = np.arange(1 << len(option_points))
+            points_table = np.zeros(len(masks), dtype=np.float64)
+            for code, points in enumerate(option_points):
+                points_table += np.where(masks & (1 << code), points, 0.0)
+            option_points = points_table
+        option_points.flags.writeable = False
+        points_tables[step_number] = option_points
+    return points_tables
+
+
+def get_points_tables(version: str | None = None) -> Dict[str, np.ndarray]:
+    """Return each step number mapped to an array of points indexed by option code.
+
+    The array for a multi-select step is indexed by bitmask instead, and each entry is
+    the sum of the points for the options in that bitmask.
+
+    :param version: The framework version to get points from. Defaults to the default
+        version.
+    """
+    return _build_points_tables(version or DEFAULT_FRAMEWORK_VERSION)
+
+
+@functools.cache
+def _build_points_lists(version: str) -> Dict[str, Tuple[float, ...]]:
+    """Return the points tables as tuples, which are faster to index one at a time."""
+    return {
+        step_number: tuple(points_table.tolist())
+        for step_number, points_table in get_points_tables(version).items()
+    }
+
+
+def combine_step_points(points: Mapping[str, Points]) -> Points:
+    """Combine the points for each step into a score, or an array of scores.
+
+    This adds and multiplies in the same order as the step by step calculation, so the
+    scores are identical. Arrays only need to be broadcastable against each other.
+    """
+    step_1_points = points["1A"] + points["1B"] + points["1C"] + points["1D"]
+    step_3_points = points["3A"] + points["3B"] + points["3C"]
+    score = step_1_points + points["2"] + step_3_points + points["4"] + points["5"]
+    # The arithmetic is untyped for arrays, but gives the same type as the points.
+    combined: Points = score * (points["6A"] * points["6B"])
+    return combined
+
+
+def calculate_codes(score_codes: ScoreCodes, version: str | None = None) -> float:
+    """Calculate a score from the option codes of valid score data."""
+    points_lists = _build_points_lists(version or DEFAULT_FRAMEWORK_VERSION)
+    return combine_step_points(
+        {
+            step_number: points_lists[step_number][code]
+            for step_number, code in zip(STEP_FIELDS, score_codes)
+        }
+    )
+
+
+def encode_many(
+    data: Iterable[dict], version: str | None = None
+) -> Dict[str, np.ndarray]:
+    """Encode score data as columns of option codes, one column per step number.
+
+    Multi-select steps are encoded as bitmasks of option codes. Score data that can't be
+    validated is logged and encoded as -1 in every column.
+
+    :param data: An iterable of score data, as you'd pass to `calculate`.
+    :param version: The framework version to encode with. Defaults to the default
+        version.
+    :returns: Each step number mapped to an array with an option code for each item.
+    """
+    columns: Dict[str, List[int]] = {step_number: [] for step_number in STEP_FIELDS}
+    invalid_codes = (-1,) * len(STEP_FIELDS)
+    for item in data:
+        try:
+            codes = validate(item, version=version).codes
+        except ValidationError as err:
+            logger.error("Unable to validate score")
+            logger.error(err.errors())
+            codes = invalid_codes
+        for column, code in zip(columns.values(), codes):
+            column.append(code)
+    return {
+        step_number: np.array(column, dtype=np.intp)
+        for step_number, column in columns.items()
+    }
+
+
+def calculate_many(
+    data: Iterable[dict] | Mapping[str, np.ndarray], version: str | None = None
+) -> np.ndarray:
+    """Calculate scores for many HLA classifications at once.
+
+    Each step's option codes are looked up in an array of points, and the points are
+    combined with a handful of array operations. The scores are identical to the ones
+    `calculate` returns for the same score data.
+
+    :param data: Either an iterable of score data, as you'd pass to `calculate`, or
+        columns of option codes, as returned by `encode_many`.
+    :param version: The framework version to score with. Defaults to the default
+        version.
+    :raises CalculatorException: If a column is missing or has an unknown code.
+    :returns: An array of scores, in the same order as `data`. Score data that can't be
+        validated gets a score of 0.0, as it does with `calculate`.
+    """
+    columns = data if isinstance(data, Mapping) else encode_many(data, version)
+    points = {}
+    invalid = np.zeros((), dtype=np.bool_)
+    for step_number, points_table in get_points_tables(version).items():
+        if step_number not in columns:
+            raise CalculatorException(f"Missing option codes for step {step_number}")
+        codes = np.asarray(columns[step_number], dtype=np.intp)
+        if np.any(codes >= len(points_table)):
+            raise CalculatorException(f"Unknown option code for step {step_number}")
+        step_invalid = codes < 0
+        invalid = invalid | step_invalid
+        points[step_number] = points_table[np.where(step_invalid, 0, codes)]
+    return np.where(invalid, 0.0, combine_step_points(points))
@@ -0,0 +1,62 @@
+"""Define the constants of the scoring framework.
+
+This module doesn't import pydantic or numpy, so it's cheap to import. `score.steps` and
+`score.validator` load the framework and build their models when they're imported, so
+code that only needs these constants (e.g. the HCI's ORM models, which are imported by
+every management command) should import them from here.
+"""
+
+import functools
+import json
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# This is where the framework files are.
+FRAMEWORKS_DIR = Path(__file__).resolve().parent / "frameworks"
+
+# This is the version of the framework used when no version is given.
+DEFAULT_FRAMEWORK_VERSION = "v1"
+
+# Map each step number to the step and field in the score data that hold the option(s)
+# selected for that step.
+STEP_FIELDS: Dict[str, Tuple[str, str]] = {
+    "1A": ("step_1", "a_allele_or_haplotype"),
+    "1B": ("step_1", "b_allele_resolution"),
+    "1C": ("step_1", "c_zygosity"),
+    "1D": ("step_1", "d_phase"),
+    "2": ("step_2", "typing_method"),
+    "3A": ("step_3", "a_statistics_p_value"),
+    "3B": ("step_3", "b_multiple_testing_correction"),
+    "3C": ("step_3", "c_statistics_effect_size"),
+    "4": ("step_4", "cohort_size"),
+    "5": ("step_5", "additional_phenotypes"),
+    "6A": ("step_6", "a_weighing_association"),
+    "6B": ("step_6", "b_low_field_resolution"),
+}
+
+
+def get_framework_versions() -> List[str]:
+    """Return the versions of the scoring framework that have a framework file."""
+    return sorted(path.stem for path in FRAMEWORKS_DIR.glob("*.json"))
+
+
+@functools.cache
+def read_option_names(version: str) -> Dict[str, Tuple[str, ...]]:
+    """Return each step number mapped to the names of its options, in a version.
+
+    The framework file is read as plain JSON, without being validated (as
+    `score.steps.get_steps` does), so this is cheap enough for code that only needs the
+    names, e.g. the choices of the HCI's model fields, which Django's system checks
+    read.
+
+    :param version: The framework version, e.g. "v1".
+    :raises OSError: If there's no framework file for the version.
+    """
+    with open(FRAMEWORKS_DIR / f"{version}.json", encoding="utf-8") as f:
+        framework = json.load(f)
+    return {
+        step["step_number"]: tuple(
+            option["option_name"] for option in step["step_options"]
+        )
+        for step in framework["hla_framework_scoring_steps"]
+    }
@@ -0,0 +1,121 @@
+"""Instrument scoring.
+
+Instrumentation is off by default, and costs a single check per call to
+`score.calculator.calculate` when it's off. Turn it on by setting a collector, which is
+then told how long validation and calculation take, whether they fail, and which options
+are selected:
+    set_collector(MetricsCollector())
+
+`MetricsCollector` keeps the measurements in memory. To send them somewhere else (e.g. a
+metrics service), subclass `Collector` and override the methods for the measurements you
+want.
+"""
+
+import collections
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+
+class Collector:
+    """Receive measurements of scoring.
+
+    This collector ignores them.
+    """
+
+    def record_validation(self, seconds: float, succeeded: bool) -> None:
+        """Record how long score data took to validate, and whether it was valid."""
+
+    def record_calculation(self, seconds: float, succeeded: bool) -> None:
+        """Record how long a score took to calculate, and whether it was calculated."""
+
+    def record_step(self, step: str, seconds: float) -> None:
+        """Record how long the points for a step took to calculate, e.g. step "1".
+
+        Steps are only timed in strict mode, where they're calculated one by one.
+        """
+
+    def record_option(self, step_number: str, option_name: str) -> None:
+        """Record that an option was selected in valid score data."""
+
+
+@dataclass
+class Timer:
+    """Count the calls of something that's timed, its failures, and its total time."""
+
+    calls: int = 0
+    failures: int = 0
+    seconds: float = 0.0
+
+    def record(self, seconds: float, succeeded: bool = True) -> None:
+        """Record a call, how long it took, and whether it succeeded."""
+        self.calls += 1
+        self.failures += not succeeded
+        self.seconds += seconds
+
+
+class MetricsCollector(Collector):
+    """Keep counts and total times of the measurements in memory.
+
+    Measurements can be recorded from several threads at once.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.validation = Timer()
+        self.calculation = Timer()
+        self.steps: Dict[str, Timer] = collections.defaultdict(Timer)
+        self.option_counts: collections.Counter[Tuple[str, str]] = collections.Counter()
+
+    def record_validation(self, seconds: float, succeeded: bool) -> None:
+        with self._lock:
+            self.validation.record(seconds, succeeded)
+
+    def record_calculation(self, seconds: float, succeeded: bool) -> None:
+        with self._lock:
+            self.calculation.record(seconds, succeeded)
+
+    def record_step(self, step: str, seconds: float) -> None:
+        with self._lock:
+            self.steps[step].record(seconds)
+
+    def record_option(self, step_number: str, option_name: str) -> None:
+        with self._lock:
+            self.option_counts[(step_number, option_name)] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of the measurements so far, e.g. to serialize as JSON."""
+        with self._lock:
+            options: Dict[str, Dict[str, int]] = {}
+            for (step_number, option_name), count in sorted(self.option_counts.items()):
+                options.setdefault(step_number, {})[option_name] = count
+            return {
+                "validations": self.validation.calls,
+                "validation_failures": self.validation.failures,
+                "validation_seconds": self.validation.seconds,
+                "calculations": self.calculation.calls,
+                "calculation_failures": self.calculation.failures,
+                "calculation_seconds": self.calculation.seconds,
+                "steps": {
+                    step: {"calls": timer.calls, "seconds": timer.seconds}
+                    for step, timer in sorted(self.steps.items())
+                },
+                "options": options,
+            }
+
+
+# The collector that scoring is measured with, or `None` if instrumentation is off.
+# Use `set_collector` to change it.
+collector: Collector | None = None
+
+
+def set_collector(new_collector: Collector | None) -> Collector | None:
+    """Set the collector that scoring is measured with, or turn instrumentation off.
+
+    :param new_collector: The collector, or `None` to turn instrumentation off.
+    :returns: The previous collector, so it can be restored.
+    """
+    global collector  # pylint: disable=global-statement
+    previous_collector = collector
+    collector = new_collector
+    return previous_collector
@@ -0,0 +1,189 @@
+"""Look up scores in a precomputed lattice of every possible score.
+
+Every step has a finite number of options, so there are a finite number of possible
+score data. (Just under a million with the current steps.) The lattice holds the score
+for each of them, indexed by a mixed-radix encoding of the option codes: the option code
+for each step is a digit, and the number of codes for the step is its radix. Scoring is
+then a single array index.
+
+The lattice is cached on disk, keyed by a hash of the steps, and memory-mapped when it's
+loaded, so processes that load it share a single copy in memory.
+"""
+
+import functools
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterable, Mapping, Tuple
+
+import numpy as np
+
+from score.calculator import (
+    CalculatorException,
+    combine_step_points,
+    encode_many,
+    get_points_tables,
+)
+from score.steps import DEFAULT_FRAMEWORK_VERSION, get_steps
+from score.validator import STEP_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# The directory the lattice is cached in can be set with this environment variable.
+LATTICE_DIR_ENV_VAR = "HCI_SCORE_LATTICE_DIR"
+
+# Scores are stored as whole quarter points when they can be, which takes a byte or
+# two per score instead of eight.
+QUARTERS_PER_POINT = 4
+
+
+class LatticeException(Exception):
+    """Define an exception for the lattice module."""
+
+
+def _get_radices(version: str | None) -> Tuple[int, ...]:
+    """Return the number of option codes for each step, in step order."""
+    points_tables = get_points_tables(version)
+    return tuple(len(points_tables[step_number]) for step_number in STEP_FIELDS)
+
+
+def _compact(scores: np.ndarray) -> np.ndarray:
+    """Return the scores as whole quarter points, if they can be stored that way."""
+    quarter_points = scores * QUARTERS_PER_POINT
+    if np.all(quarter_points == np.round(quarter_points)) and np.all(scores >= 0):
+        for dtype in (np.uint8, np.uint16):
+            if quarter_points.max(initial=0) <= np.iinfo(dtype).max:
+                return quarter_points.astype(dtype)
+    return scores
+
+
+def build_scores(version: str | None = None) -> np.ndarray:
+    """Calculate the score for every possible score data.
+
+    The points for each step are laid out along their own axis, so combining them
+    broadcasts to every combination of options at once.
+
+    :param version: The framework version to score with. Defaults to the default
+        version.
+    :returns: A flat array of scores, indexed by the mixed-radix encoding of the option
+        codes.
+    """
+    points_tables = get_points_tables(version)
+    points = {}
+    for axis, step_number in enumerate(STEP_FIELDS):
+        shape = [1] * len(STEP_FIELDS)
+        shape[axis] = -1
+        points[step_number] = points_tables[step_number].reshape(shape)
+    return _compact(combine_step_points(points).ravel())
+
+
+class Lattice:
+    """Hold the score for every possible score data."""
+
+    def __init__(self, scores: np.ndarray, version: str | None = None) -> None:
+        """Wrap the given scores, as returned by `build_scores`.
+
+        :raises LatticeException: If there isn't a score for every possible score data.
+        """
+        self.version = version
+        self.radices = _get_radices(version)
+        if scores.shape != (int(np.prod(self.radices)),):
+            raise LatticeException("Lattice doesn't match the steps")
+        self.scores = scores
+        self.strides = tuple(
+            int(np.prod(self.radices[axis + 1 :])) for axis in range(len(self.radices))
+        )
+        self.scale = 1 / QUARTERS_PER_POINT if scores.dtype.kind == "u" else 1.0
+
+    def get_indices(self, columns: Mapping[str, np.ndarray]) -> np.ndarray:
+        """Return the lattice index for each row of option codes.
+
+        :param columns: Columns of option codes, as returned by
+            `score.calculator.encode_many`.
+        :raises CalculatorException: If a column is missing or has an unknown code.
+        :returns: The index of each row, or -1 for rows that couldn't be validated.
+        """
+        indices = np.zeros((), dtype=np.intp)
+        invalid = np.zeros((), dtype=np.bool_)
+        for step_number, radix, stride in zip(STEP_FIELDS, self.radices, self.strides):
+            if step_number not in columns:
+                raise CalculatorException(
+                    f"Missing option codes for step {step_number}"
+                )
+            codes = np.asarray(columns[step_number], dtype=np.intp)
+            if np.any(codes >= radix):
+                raise CalculatorException(f"Unknown option code for step {step_number}")
+            invalid = invalid | (codes < 0)
+            indices = indices + codes * stride
+        return np.where(invalid, -1, indices)
+
+    def calculate_many(
+        self, data: Iterable[dict] | Mapping[str, np.ndarray]
+    ) -> np.ndarray:
+        """Look up scores for many HLA classifications at once.
+
+        This takes the same arguments as `score.calculator.calculate_many`, and returns
+        the same scores.
+        """
+        columns = data if isinstance(data, Mapping) else encode_many(data, self.version)
+        indices = self.get_indices(columns)
+        invalid = indices < 0
+        scores = self.scores[np.where(invalid, 0, indices)] * self.scale
+        return np.where(invalid, 0.0, scores)
+
+    def calculate(self, data: dict) -> float:
+        """Look up the score for an HLA classification.
+
+        This returns the same score as `score.calculator.calculate`.
+        """
+        return float(self.calculate_many([data])[0])
+
+
+def load_lattice(directory: Path | None = None, version: str | None = None) -> Lattice:
+    """Load the lattice from the disk cache, building it if necessary.
+
+    :param directory: Where the lattice is cached. Defaults to the directory in the
+        `HCI_SCORE_LATTICE_DIR` environment variable, or the temporary directory.
+    :param version: The framework version to score with. Defaults to the default
+        version.
+    :returns: The lattice, memory-mapped from the disk cache.
+    """
+    if directory is None:
+        directory = Path(
+            os.getenv(LATTICE_DIR_ENV_VAR, Path(tempfile.gettempdir()) / "hci")
+        )
+    path = directory / f"score_lattice_{get_steps(version).content_hash[:16]}.npy"
+    if path.exists():
+        try:
+            return Lattice(np.load(path, mmap_mode="r"), version)
+        except (LatticeException, OSError, ValueError) as err:
+            logger.warning("Rebuilding unusable score lattice %s: %s", path, err)
+    scores = build_scores(version)
+    directory.mkdir(parents=True, exist_ok=True)
+    # Write to a temporary file and then rename it, so that other processes never see
+    # a partially written lattice.
+    with tempfile.NamedTemporaryFile(dir=directory, suffix=".npy", delete=False) as f:
+        np.save(f, scores)
+    os.chmod(f.name, 0o644)
+    os.replace(f.name, path)
+    return Lattice(np.load(path, mmap_mode="r"), version)
+
+
+@functools.cache
+def _get_lattice(version: str) -> Lattice:
+    """Load the lattice for the given version of the framework."""
+    return load_lattice(version=version)
+
+
+def get_lattice(version: str | None = None) -> Lattice:
+    """Return the lattice for the given version of the framework.
+
+    Each version's lattice is loaded the first time it's asked for.
+    """
+    return _get_lattice(version or DEFAULT_FRAMEWORK_VERSION)
+
+
+if __name__ == "__main__":
+    lattice = get_lattice()
+    print(f"{len(lattice.scores)} scores in {lattice.scores.nbytes} bytes")
@@ -1,12 +1,27 @@
 """Provide models and data for the steps in scoring an HLA classification.
 
-This is the single source of truth for the data related to the HLA scoring framework
-steps.
+The framework files in the `frameworks` directory are the single source of truth for the
+data related to the HLA scoring framework steps. There's a JSON file for each version of
+the framework, named after the version.
 """
 
-from typing import Dict, List
+import functools
+import hashlib
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Tuple
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
+
+from score.constants import (
+    DEFAULT_FRAMEWORK_VERSION,
+    FRAMEWORKS_DIR,
+    get_framework_versions,
+)
+
+
+class StepsException(Exception):
+    """Define an exception for the steps module."""
 
 
 class Option(BaseModel):
@@ -21,269 +36,139 @@ class Step(BaseModel):
 
     step_number: str
     step_name: str
+    multi_select: bool = False
     step_options: List[Option]
 
 
+@dataclass(frozen=True, slots=True)
+class StepIndex:
+    """Hold the compiled, read-only lookup tables for a single scoring step.
+
+    An option's code is its position in the step's list of options, so
+    `option_points[code]` is the number of points for that option. The options selected
+    for a multi-select step are encoded as a bitmask, where bit `code` is set if the
+    option with that code is selected.
+    """
+
+    step_number: str
+    multi_select: bool
+    option_names: Tuple[str, ...]
+    option_points: Tuple[float, ...]
+    option_to_points: Mapping[str, float]
+    option_to_code: Mapping[str, int]
+
+
+def _compile_step(step: Step) -> StepIndex:
+    """Compile a scoring step into its lookup tables."""
+    option_names = tuple(option.option_name for option in step.step_options)
+    option_points = tuple(option.option_points for option in step.step_options)
+    return StepIndex(
+        step_number=step.step_number,
+        multi_select=step.multi_select,
+        option_names=option_names,
+        option_points=option_points,
+        option_to_points=MappingProxyType(dict(zip(option_names, option_points))),
+        option_to_code=MappingProxyType(
+            {option_name: code for code, option_name in enumerate(option_names)}
+        ),
+    )
+
+
 class Steps(BaseModel):
-    """Model the steps in scoring an HLA classification."""
+    """Model the steps in scoring an HLA classification.
+
+    The lookup index is compiled once, when the steps are constructed, so looking up an
+    option's points or code doesn't walk the steps or allocate anything.
+    """
 
     hla_framework_scoring_steps: List[Step]
 
+    _index: Mapping[str, StepIndex] = PrivateAttr()
+    _content_hash: str = PrivateAttr()
+
+    def model_post_init(self, context: Any, /) -> None:
+        """Compile the lookup index for the steps."""
+        self._index = MappingProxyType(
+            {
+                step.step_number: _compile_step(step)
+                for step in self.hla_framework_scoring_steps
+            }
+        )
+        self._content_hash = hashlib.sha256(self.model_dump_json().encode()).hexdigest()
+
+    @property
+    def content_hash(self) -> str:
+        """Return a hash of the steps, which changes whenever the steps do."""
+        return self._content_hash
+
+    @property
+    def index(self) -> Mapping[str, StepIndex]:
+        """Return the step numbers mapped to their compiled lookup tables."""
+        return self._index
+
     def get_option_names(self, step_number: str) -> List[str]:
         """Given a step number, return the associated option names."""
-        option_names = []
-        for step in self.hla_framework_scoring_steps:
-            if step.step_number == step_number:
-                for option in step.step_options:
-                    option_names.append(option.option_name)
-        return option_names
+        if step_number not in self._index:
+            return []
+        return list(self._index[step_number].option_names)
 
     def get_option_to_points_map(self, step_number: str) -> Dict[str, float]:
         """Given a step number, return the associated options mapped to their points."""
-        options_to_points_map = {}
-        for step in self.hla_framework_scoring_steps:
-            if step.step_number == step_number:
-                for option in step.step_options:
-                    options_to_points_map[option.option_name] = option.option_points
-        return options_to_points_map
-
-
-# fmt: off
-_steps_data = {
-    "hla_framework_scoring_steps": [
-        {
-            "step_number": "1A",
-            "step_name": "Allele or Haplotype",
-            "step_options": [
-                {
-                    "option_name": "Allele",
-                    "option_points": 0
-                },
-                {
-                    "option_name": "Haplotype",
-                    "option_points": 2
-                },
-            ],
-        },
-        {
-            "step_number": "1B",
-            "step_name": "Allele Resolution",
-            "step_options": [
-                {
-                    "option_name": "1-field",
-                    "option_points": 0
-                },
-                {
-                    "option_name": "2-field",
-                    "option_points": 1
-                },
-                {
-                    "option_name": "3-field, G-group, P-group",
-                    "option_points": 2
-                },
-                {
-                    "option_name": "4-field",
-                    "option_points": 3
-                },
-            ],
-        },
-        {
-            "step_number": "1C",
-            "step_name": "Zygosity",
-            "step_options": [
-                {
-                    "option_name": "Monoallelic (heterozygous)",
-                    "option_points": 0
-                },
-                {
-                    "option_name": "Biallelic (homozygous)",
-                    "option_points": 0.5
-                },
-            ],
-        },
-        {
-            "step_number": "1D",
-            "step_name": "Phase",
-            "step_options": [
-                {
-                    "option_name": "Phase not confirmed",
-                    "option_points": 0
-                },
-                {
-                    "option_name": "Phase confirmed",
-                    "option_points": 0.5
-                },
-            ],
-        },
-        {
-            "step_number": "2",
-            "step_name": "Typing Method",
-            "step_options": [
-                {
-                    "option_name": "Tag SNPs or Microarrays",
-                    "option_points": 0
-                },
-                {
-                    "option_name": "Serological",
-                    "option_points": 1
-                },
-                {
-                    "option_name": "Imputation",
-                    "option_points": 2
-                },
-                {
-                    "option_name": "Low Resolution Typing",
-                    "option_points": 3
-                },
-                {
-                    "option_name": "High Resolution Typing",
-                    "option_points": 3
-                },
-                {
-                    "option_name": "Whole Exome Sequencing",
-                    "option_points": 3
-                },
-                {
-                    "option_name": "Sanger Sequencing-Based Typing",
-                    "option_points": 4
-                },
-                {
-                    "option_name": "Whole Gene Sequencing",
-                    "option_points": 4
-                },
-                {
-                    "option_name": "Whole Genome Sequencing and/or Panel-Based NGS (>50x coverage)",
-                    "option_points": 5
-                },
-            ],
-        },
-        {
-            "step_number": "3A",
-            "step_name": "Statistics (p-value)",
-            "step_options": [
-                {
-                    "option_name": "GWAS >=1x10e-5, Non-GWAS >=0.05",
-                    "option_points": 0
-                },
-                {
-                    "option_name": "GWAS <1x10e-5, Non-GWAS <0.05",
-                    "option_points": 0.5
-                },
-                {
-                    "option_name": "GWAS <5x10e-8, Non-GWAS <0.01",
-                    "option_points": 1
-                },
-                {
-                    "option_name": "GWAS <1x10e-11, Non-GWAS <0.0005",
-                    "option_points": 1.5
-                },
-                {
-                    "option_name": "GWAS <1x10e-14, Non-GWAS <0.0001",
-                    "option_points": 2
-                },
-            ],
-        },
-        {
-            "step_number": "3B",
-            "step_name": "Multiple Testing Correction",
-            "step_options": [
-                {
-                    "option_name": "Overall correction for multiple testing",
-                    "option_points": 1
-                },
-                {
-                    "option_name": "2-step p-value correction",
-                    "option_points": 2
-                },
-            ],
-        },
-        {
-            "step_number": "3C",
-            "step_name": "Statistics (Effect Size)",
-            "step_options": [
-                {
-                    "option_name": "OR/RR: ≥2 or ≤0.5, Beta: ≥0.5 or ≤-0.5",
-                    "option_points": 1
-                },
-                {
-                    "option_name": "CI does not cross 1 (OR/RR) or 0 (beta)",
-                    "option_points": 1
-                },
-            ],
-        },
-        {
-            "step_number": "4",
-            "step_name": "Cohort Size",
-            "step_options": [
-                {
-                    "option_name": "GWAS <1,000, Non-GWAS <50",
-                    "option_points": 0
-                },
-                {
-                    "option_name": "GWAS 1,000-2,499, Non-GWAS 50-99",
-                    "option_points": 1
-                },
-                {
-                    "option_name": "GWAS 2,500-4,999, Non-GWAS 100-249",
-                    "option_points": 2
-                },
-                {
-                    "option_name": "GWAS 5,000-9,999, Non-GWAS 250-499",
-                    "option_points": 3
-                },
-                {
-                    "option_name": "GWAS >=10,000, Non-GWAS >=500",
-                    "option_points": 4
-                },
-            ],
-        },
-        {
-            "step_number": "5",
-            "step_name": "Additional Phenotypes",
-            "step_options": [
-                {
-                    "option_name": "specific disease-related phenotype",
-                    "option_points": 2
-                },
-                {
-                    "option_name": "only disease tested",
-                    "option_points": 0
-                },
-            ],
-        },
-        {
-            "step_number": "6A",
-            "step_name": "Weighing Association",
-            "step_options": [
-                {
-                    "option_name": "significant association with disease",
-                    "option_points": 1
-                },
-                {
-                    "option_name": "no significant association with disease",
-                    "option_points": 0
-                },
-            ],
-        },
-        {
-            "step_number": "6B",
-            "step_name": "Low Field Resolution",
-            "step_options": [
-                {
-                    "option_name": "1-field resolution (from Step 1B)",
-                    "option_points": 0.5
-                },
-                {
-                    "option_name": ">1-field resolution",
-                    "option_points": 1
-                },
-            ],
-        },
-    ]
-}
-# fmt: on
-
-steps = Steps(**_steps_data)  # type: ignore
+        if step_number not in self._index:
+            return {}
+        return dict(self._index[step_number].option_to_points)
+
+
+@functools.cache
+def _load_steps(version: str) -> Steps:
+    """Load and compile the steps for the given version of the framework."""
+    if version not in get_framework_versions():
+        raise StepsException(f"Framework version {version} not found")
+    path = FRAMEWORKS_DIR / f"{version}.json"
+    return Steps.model_validate_json(path.read_bytes())
+
+
+def get_steps(version: str | None = None) -> Steps:
+    """Return the steps for the given version of the framework.
+
+    Each version is loaded from its framework file the first time it's asked for, and
+    kept for the life of the process.
+
+    :param version: The framework version, e.g. "v1". Defaults to the default version.
+    :raises StepsException: If there's no framework file for the version.
+    """
+    return _load_steps(version or DEFAULT_FRAMEWORK_VERSION)
+
+
+def get_changed_options(old_steps: Steps, new_steps: Steps) -> List[Tuple[str, str]]:
+    """Return the options that could score differently between two sets of steps.
+
+    An option has changed if its points differ, or if it's in only one of the sets of
+    steps. Every option of a step that's in only one of the sets, or whose options are
+    combined differently (i.e. it became multi-select or single-select), has changed. A
+    classification can only score differently if it selected a changed option.
+
+    :returns: The (step number, option name) pairs of the changed options, in step
+        order.
+    """
+    changed_options: Dict[Tuple[str, str], None] = {}
+    for step_index in (*new_steps.index.values(), *old_steps.index.values()):
+        step_number = step_index.step_number
+        old = old_steps.index.get(step_number)
+        new = new_steps.index.get(step_number)
+        for option_name in step_index.option_names:
+            if (
+                old is None
+                or new is None
+                or old.multi_select != new.multi_select
+                or old.option_to_points.get(option_name)
+                != new.option_to_points.get(option_name)
+            ):
+                changed_options[(step_number, option_name)] = None
+    return list(changed_options)
+
+
+steps = get_steps()
 
 if __name__ == "__main__":
     print(steps.model_dump_json(indent=2))
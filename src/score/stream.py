@@ -0,0 +1,121 @@
+"""Score a stream of HLA classifications.
+
+Input:
+    Lines of JSON score data, e.g. from a JSONL file.
+Output:
+    A result for each line: either its score, or why it couldn't be scored.
+
+Lines are read, validated, and scored in fixed-size chunks, so arbitrarily large
+inputs are scored in constant memory.
+"""
+
+import csv
+import itertools
+import json
+from typing import IO, Any, Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+from pydantic import ValidationError
+
+from score.calculator import calculate_many
+from score.validator import STEP_FIELDS, validate
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+# The columns of CSV output.
+CSV_FIELDS = ["line", "id", "score", "error", "details"]
+
+
+def _score_chunk(
+    lines: List[Tuple[int, str]], id_field: str | None, version: str | None
+) -> List[Dict[str, Any]]:
+    """Validate and score a chunk of numbered lines."""
+    results: List[Dict[str, Any]] = []
+    codes = []
+    scored = []
+    for line_number, line in lines:
+        result: Dict[str, Any] = {"line": line_number}
+        results.append(result)
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as err:
+            result["error"] = "Unable to parse JSON"
+            result["details"] = str(err)
+            continue
+        if id_field is not None and isinstance(data, dict):
+            result["id"] = data.get(id_field)
+        try:
+            codes.append(validate(data, version=version).codes)
+        except ValidationError as err:
+            result["error"] = "Unable to validate score"
+            result["details"] = err.errors(include_url=False)
+            continue
+        except TypeError:
+            result["error"] = "Unable to validate score"
+            result["details"] = "Score data should be a JSON object"
+            continue
+        scored.append(result)
+    if codes:
+        rows = np.array(codes, dtype=np.intp)
+        columns = {step_number: rows[:, i] for i, step_number in enumerate(STEP_FIELDS)}
+        for result, score in zip(scored, calculate_many(columns, version).tolist()):
+            result["score"] = score
+    return results
+
+
+def score_lines(
+    lines: Iterable[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    id_field: str | None = None,
+    version: str | None = None,
+) -> Iterator[Dict[str, Any]]:
+    """Score lines of JSON score data.
+
+    Blank lines are skipped.
+
+    :param lines: The lines to score.
+    :param chunk_size: How many lines to validate and score at a time.
+    :param id_field: A field of the score data to copy into its result, if any.
+    :param version: The framework version to score with. Defaults to the default
+        version.
+    :returns: A result for each line, in order. A result has the line's number, and
+        either its score or an error and the details of the error.
+    """
+    numbered_lines = (
+        (line_number, line)
+        for line_number, line in enumerate(lines, start=1)
+        if line.strip()
+    )
+    while chunk := list(itertools.islice(numbered_lines, chunk_size)):
+        yield from _score_chunk(chunk, id_field, version)
+
+
+def write_jsonl(results: Iterable[Dict[str, Any]], output: IO[str]) -> Dict[str, int]:
+    """Write results as JSON lines.
+
+    :returns: How many lines were scored, and how many had errors.
+    """
+    counts = {"scored": 0, "errors": 0}
+    for result in results:
+        counts["errors" if "error" in result else "scored"] += 1
+        output.write(json.dumps(result, ensure_ascii=False, default=str))
+        output.write("\n")
+    return counts
+
+
+def write_csv(results: Iterable[Dict[str, Any]], output: IO[str]) -> Dict[str, int]:
+    """Write results as CSV rows.
+
+    :returns: How many lines were scored, and how many had errors.
+    """
+    counts = {"scored": 0, "errors": 0}
+    writer = csv.DictWriter(output, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    for result in results:
+        counts["errors" if "error" in result else "scored"] += 1
+        if "details" in result and not isinstance(result["details"], str):
+            result["details"] = json.dumps(
+                result["details"], ensure_ascii=False, default=str
+            )
+        writer.writerow(result)
+    return counts
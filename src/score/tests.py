@@ -1,22 +1,56 @@
 """Test the score package."""
 
+import io
+import json
+import os
+import random
+import tempfile
 import unittest
+from pathlib import Path
+from typing import cast
 
+import numpy as np
+from click.testing import CliRunner
+from pydantic import ValidationError
+
+from score.__main__ import main
+from score.benchmark import compare_results, generate_score_data, run_benchmarks
 from score.calculator import (
+    CalculatorException,
+    _get_points,
+    calculate,
+    calculate_many,
     calculate_step_1_points,
     calculate_step_2_points,
     calculate_step_3_points,
     calculate_step_4_points,
     calculate_step_5_points,
     calculate_step_6_points,
+    encode_many,
+)
+from score.instrumentation import MetricsCollector, set_collector
+from score.lattice import Lattice, LatticeException, build_scores, load_lattice
+from score.steps import (
+    DEFAULT_FRAMEWORK_VERSION,
+    StepsException,
+    get_changed_options,
+    get_framework_versions,
+    get_steps,
+    steps,
 )
+from score.stream import score_lines, write_csv
 from score.validator import (
+    STEP_FIELDS,
+    ValidScoreData,
     ValidStep1Data,
     ValidStep2Data,
     ValidStep3Data,
     ValidStep4Data,
     ValidStep5Data,
     ValidStep6Data,
+    build_score_model,
+    get_validator,
+    validate,
 )
 
 
@@ -114,5 +148,396 @@ class TestCalculator(unittest.TestCase):
         )
 
 
+class TestCalculateMany(unittest.TestCase):
+    """Make sure the batch calculator agrees with the scalar calculator."""
+
+    def setUp(self) -> None:
+        """Generate a corpus of score data."""
+        rng = random.Random(0)
+        self.corpus = [generate_score_data(rng, invalid_rate=0.05) for _ in range(2000)]
+
+    def test_identical_to_calculate(self) -> None:
+        """Batch scores should be bit-for-bit identical to scalar scores."""
+        with self.assertLogs("score.calculator", level="ERROR"):
+            expected = np.array([calculate(data) for data in self.corpus])
+            actual = calculate_many(self.corpus)
+        self.assertEqual(expected.tobytes(), actual.tobytes())
+
+    def test_columns(self) -> None:
+        """Scores from columns of option codes should match scores from score data."""
+        with self.assertLogs("score.calculator", level="ERROR"):
+            columns = encode_many(self.corpus)
+            expected = calculate_many(self.corpus)
+        self.assertEqual(expected.tobytes(), calculate_many(columns).tobytes())
+
+    def test_empty(self) -> None:
+        """No score data should give no scores."""
+        self.assertEqual((0,), calculate_many([]).shape)
+
+    def test_unknown_code(self) -> None:
+        """Option codes outside of a step's options should be reported."""
+        columns = encode_many(self.corpus[:1])
+        columns["2"] = np.array([len(steps.index["2"].option_names)])
+        with self.assertRaises(CalculatorException):
+            calculate_many(columns)
+
+    def test_duplicate_options(self) -> None:
+        """An option listed twice in a multi-select step should only count once."""
+        data = next(
+            data
+            for data in self.corpus
+            if data["step_2"]["typing_method"] != "Not an option"
+            and calculate(data) > 0
+        )
+        option = steps.index["3B"].option_names[0]
+        data["step_3"]["b_multiple_testing_correction"] = [option, option]
+        single = dict(data, step_3=dict(data["step_3"]))
+        single["step_3"]["b_multiple_testing_correction"] = [option]
+        self.assertEqual(calculate(single), calculate(data))
+        self.assertEqual(calculate(data), calculate_many([data])[0])
+
+
+class TestLattice(unittest.TestCase):
+    """Make sure the lattice agrees with the calculator."""
+
+    def setUp(self) -> None:
+        """Generate a corpus of score data and a lattice in a temporary directory."""
+        # pylint: disable=consider-using-with
+        rng = random.Random(1)
+        self.corpus = [generate_score_data(rng, invalid_rate=0.05) for _ in range(2000)]
+        self.directory = tempfile.TemporaryDirectory()
+        self.lattice = load_lattice(Path(self.directory.name))
+
+    def tearDown(self) -> None:
+        """Remove the temporary directory."""
+        self.directory.cleanup()
+
+    def test_identical_to_calculate_many(self) -> None:
+        """Lattice scores should be bit-for-bit identical to calculated scores."""
+        with self.assertLogs("score.calculator", level="ERROR"):
+            columns = encode_many(self.corpus)
+        expected = calculate_many(columns)
+        actual = self.lattice.calculate_many(columns)
+        self.assertEqual(expected.tobytes(), actual.tobytes())
+
+    def test_calculate(self) -> None:
+        """A single lookup should match the scalar calculator."""
+        data = self.corpus[0]
+        self.assertEqual(calculate(data), self.lattice.calculate(data))
+
+    def test_loaded_from_disk(self) -> None:
+        """The lattice should be memory-mapped from the disk cache."""
+        (path,) = Path(self.directory.name).glob("*.npy")
+        self.assertEqual(1, len(os.listdir(self.directory.name)))
+        self.assertIsInstance(self.lattice.scores, np.memmap)
+        reloaded = load_lattice(Path(self.directory.name)).scores
+        self.assertIsInstance(reloaded, np.memmap)
+        filename = cast(np.memmap, reloaded).filename
+        self.assertEqual(path.resolve(), Path(str(filename)).resolve())
+
+    def test_rebuilds_unusable_lattice(self) -> None:
+        """A lattice that doesn't match the steps should be rebuilt."""
+        (path,) = Path(self.directory.name).glob("*.npy")
+        np.save(path, np.zeros(3, dtype=np.uint8))
+        with self.assertLogs("score.lattice", level="WARNING"):
+            lattice = load_lattice(Path(self.directory.name))
+        self.assertEqual(build_scores().tobytes(), lattice.scores.tobytes())
+
+    def test_wrong_size(self) -> None:
+        """A lattice needs a score for every possible score data."""
+        with self.assertRaises(LatticeException):
+            Lattice(np.zeros(3))
+
+
+class TestValidator(unittest.TestCase):
+    """Make sure the compiled validator agrees with the pydantic models."""
+
+    def setUp(self) -> None:
+        """Generate a corpus of score data."""
+        rng = random.Random(2)
+        self.corpus = [generate_score_data(rng, invalid_rate=0.05) for _ in range(2000)]
+
+    def _assert_same_validation(self, data: object) -> None:
+        """Make sure both validators accept or reject the data in the same way."""
+        try:
+            expected = validate(data, strict=True)  # type: ignore
+        except ValidationError as err:
+            with self.assertRaises(ValidationError) as context:
+                validate(data)  # type: ignore
+            self.assertEqual(err.errors(), context.exception.errors())
+        else:
+            self.assertEqual(expected, validate(data))  # type: ignore
+
+    def test_corpus(self) -> None:
+        """Both validators should return the same codes and errors for the corpus."""
+        for data in self.corpus:
+            self._assert_same_validation(data)
+
+    def test_unusual_shapes(self) -> None:
+        """Data the fast path doesn't handle should be validated by pydantic."""
+        data = self.corpus[0]
+        step_3 = data["step_3"]
+        self._assert_same_validation(
+            dict(data, step_3=dict(step_3, b_multiple_testing_correction=("x", "y")))
+        )
+        self._assert_same_validation(
+            dict(data, step_3=dict(step_3, c_statistics_effect_size=[None]))
+        )
+        self._assert_same_validation(dict(data, step_2=None))
+        self._assert_same_validation(
+            {key: data[key] for key in data if key != "step_4"}
+        )
+        valid_data = ValidScoreData(**data)
+        self._assert_same_validation(dict(data, step_1=valid_data.step_1))
+
+    def test_calculate_strict(self) -> None:
+        """Strict and fast scores should be identical."""
+        with self.assertLogs("score.calculator", level="ERROR"):
+            for data in self.corpus:
+                self.assertEqual(calculate(data, strict=True), calculate(data))
+
+    def test_codes(self) -> None:
+        """Codes should be the option codes from the steps index."""
+        score_codes = validate(self.corpus[0])
+        for step_number, (step_name, field_name) in STEP_FIELDS.items():
+            option_or_options = self.corpus[0][step_name][field_name]
+            step_index = steps.index[step_number]
+            if isinstance(option_or_options, str):
+                option_or_options = [option_or_options]
+            codes = [step_index.option_to_code[option] for option in option_or_options]
+            if step_index.multi_select:
+                self.assertEqual(
+                    sum(1 << code for code in codes), score_codes[step_number]
+                )
+            else:
+                self.assertEqual(codes, [score_codes[step_number]])
+
+
+class TestStream(unittest.TestCase):
+    """Make sure streams of score data are scored line by line."""
+
+    def setUp(self) -> None:
+        """Generate lines of score data, including some that can't be scored."""
+        rng = random.Random(3)
+        self.corpus = [generate_score_data(rng, invalid_rate=0.05) for _ in range(100)]
+        self.lines = [json.dumps(data) for data in self.corpus]
+        self.lines[10] = "not JSON"
+        self.lines[20] = "[]"
+        self.lines[30] = ""
+
+    def test_score_lines(self) -> None:
+        """Each line should get a score, or an error, whatever the chunk size."""
+        results = list(score_lines(self.lines, chunk_size=7))
+        self.assertEqual(99, len(results))
+        for result in results:
+            line = self.lines[result["line"] - 1]
+            if "error" in result:
+                self.assertIn("details", result)
+            else:
+                self.assertEqual(calculate(json.loads(line)), result["score"])
+        self.assertEqual("Unable to parse JSON", results[10]["error"])
+        self.assertEqual("Unable to validate score", results[20]["error"])
+        self.assertEqual(32, results[30]["line"])
+
+    def test_id_field(self) -> None:
+        """The ID field should be copied into the results."""
+        line = json.dumps(dict(self.corpus[0], association_id=123))
+        (result,) = score_lines([line], id_field="association_id")
+        self.assertEqual(123, result["id"])
+
+    def test_write_csv(self) -> None:
+        """Results should be written as CSV with a header."""
+        output = io.StringIO()
+        counts = write_csv(score_lines(self.lines[:11]), output)
+        self.assertEqual({"scored": 10, "errors": 1}, counts)
+        rows = output.getvalue().splitlines()
+        self.assertEqual("line,id,score,error,details", rows[0])
+        self.assertEqual(12, len(rows))
+
+    def test_command(self) -> None:
+        """The command should read a file and write JSON lines to stdout."""
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            Path("score_data.jsonl").write_text(
+                "\n".join(self.lines[:5]), encoding="utf-8"
+            )
+            result = runner.invoke(main, ["score_data.jsonl"])
+        self.assertEqual(0, result.exit_code)
+        self.assertEqual(5, len(result.stdout.splitlines()))
+        self.assertIn("Scored 5 lines, 0 lines with errors", result.stderr)
+
+
+class TestSteps(unittest.TestCase):
+    """Make sure the compiled steps index agrees with the steps data."""
+
+    def test_index_matches_steps(self) -> None:
+        """Every step and option should be in the index with its points and code."""
+        for step in steps.hla_framework_scoring_steps:
+            step_index = steps.index[step.step_number]
+            for code, option in enumerate(step.step_options):
+                self.assertEqual(option.option_name, step_index.option_names[code])
+                self.assertEqual(option.option_points, step_index.option_points[code])
+                self.assertEqual(
+                    option.option_points,
+                    step_index.option_to_points[option.option_name],
+                )
+                self.assertEqual(code, step_index.option_to_code[option.option_name])
+
+    def test_index_is_read_only(self) -> None:
+        """The index shouldn't be modifiable after the steps are constructed."""
+        with self.assertRaises(TypeError):
+            steps.index["1A"].option_to_points["Allele"] = 100  # type: ignore
+
+    def test_unknown_step_number(self) -> None:
+        """Unknown step numbers should have no options."""
+        self.assertEqual([], steps.get_option_names("7"))
+        self.assertEqual({}, steps.get_option_to_points_map("7"))
+
+    def test_unknown_option_raises(self) -> None:
+        """Unknown options and step numbers should be reported by the calculator."""
+        with self.assertRaises(CalculatorException):
+            _get_points("Not an option", "1A")
+        with self.assertRaises(CalculatorException):
+            _get_points("Allele", "7")
+
+    def test_framework_versions(self) -> None:
+        """The default version should be loaded once, and be the module's steps."""
+        self.assertIn(DEFAULT_FRAMEWORK_VERSION, get_framework_versions())
+        self.assertIs(steps, get_steps())
+        self.assertIs(steps, get_steps(DEFAULT_FRAMEWORK_VERSION))
+        self.assertIs(get_validator(), get_validator(DEFAULT_FRAMEWORK_VERSION))
+
+    def test_unknown_framework_version(self) -> None:
+        """Unknown versions should be reported."""
+        with self.assertRaises(StepsException):
+            get_steps("v0")
+        with self.assertRaises(StepsException):
+            calculate_many([], version="v0")
+
+    def test_changed_options(self) -> None:
+        """Changed, added, and removed options should be in the diff."""
+        self.assertEqual([], get_changed_options(steps, steps))
+        data = steps.model_dump()
+        step_3a, step_3b = data["hla_framework_scoring_steps"][5:7]
+        step_3a["step_options"][1]["option_points"] += 0.5
+        step_3a["step_options"].append({"option_name": "New", "option_points": 3})
+        removed = step_3b["step_options"].pop()
+        new_steps = type(steps).model_validate(data)
+        self.assertEqual(
+            [
+                ("3A", step_3a["step_options"][1]["option_name"]),
+                ("3A", "New"),
+                ("3B", removed["option_name"]),
+            ],
+            get_changed_options(steps, new_steps),
+        )
+
+    def test_built_score_model(self) -> None:
+        """A model built from the steps should validate like the hand-written one."""
+        score_model = build_score_model(steps)
+        rng = random.Random(3)
+        for data in [generate_score_data(rng, invalid_rate=0.05) for _ in range(200)]:
+            try:
+                expected = ValidScoreData.model_validate(data).model_dump()
+            except ValidationError as err:
+                with self.assertRaises(ValidationError) as context:
+                    score_model.model_validate(data)
+                self.assertEqual(err.errors(), context.exception.errors())
+            else:
+                self.assertEqual(
+                    expected, score_model.model_validate(data).model_dump()
+                )
+
+
+class TestBenchmark(unittest.TestCase):
+    """Make sure the benchmarks run and regressions are flagged."""
+
+    def test_run_benchmarks(self) -> None:
+        """Each benchmark run should report its speed."""
+        results = run_benchmarks(
+            size=10, rounds=3, names=["calculate", "lattice_calculate_many"]
+        )
+        self.assertEqual(["calculate", "lattice_calculate_many"], list(results))
+        for result in results.values():
+            self.assertGreater(result["ops_per_sec"], 0)
+            self.assertLessEqual(result["p50_us"], result["p99_us"])
+
+    def test_compare_results(self) -> None:
+        """Only benchmarks slower than the threshold should be regressions."""
+        baseline = {
+            "calculate": {"ops_per_sec": 1000.0},
+            "calculate_many": {"ops_per_sec": 1000.0},
+        }
+        results = {
+            "calculate": {"ops_per_sec": 850.0},
+            "calculate_many": {"ops_per_sec": 700.0},
+            "import_time": {"ops_per_sec": 1.0},
+        }
+        regressions = compare_results(results, baseline, threshold=0.2)
+        self.assertEqual(1, len(regressions))
+        self.assertTrue(regressions[0].startswith("calculate_many:"))
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Make sure instrumented scoring is measured and scores the same."""
+
+    def setUp(self) -> None:
+        """Turn instrumentation on, and generate a corpus of score data."""
+        self.collector = MetricsCollector()
+        self.assertIsNone(set_collector(self.collector))
+        self.addCleanup(set_collector, None)
+        rng = random.Random(4)
+        self.corpus = [generate_score_data(rng, invalid_rate=0.2) for _ in range(50)]
+
+    def test_same_scores(self) -> None:
+        """Instrumented scores should be identical to uninstrumented ones."""
+        with self.assertLogs("score.calculator", level="ERROR"):
+            for strict in (False, True):
+                instrumented = [calculate(data, strict) for data in self.corpus]
+                self.assertIs(self.collector, set_collector(None))
+                self.assertEqual(
+                    [calculate(data, strict) for data in self.corpus], instrumented
+                )
+                set_collector(self.collector)
+
+    def test_measurements(self) -> None:
+        """Validation, calculation, steps, and options should be measured."""
+        num_invalid = sum(
+            data["step_2"]["typing_method"] == "Not an option" for data in self.corpus
+        )
+        num_valid = len(self.corpus) - num_invalid
+        with self.assertLogs("score.calculator", level="ERROR"):
+            for data in self.corpus:
+                calculate(data)
+                calculate(data, strict=True)
+        snapshot = self.collector.snapshot()
+        self.assertEqual(2 * len(self.corpus), snapshot["validations"])
+        self.assertEqual(2 * num_invalid, snapshot["validation_failures"])
+        self.assertEqual(2 * num_valid, snapshot["calculations"])
+        self.assertEqual(0, snapshot["calculation_failures"])
+        self.assertEqual(
+            {str(step): num_valid for step in range(1, 7)},
+            {step: times["calls"] for step, times in snapshot["steps"].items()},
+        )
+        self.assertEqual(2 * num_valid, sum(snapshot["options"]["1A"].values()))
+        self.assertNotIn("Not an option", snapshot["options"]["2"])
+
+    def test_validated_steps(self) -> None:
+        """Score data whose steps are already validated should be scored the same."""
+        data = generate_score_data(random.Random(5))
+        data["step_1"] = ValidStep1Data(**data["step_1"])
+        for strict in (False, True):
+            with self.subTest(strict=strict):
+                instrumented = calculate(data, strict)
+                self.assertIs(self.collector, set_collector(None))
+                self.assertEqual(calculate(data, strict), instrumented)
+                set_collector(self.collector)
+        snapshot = self.collector.snapshot()
+        self.assertEqual(2, snapshot["calculations"])
+        self.assertEqual(
+            {data["step_1"].a_allele_or_haplotype: 2}, snapshot["options"]["1A"]
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
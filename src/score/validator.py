@@ -2,29 +2,37 @@
 
 This module provides a way to make sure the data you've obtained from the HLA curation
 interface is valid for scoring.
+
+There are two ways to validate score data. The pydantic models are the reference
+("strict") way. The compiled validator is the fast way: it checks option names against
+the steps index and translates them straight to option codes, and only falls back to the
+pydantic models when the score data is invalid (or unusually shaped), so errors are
+reported exactly the same way.
 """
 
+import functools
 import json
-from typing import List, Literal, Union
+from typing import Any, Dict, Iterator, List, Literal, Tuple, Type, Union
 
-from pydantic import BaseModel
+from pydantic import BaseModel, create_model
 
-from score.steps import steps
+from score.constants import STEP_FIELDS
+from score.steps import DEFAULT_FRAMEWORK_VERSION, StepIndex, Steps, get_steps, steps
 
 
 class ValidStep1Data(BaseModel):
     """Model the first step of the scoring process."""
 
-    a_allele_or_haplotype: Literal[*steps.get_option_names("1A")]  # type: ignore
-    b_allele_resolution: Literal[*steps.get_option_names("1B")]  # type: ignore
-    c_zygosity: Literal[*steps.get_option_names("1C")]  # type: ignore
-    d_phase: Literal[*steps.get_option_names("1D")]  # type: ignore
+    a_allele_or_haplotype: Literal[*steps.index["1A"].option_names]  # type: ignore
+    b_allele_resolution: Literal[*steps.index["1B"].option_names]  # type: ignore
+    c_zygosity: Literal[*steps.index["1C"].option_names]  # type: ignore
+    d_phase: Literal[*steps.index["1D"].option_names]  # type: ignore
 
 
 class ValidStep2Data(BaseModel):
     """Model the second step of the scoring process."""
 
-    typing_method: Literal[*steps.get_option_names("2")]  # type: ignore
+    typing_method: Literal[*steps.index["2"].option_names]  # type: ignore
 
 
 class ValidStep3Data(BaseModel):
@@ -32,40 +40,40 @@ class ValidStep3Data(BaseModel):
     # pylint: disable=line-too-long
     """Model the third step of the scoring process."""
 
-    a_statistics_p_value: Literal[*steps.get_option_names("3A")]  # type: ignore
+    a_statistics_p_value: Literal[*steps.index["3A"].option_names]  # type: ignore
 
     # The type here looks scary. It means: "Either a single option name for
     # step 3B or a list of option names for step 3B that contains a subset of
     # the option names." (A subset can be the full set or a strict subset.)
     # For example:
-    #     steps.get_option_names("3B") = ["apple", "banana", "cherry"]
+    #     steps.index["3B"].option_names = ("apple", "banana", "cherry")
     #     b_multiple_testing_correction = "apple"  # valid
     #     b_multiple_testing_correction = ["apple", "banana", "cherry"]  # valid
     #     b_multiple_testing_correction = ["apple", "cherry"]  # valid
     #     b_multiple_testing_correction = ["apple", "date"]  # invalid
-    type SingleOrSubset3B = Union[Literal[*steps.get_option_names("3B")], List[Literal[*steps.get_option_names("3B")]]]  # type: ignore
+    type SingleOrSubset3B = Union[Literal[*steps.index["3B"].option_names], List[Literal[*steps.index["3B"].option_names]]]  # type: ignore
     b_multiple_testing_correction: SingleOrSubset3B
-    type SingleOrSubset3C = Union[Literal[*steps.get_option_names("3C")], List[Literal[*steps.get_option_names("3C")]]]  # type: ignore
+    type SingleOrSubset3C = Union[Literal[*steps.index["3C"].option_names], List[Literal[*steps.index["3C"].option_names]]]  # type: ignore
     c_statistics_effect_size: SingleOrSubset3C
 
 
 class ValidStep4Data(BaseModel):
     """Model the fourth step of the scoring process."""
 
-    cohort_size: Literal[*steps.get_option_names("4")]  # type: ignore
+    cohort_size: Literal[*steps.index["4"].option_names]  # type: ignore
 
 
 class ValidStep5Data(BaseModel):
     """Model the fifth step of the scoring process."""
 
-    additional_phenotypes: Literal[*steps.get_option_names("5")]  # type: ignore
+    additional_phenotypes: Literal[*steps.index["5"].option_names]  # type: ignore
 
 
 class ValidStep6Data(BaseModel):
     """Model the sixth step of the scoring process."""
 
-    a_weighing_association: Literal[*steps.get_option_names("6A")]  # type: ignore
-    b_low_field_resolution: Literal[*steps.get_option_names("6B")]  # type: ignore
+    a_weighing_association: Literal[*steps.index["6A"].option_names]  # type: ignore
+    b_low_field_resolution: Literal[*steps.index["6B"].option_names]  # type: ignore
 
 
 class ValidScoreData(BaseModel):
@@ -79,6 +87,202 @@ class ValidScoreData(BaseModel):
     step_6: ValidStep6Data
 
 
+def get_code(option_or_options: str | List[str], step_index: StepIndex) -> int:
+    """Return the option code, or bitmask of option codes, for the given option(s).
+
+    :raises KeyError: If an option isn't one of the step's options.
+    """
+    if isinstance(option_or_options, str):
+        code = step_index.option_to_code[option_or_options]
+        return 1 << code if step_index.multi_select else code
+    mask = 0
+    for option in option_or_options:
+        mask |= 1 << step_index.option_to_code[option]
+    return mask
+
+
+class ScoreCodes:
+    """Hold the option codes for valid score data.
+
+    There's one code for each step, in the same order as `STEP_FIELDS`. The code for a
+    multi-select step is a bitmask of option codes.
+    """
+
+    __slots__ = ("codes",)
+
+    def __init__(self, codes: Tuple[int, ...]) -> None:
+        self.codes = codes
+
+    def __getitem__(self, step_number: str) -> int:
+        """Return the code for the given step number, e.g. "1A"."""
+        return self.codes[_STEP_POSITIONS[step_number]]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.codes)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, ScoreCodes) and self.codes == other.codes
+
+    def __hash__(self) -> int:
+        return hash(self.codes)
+
+    def __repr__(self) -> str:
+        return f"ScoreCodes({self.codes!r})"
+
+
+_STEP_POSITIONS = {step_number: i for i, step_number in enumerate(STEP_FIELDS)}
+
+
+def get_score_codes(valid_data: Any, steps_to_code: Steps) -> ScoreCodes:
+    """Return the option codes for score data validated by pydantic."""
+    return ScoreCodes(
+        tuple(
+            get_code(
+                getattr(getattr(valid_data, step_name), field_name),
+                steps_to_code.index[step_number],
+            )
+            for step_number, (step_name, field_name) in STEP_FIELDS.items()
+        )
+    )
+
+
+class _FallBack(Exception):
+    """Signal that the fast path can't validate the score data."""
+
+
+def build_score_model(steps_to_model: Steps) -> Type[BaseModel]:
+    """Build a model like `ValidScoreData` for the given steps.
+
+    The models above are for the default version of the framework. This builds the same
+    models for any other version.
+    """
+    step_models: Dict[str, Any] = {}
+    for step_number, (step_name, field_name) in STEP_FIELDS.items():
+        step_index = steps_to_model.index[step_number]
+        option_name = Literal[step_index.option_names]  # type: ignore
+        annotation = (
+            Union[option_name, List[option_name]]
+            if step_index.multi_select
+            else option_name
+        )
+        step_models.setdefault(step_name, {})[field_name] = (annotation, ...)
+    step_fields: Dict[str, Any] = {
+        step_name: (
+            create_model(f"ValidStep{step_name.removeprefix('step_')}Data", **fields),
+            ...,
+        )
+        for step_name, fields in step_models.items()
+    }
+    score_model: Type[BaseModel] = create_model("ValidScoreData", **step_fields)
+    return score_model
+
+
+class CompiledValidator:
+    """Validate score data using lookup tables compiled from the steps index."""
+
+    def __init__(
+        self,
+        steps_to_compile: Steps,
+        score_model: Type[BaseModel] | None = None,
+    ) -> None:
+        """Compile the lookup tables for the given steps.
+
+        :param steps_to_compile: The steps to validate score data against.
+        :param score_model: The pydantic model for the steps, which is built if it isn't
+            given.
+        """
+        self._fields = tuple(
+            (
+                step_name,
+                field_name,
+                steps_to_compile.index[step_number].option_to_code,
+                steps_to_compile.index[step_number].multi_select,
+            )
+            for step_number, (step_name, field_name) in STEP_FIELDS.items()
+        )
+        self._steps = steps_to_compile
+        self.score_model = score_model or build_score_model(steps_to_compile)
+
+    def _validate_fast(self, data: Any) -> ScoreCodes:
+        """Translate score data straight to option codes.
+
+        This only accepts score data made of plain dictionaries, strings, and lists,
+        which pydantic always accepts too.
+
+        :raises _FallBack: If the score data needs to be validated by pydantic.
+        """
+        # pylint: disable=unidiomatic-typecheck
+        codes = []
+        try:
+            for step_name, field_name, option_to_code, multi_select in self._fields:
+                step_data = data[step_name]
+                if type(step_data) is not dict:
+                    raise _FallBack
+                option_or_options = step_data[field_name]
+                if type(option_or_options) is str:
+                    code = option_to_code[option_or_options]
+                    codes.append(1 << code if multi_select else code)
+                elif multi_select and type(option_or_options) is list:
+                    mask = 0
+                    for option in option_or_options:
+                        if type(option) is not str:
+                            raise _FallBack
+                        mask |= 1 << option_to_code[option]
+                    codes.append(mask)
+                else:
+                    raise _FallBack
+        except (KeyError, TypeError) as err:
+            raise _FallBack from err
+        return ScoreCodes(tuple(codes))
+
+    def validate(self, data: dict, strict: bool = False) -> ScoreCodes:
+        """Validate score data and return its option codes.
+
+        :param data: The score data, as you'd pass to `ValidScoreData`.
+        :param strict: Always validate with the pydantic models.
+        :raises ValidationError: Couldn't validate data.
+        :returns: The option codes for the score data.
+        """
+        if not strict:
+            try:
+                return self._validate_fast(data)
+            except _FallBack:
+                pass
+        return get_score_codes(self.score_model(**data), self._steps)
+
+
+compiled_validator = CompiledValidator(steps, ValidScoreData)
+
+
+@functools.cache
+def _compile_validator(version: str) -> CompiledValidator:
+    """Compile the validator for the given version of the framework."""
+    if version == DEFAULT_FRAMEWORK_VERSION:
+        return compiled_validator
+    return CompiledValidator(get_steps(version))
+
+
+def get_validator(version: str | None = None) -> CompiledValidator:
+    """Return the compiled validator for the given version of the framework.
+
+    Each version's validator is compiled the first time it's asked for.
+    """
+    return _compile_validator(version or DEFAULT_FRAMEWORK_VERSION)
+
+
+def validate(
+    data: dict, strict: bool = False, version: str | None = None
+) -> ScoreCodes:
+    """Validate score data and return its option codes.
+
+    See `CompiledValidator.validate`.
+
+    :param version: The framework version to validate against. Defaults to the default
+        version.
+    """
+    return get_validator(version).validate(data, strict=strict)
+
+
 if __name__ == "__main__":
     score_data_json_schema = ValidScoreData.model_json_schema()
     print(json.dumps(score_data_json_schema, indent=2))
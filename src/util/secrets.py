@@ -1,32 +1,387 @@
-"""Get secrets from AWS's Secrets Manager service."""
+"""Get secrets from AWS's Secrets Manager service, or from a local stand-in.
 
+Secrets are got from a provider, chosen by the `HCI_SECRETS_PROVIDER` environment
+variable:
+
+- "aws" (the default) gets them from Secrets Manager, with one client per process, and
+  as many secrets as are needed in a single request (or one request per secret, if the
+  credentials may only get secrets one at a time).
+- "local" gets them from `HCI_SECRET_<NAME>` environment variables (e.g.
+  `HCI_SECRET_HCI_DJANGO_SECRET_KEY_STAGING`), or else from the JSON object in the file
+  named by `HCI_SECRETS_FILE`. Use this for tests and offline work.
+
+Secrets are cached in memory for `HCI_SECRETS_TTL` seconds (15 minutes by default), so
+they're only requested once per process. If `HCI_SECRETS_CACHE_FILE` and
+`HCI_SECRETS_CACHE_KEY` (a Fernet key) are set, they're also cached in that file,
+encrypted, so that short-lived tasks (e.g. migrations) started one after another don't
+each request them. Encrypting the file needs the `cryptography` package.
+"""
+
+import abc
+import json
 import logging
 import os
-
-import boto3
-from botocore.exceptions import ClientError
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
 
 logger = logging.getLogger(__name__)
 
+# The region the secrets are stored in.
+AWS_REGION = "us-west-2"
 
-def get_secret(secret_name: str) -> str | None:
-    """Return the value of the given secret."""
-    session = boto3.session.Session(
-        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-    )
-    client = session.client(
-        service_name="secretsmanager",
-        region_name="us-west-2",
+# How long (in seconds) to cache secrets for, by default.
+DEFAULT_TTL = 15 * 60
+
+# The error codes of Secrets Manager errors that are handled.
+ACCESS_DENIED = "AccessDeniedException"
+DECRYPTION_FAILURE = "DecryptionFailure"
+RESOURCE_NOT_FOUND = "ResourceNotFoundException"
+
+# The error codes of errors getting a secret that only mean that secret can't be got, so
+# the other secrets are still got.
+SECRET_ERRORS = (ACCESS_DENIED, DECRYPTION_FAILURE, RESOURCE_NOT_FOUND)
+
+# The prefix of the environment variables the local provider reads secrets from.
+LOCAL_SECRET_PREFIX = "HCI_SECRET_"
+
+
+class SecretsException(Exception):
+    """Define an exception for the secrets module."""
+
+
+class SecretsProvider(abc.ABC):
+    """Get the values of secrets from somewhere."""
+
+    @abc.abstractmethod
+    def get_secrets(self, secret_names: List[str]) -> Dict[str, str]:
+        """Return the values of the secrets, by name.
+
+        :raises SecretsException: If the secrets can't be got. Secrets that don't exist
+            are left out, rather than raising an exception.
+        """
+
+
+class AwsSecretsProvider(SecretsProvider):
+    """Get secrets from AWS's Secrets Manager service."""
+
+    def __init__(self) -> None:
+        self._client: Any = None
+        self._lock = threading.Lock()
+        # Whether the credentials may get secrets in a batch, until they're denied.
+        self._can_batch = True
+
+    def get_client(self) -> Any:
+        """Return the Secrets Manager client, creating it the first time.
+
+        boto3 is imported here, rather than at the top of the module, since it takes a
+        while to import and is only needed if a secret isn't cached.
+        """
+        with self._lock:
+            if self._client is None:
+                import boto3  # pylint: disable=import-outside-toplevel
+
+                session = boto3.session.Session(
+                    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+                    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+                )
+                self._client = session.client(
+                    service_name="secretsmanager", region_name=AWS_REGION
+                )
+            return self._client
+
+    def get_secrets(self, secret_names: List[str]) -> Dict[str, str]:
+        """Return the values of the secrets, by name, with as few requests as possible.
+
+        The secrets are got in a single request, if the credentials are allowed to (with
+        the `secretsmanager:BatchGetSecretValue` permission). Otherwise they're got one
+        at a time.
+
+        :raises SecretsException: If Secrets Manager can't be reached.
+        """
+        from botocore.exceptions import (  # pylint: disable=import-outside-toplevel
+            BotoCoreError,
+            ClientError,
+        )
+
+        try:
+            if self._can_batch:
+                try:
+                    return self._batch_get_secrets(secret_names)
+                except ClientError as err:
+                    if err.response["Error"]["Code"] != ACCESS_DENIED:
+                        raise
+                    logger.warning(
+                        "Not allowed to get secrets in a batch, so getting them one at "
+                        "a time: %s",
+                        err,
+                    )
+                    self._can_batch = False
+            return self._get_secrets_one_at_a_time(secret_names)
+        except (BotoCoreError, ClientError) as err:
+            raise SecretsException(f"Unable to get secrets from AWS: {err}") from err
+
+    def _batch_get_secrets(self, secret_names: List[str]) -> Dict[str, str]:
+        """Return the values of the secrets, by name, from a batch request's pages."""
+        secrets = {}
+        client = self.get_client()
+        request: Dict[str, Any] = {"SecretIdList": secret_names}
+        while True:
+            page = client.batch_get_secret_value(**request)
+            for secret in page["SecretValues"]:
+                if isinstance(secret.get("SecretString"), str):
+                    secrets[secret["Name"]] = secret["SecretString"]
+                else:
+                    logger.error("SecretString of %s is not a string", secret["Name"])
+            for error in page.get("Errors", []):
+                logger.error(
+                    "Unable to get secret %s from AWS: %s",
+                    error.get("SecretId"),
+                    error.get("Message"),
+                )
+            if not page.get("NextToken"):
+                return secrets
+            request["NextToken"] = page["NextToken"]
+
+    def _get_secrets_one_at_a_time(self, secret_names: List[str]) -> Dict[str, str]:
+        """Return the values of the secrets, by name, from a request for each."""
+        from botocore.exceptions import (  # pylint: disable=import-outside-toplevel
+            ClientError,
+        )
+
+        secrets = {}
+        client = self.get_client()
+        for secret_name in secret_names:
+            try:
+                secret = client.get_secret_value(SecretId=secret_name)
+            except ClientError as err:
+                if err.response["Error"]["Code"] not in SECRET_ERRORS:
+                    raise
+                logger.error("Unable to get secret %s from AWS: %s", secret_name, err)
+                continue
+            if isinstance(secret.get("SecretString"), str):
+                secrets[secret_name] = secret["SecretString"]
+            else:
+                logger.error("SecretString of %s is not a string", secret_name)
+        return secrets
+
+
+class LocalSecretsProvider(SecretsProvider):
+    """Get secrets from environment variables, or a JSON file."""
+
+    def get_secrets(self, secret_names: List[str]) -> Dict[str, str]:
+        """Return the values of the secrets, by name.
+
+        :raises SecretsException: If the secrets file can't be read.
+        """
+        secrets = {}
+        file_secrets: Dict[str, Any] | None = None
+        for secret_name in secret_names:
+            value = os.getenv(LOCAL_SECRET_PREFIX + secret_name.upper())
+            if value is None:
+                if file_secrets is None:
+                    file_secrets = self._read_secrets_file()
+                value = file_secrets.get(secret_name)
+            if isinstance(value, str):
+                secrets[secret_name] = value
+        return secrets
+
+    @staticmethod
+    def _read_secrets_file() -> Dict[str, Any]:
+        """Return the secrets in the secrets file, if there is one."""
+        path = os.getenv("HCI_SECRETS_FILE")
+        if not path:
+            return {}
+        try:
+            secrets = json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, ValueError) as err:
+            raise SecretsException(
+                f"Unable to read secrets from {path}: {err}"
+            ) from err
+        if not isinstance(secrets, dict):
+            raise SecretsException(f"The secrets in {path} aren't a JSON object")
+        return secrets
+
+
+class EncryptedFileCache:
+    """Cache secrets in a file, encrypted with a Fernet key."""
+
+    def __init__(self, path: Path, key: str) -> None:
+        self.path = path
+        self.key = key
+
+    def _get_fernet(self) -> Any:
+        """Return the Fernet cipher to encrypt the file with.
+
+        :raises SecretsException: If the `cryptography` package isn't installed.
+        """
+        try:
+            # pylint: disable-next=import-outside-toplevel
+            from cryptography.fernet import Fernet
+        except ImportError as err:
+            raise SecretsException(
+                "Caching secrets in a file needs the cryptography package"
+            ) from err
+        return Fernet(self.key)
+
+    def read(self) -> Dict[str, Tuple[str, float]]:
+        """Return the cached secrets, mapped to their values and expiry times.
+
+        A missing, unreadable, or tampered with file is treated as empty.
+        """
+        try:
+            token = self.path.read_bytes()
+            entries = json.loads(self._get_fernet().decrypt(token))
+        except FileNotFoundError:
+            return {}
+        except SecretsException:
+            raise
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            logger.warning("Ignoring the secrets cache at %s: %s", self.path, err)
+            return {}
+        return {
+            name: (value, expires_at) for name, (value, expires_at) in entries.items()
+        }
+
+    def write(self, entries: Dict[str, Tuple[str, float]]) -> None:
+        """Replace the cached secrets, making the file readable by its owner only."""
+        token = self._get_fernet().encrypt(json.dumps(entries).encode())
+        temporary_path = self.path.with_name(f".{self.path.name}.{os.getpid()}")
+        fd = os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(token)
+        os.replace(temporary_path, self.path)
+
+
+class SecretsCache:
+    """Cache the secrets got from a provider, in memory and optionally in a file."""
+
+    def __init__(
+        self,
+        provider: SecretsProvider,
+        ttl: float = DEFAULT_TTL,
+        file_cache: EncryptedFileCache | None = None,
+    ) -> None:
+        self.provider = provider
+        self.ttl = ttl
+        self.file_cache = file_cache
+        self._entries: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get_secrets(self, secret_names: Iterable[str]) -> Dict[str, str]:
+        """Return the values of the secrets, by name, getting the uncached ones.
+
+        :raises SecretsException: If the uncached secrets can't be got.
+        """
+        secret_names = list(dict.fromkeys(secret_names))
+        with self._lock:
+            now = time.time()
+            missing = [
+                name
+                for name in secret_names
+                if name not in self._entries or self._entries[name][1] <= now
+            ]
+            if missing and self.file_cache is not None:
+                self._entries.update(
+                    (name, entry)
+                    for name, entry in self.file_cache.read().items()
+                    if entry[1] > now
+                )
+                missing = [name for name in missing if name not in self._entries]
+            if missing:
+                expires_at = now + self.ttl
+                fetched = self.provider.get_secrets(missing)
+                self._entries.update(
+                    (name, (value, expires_at)) for name, value in fetched.items()
+                )
+                if fetched and self.file_cache is not None:
+                    self.file_cache.write(
+                        {
+                            name: entry
+                            for name, entry in self._entries.items()
+                            if entry[1] > now
+                        }
+                    )
+            return {
+                name: self._entries[name][0]
+                for name in secret_names
+                if name in self._entries
+            }
+
+    def clear(self) -> None:
+        """Forget the secrets cached in memory."""
+        with self._lock:
+            self._entries.clear()
+
+
+def get_provider() -> SecretsProvider:
+    """Return the provider named by the `HCI_SECRETS_PROVIDER` environment variable.
+
+    :raises SecretsException: If there's no such provider.
+    """
+    name = os.getenv("HCI_SECRETS_PROVIDER", "aws")
+    if name == "aws":
+        return AwsSecretsProvider()
+    if name == "local":
+        return LocalSecretsProvider()
+    raise SecretsException(f"Unknown secrets provider {name!r}")
+
+
+def _create_cache() -> SecretsCache:
+    """Create the secrets cache configured by the environment variables."""
+    file_cache = None
+    cache_file = os.getenv("HCI_SECRETS_CACHE_FILE")
+    cache_key = os.getenv("HCI_SECRETS_CACHE_KEY")
+    if cache_file and cache_key:
+        file_cache = EncryptedFileCache(Path(cache_file), cache_key)
+    return SecretsCache(
+        get_provider(),
+        ttl=float(os.getenv("HCI_SECRETS_TTL", str(DEFAULT_TTL))),
+        file_cache=file_cache,
     )
+
+
+_cache: SecretsCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> SecretsCache:
+    """Return the process's secrets cache, creating it the first time."""
+    global _cache  # pylint: disable=global-statement
+    with _cache_lock:
+        if _cache is None:
+            _cache = _create_cache()
+        return _cache
+
+
+def get_secrets(
+    secret_names: Iterable[str], required: Iterable[str] = ()
+) -> Dict[str, str | None]:
+    """Return the values of the given secrets, getting them all at once.
+
+    Secrets that can't be got are logged, and are None.
+
+    :param secret_names: The names of the secrets.
+    :param required: The names of the secrets that can't be None.
+    :raises SecretsException: If a required secret can't be got.
+    """
+    secret_names = list(secret_names)
     try:
-        get_secret_value_response = client.get_secret_value(SecretId=secret_name)
-        secret_string = get_secret_value_response["SecretString"]
-        if not isinstance(secret_string, str):
-            logger.error("SecretString is not a string")
-            return None
-        return secret_string
-    except ClientError as error:
-        logger.error("Unable to get secret key from AWS")
-        logger.error(error)
-        return None
+        secrets = get_cache().get_secrets(secret_names)
+    except SecretsException as err:
+        logger.error("Unable to get secrets")
+        logger.error(err)
+        secrets = {}
+    for name in secret_names:
+        if name not in secrets:
+            logger.error("Unable to get secret %s", name)
+    missing = [name for name in required if name not in secrets]
+    if missing:
+        raise SecretsException(f"Unable to get required secrets: {', '.join(missing)}")
+    return {name: secrets.get(name) for name in secret_names}
+
+
+def get_secret(secret_name: str) -> str | None:
+    """Return the value of the given secret."""
+    return get_secrets([secret_name])[secret_name]
@@ -0,0 +1,202 @@
+"""Test the util package."""
+
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Dict, List
+from unittest import mock
+
+import boto3
+from botocore.stub import Stubber
+
+from util.secrets import (
+    AwsSecretsProvider,
+    EncryptedFileCache,
+    LocalSecretsProvider,
+    SecretsCache,
+    SecretsException,
+    SecretsProvider,
+    get_secrets,
+)
+
+# Encrypting the file cache needs the cryptography package, which is optional.
+HAS_CRYPTOGRAPHY = importlib.util.find_spec("cryptography") is not None
+
+
+class CountingProvider(SecretsProvider):
+    """Provide secrets from a dictionary, recording each request."""
+
+    def __init__(self, secrets: Dict[str, str]) -> None:
+        self.secrets = secrets
+        self.requests: List[List[str]] = []
+
+    def get_secrets(self, secret_names: List[str]) -> Dict[str, str]:
+        """Return the secrets there are, and record the request."""
+        self.requests.append(secret_names)
+        return {
+            name: self.secrets[name] for name in secret_names if name in self.secrets
+        }
+
+
+class TestSecrets(unittest.TestCase):
+    """Test getting and caching secrets."""
+
+    def setUp(self) -> None:
+        """Make a temporary directory for secrets files."""
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_local_provider(self) -> None:
+        """Secrets should be read from environment variables, then the file."""
+        path = self.directory / "secrets.json"
+        path.write_text(json.dumps({"a": "from file", "b": "from file"}))
+        environ = {"HCI_SECRETS_FILE": str(path), "HCI_SECRET_A": "from env"}
+        with mock.patch.dict(os.environ, environ):
+            self.assertEqual(
+                {"a": "from env", "b": "from file"},
+                LocalSecretsProvider().get_secrets(["a", "b", "c"]),
+            )
+        path.write_text("[]")
+        with mock.patch.dict(os.environ, {"HCI_SECRETS_FILE": str(path)}):
+            with self.assertRaises(SecretsException):
+                LocalSecretsProvider().get_secrets(["a"])
+
+    def test_cache(self) -> None:
+        """Secrets should be got in one request, and only again once they expire."""
+        provider = CountingProvider({"a": "1", "b": "2"})
+        cache = SecretsCache(provider, ttl=60)
+        with mock.patch("util.secrets.time.time", return_value=1000):
+            self.assertEqual({"a": "1", "b": "2"}, cache.get_secrets(["a", "b", "c"]))
+            self.assertEqual({"a": "1"}, cache.get_secrets(["a"]))
+        with mock.patch("util.secrets.time.time", return_value=1061):
+            cache.get_secrets(["a"])
+        self.assertEqual([["a", "b", "c"], ["a"]], provider.requests)
+
+    @unittest.skipUnless(HAS_CRYPTOGRAPHY, "cryptography isn't installed")
+    def test_file_cache(self) -> None:
+        """Secrets cached in a file should be shared by caches, and encrypted."""
+        from cryptography.fernet import (  # pylint: disable=import-outside-toplevel
+            Fernet,
+        )
+
+        key = Fernet.generate_key().decode()
+        path = self.directory / "cache"
+        provider = CountingProvider({"a": "secret value"})
+        SecretsCache(provider, file_cache=EncryptedFileCache(path, key)).get_secrets(
+            ["a"]
+        )
+        self.assertNotIn(b"secret value", path.read_bytes())
+        self.assertEqual(0o600, path.stat().st_mode & 0o777)
+        cache = SecretsCache(provider, file_cache=EncryptedFileCache(path, key))
+        self.assertEqual({"a": "secret value"}, cache.get_secrets(["a"]))
+        self.assertEqual(1, len(provider.requests))
+        # A file encrypted with another key is ignored.
+        other_key = Fernet.generate_key().decode()
+        with self.assertLogs("util.secrets", level="WARNING"):
+            self.assertEqual({}, EncryptedFileCache(path, other_key).read())
+
+    @staticmethod
+    def get_aws_provider() -> AwsSecretsProvider:
+        """Return an AWS secrets provider with a client that can be stubbed."""
+        provider = AwsSecretsProvider()
+        provider._client = boto3.client(  # pylint: disable=protected-access
+            "secretsmanager",
+            region_name="us-west-2",
+            aws_access_key_id="key",
+            aws_secret_access_key="secret",
+        )
+        return provider
+
+    def test_aws_provider(self) -> None:
+        """Secrets should be got in a batch, following the batch's pages."""
+        provider = self.get_aws_provider()
+        with Stubber(provider.get_client()) as stubber:
+            stubber.add_response(
+                "batch_get_secret_value",
+                {
+                    "SecretValues": [{"Name": "a", "SecretString": "1"}],
+                    "NextToken": "t",
+                },
+                {"SecretIdList": ["a", "b"]},
+            )
+            stubber.add_response(
+                "batch_get_secret_value",
+                {"SecretValues": [{"Name": "b", "SecretString": "2"}]},
+                {"SecretIdList": ["a", "b"], "NextToken": "t"},
+            )
+            self.assertEqual({"a": "1", "b": "2"}, provider.get_secrets(["a", "b"]))
+            stubber.assert_no_pending_responses()
+
+    def test_aws_provider_without_batch_permission(self) -> None:
+        """Secrets should be got one at a time if they can't be got in a batch."""
+        provider = self.get_aws_provider()
+        with Stubber(provider.get_client()) as stubber:
+            stubber.add_client_error(
+                "batch_get_secret_value", service_error_code="AccessDeniedException"
+            )
+            stubber.add_response(
+                "get_secret_value",
+                {"Name": "a", "SecretString": "1"},
+                {"SecretId": "a"},
+            )
+            stubber.add_client_error(
+                "get_secret_value",
+                service_error_code="ResourceNotFoundException",
+                expected_params={"SecretId": "b"},
+            )
+            stubber.add_response(
+                "get_secret_value",
+                {"Name": "a", "SecretString": "1"},
+                {"SecretId": "a"},
+            )
+            with self.assertLogs("util.secrets", level="WARNING"):
+                self.assertEqual({"a": "1"}, provider.get_secrets(["a", "b"]))
+            # Once denied, a batch isn't requested again.
+            self.assertEqual({"a": "1"}, provider.get_secrets(["a"]))
+            stubber.assert_no_pending_responses()
+
+    def test_aws_provider_denied_secret(self) -> None:
+        """A secret that can't be got shouldn't keep the others from being got."""
+        provider = self.get_aws_provider()
+        provider._can_batch = False  # pylint: disable=protected-access
+        with Stubber(provider.get_client()) as stubber:
+            stubber.add_response(
+                "get_secret_value",
+                {"Name": "a", "SecretString": "1"},
+                {"SecretId": "a"},
+            )
+            stubber.add_client_error(
+                "get_secret_value",
+                service_error_code="AccessDeniedException",
+                expected_params={"SecretId": "b"},
+            )
+            stubber.add_client_error(
+                "get_secret_value",
+                service_error_code="DecryptionFailure",
+                expected_params={"SecretId": "c"},
+            )
+            stubber.add_response(
+                "get_secret_value",
+                {"Name": "d", "SecretString": "4"},
+                {"SecretId": "d"},
+            )
+            with self.assertLogs("util.secrets", level="ERROR"):
+                self.assertEqual(
+                    {"a": "1", "d": "4"}, provider.get_secrets(["a", "b", "c", "d"])
+                )
+            stubber.assert_no_pending_responses()
+
+    def test_get_secrets(self) -> None:
+        """Secrets that can't be got should be logged, and None."""
+        cache = SecretsCache(CountingProvider({"a": "1"}))
+        with (
+            mock.patch("util.secrets.get_cache", return_value=cache),
+            self.assertLogs("util.secrets", level="ERROR"),
+        ):
+            self.assertEqual({"a": "1", "b": None}, get_secrets(["a", "b"]))
+            with self.assertRaises(SecretsException):
+                get_secrets(["a", "b"], required=["a", "b"])